@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -49,7 +50,10 @@ INSTALLED_APPS = [
     'reports',
     'solo',
     'configuration',
-    'auditing'
+    'auditing',
+    'core',
+    'notifications',
+    'search',
 ]
 
 MIDDLEWARE = [
@@ -102,6 +106,24 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# 'default' is private to each worker process and holds the cached data
+# itself. 'shared' lives in the database, so every worker sees the same
+# values; it only holds small version keys that invalidate the per-process
+# copies everywhere at once. Create its table with
+# `manage.py createcachetable`.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -146,6 +168,19 @@ EMAIL_BACKEND = 'configuration.db_backend.DbEmailBackend'
 # We can keep this as a fallback
 DEFAULT_FROM_EMAIL = 'Aronee <noreply@gminitours.com>'
 
+# Rendered trip PDFs are cached here, one file per trip, template and
+# version of the trip (see reports/pdf.py).
+PDF_CACHE_DIR = BASE_DIR / 'pdf_cache'
+# Processes rendering PDFs off the request thread, one per CPU core; 0
+# renders in-process.
+PDF_RENDER_WORKERS = os.cpu_count() or 1
+
+# Audit log entries older than this many days are moved by
+# `manage.py prune_audit_log` into monthly gzip JSONL files under
+# AUDIT_ARCHIVE_DIR (see auditing/archive.py).
+AUDIT_RETENTION_DAYS = 365
+AUDIT_ARCHIVE_DIR = BASE_DIR / 'audit_archive'
+
 # Add this to your settings.py
 LOGGING = {
     'version': 1,
@@ -159,9 +194,9 @@ LOGGING = {
         'handlers': ['console'],
     },
     'loggers': {
-        'auditing.signals': {
+        'auditing': {
             'handlers': ['console'],
-            'level': 'DEBUG',
+            'level': 'WARNING',
             'propagate': False,
         },
     },
@@ -36,6 +36,7 @@ urlpatterns = [
     path('reports/', include('reports.urls')),
     path('config/', include('configuration.urls')),
     path('audit/', include('auditing.urls')),
+    path('search/', include('search.urls')),
 
     # Authentication URLs
     path('login/', auth_views.LoginView.as_view(template_name='login.html'), name='login'),
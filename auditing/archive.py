@@ -0,0 +1,172 @@
+"""
+Retention and archival of the audit log.
+
+Entries older than the retention window are moved out of
+the audit event table into gzip-compressed JSON Lines files under
+``AUDIT_ARCHIVE_DIR``, as are the expired entries Django's admin still
+writes to its own ``django_admin_log`` (archived with ids of the form
+``admin:<id>``). Each batch becomes a segment file of its own,
+``audit-YYYY-MM.<sequence>.jsonl.gz``, which is written under a temporary
+name, flushed to disk and only then renamed into place, so a crash or a
+full disk never leaves a damaged file among the archives. A month is read
+back as its segments in order. Rows are deleted in small batches, each
+only after its segment is in place, so no statement holds locks for long.
+A run interrupted between the two steps archives the batch again on the
+next run; readers drop the repeated ids.
+"""
+import gzip
+import json
+import os
+import time
+from datetime import timedelta
+from itertools import groupby
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.admin.models import LogEntry
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import AuditEvent
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def archive_paths(month):
+    """Segment files of ``month``, a ``'YYYY-MM'`` string, in the order they were written."""
+    # A single audit-YYYY-MM.jsonl.gz from before segments sorts first.
+    paths = Path(settings.AUDIT_ARCHIVE_DIR).glob(f'audit-{month}.*jsonl.gz')
+    return sorted(paths, key=lambda path: (path.name.count('.') > 2, path.name))
+
+
+def _write_segment(month, lines):
+    directory = Path(settings.AUDIT_ARCHIVE_DIR)
+    path = directory / f'audit-{month}.{time.time_ns()}.jsonl.gz'
+    partial = path.with_name(f'{path.name}.part')
+    try:
+        with open(partial, 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb') as archive:
+                archive.write(lines.encode('utf-8'))
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(partial, path)
+    finally:
+        partial.unlink(missing_ok=True)
+    # Makes the rename itself durable before the rows are deleted.
+    if hasattr(os, 'O_DIRECTORY'):
+        descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+
+def _serialize(row):
+    return {
+        'id': row['pk'],
+        'action_time': row['action_time'].isoformat(),
+        'user_id': row['user_id'],
+        'username': row['user__username'],
+        'model': f"{row['content_type__app_label']}.{row['content_type__model']}" if row['content_type_id'] else None,
+        'object_id': row['object_id'],
+        'object_repr': row['object_repr'],
+        'kind': row['kind'],
+        'message': row['message'],
+        'changes': row['changes'],
+    }
+
+
+def _serialize_admin_entry(row):
+    # Admin's ADDITION, CHANGE and DELETION flags equal the matching EventKind values.
+    return {
+        'id': f"admin:{row['pk']}",
+        'action_time': row['action_time'].isoformat(),
+        'user_id': row['user_id'],
+        'username': row['user__username'],
+        'model': f"{row['content_type__app_label']}.{row['content_type__model']}" if row['content_type_id'] else None,
+        'object_id': row['object_id'],
+        'object_repr': row['object_repr'],
+        'kind': row['action_flag'],
+        'message': row['change_message'],
+        'changes': None,
+    }
+
+
+def _month(record):
+    return record['action_time'][:7]
+
+
+def _move(expired, serialize, model, batch_size, moved, progress):
+    while True:
+        rows = list(expired[:batch_size])
+        if not rows:
+            return moved
+        records = [serialize(row) for row in rows]
+        for month, month_records in groupby(records, key=_month):
+            lines = ''.join(json.dumps(record, ensure_ascii=False, cls=DjangoJSONEncoder) + '\n' for record in month_records)
+            _write_segment(month, lines)
+        model.objects.filter(pk__in=[row['pk'] for row in rows]).delete()
+        moved += len(records)
+        if progress is not None:
+            progress(moved)
+
+
+def prune(retention_days=None, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Archives and deletes the entries older than ``retention_days``
+    (``AUDIT_RETENTION_DAYS`` by default), oldest first, then the expired
+    admin log entries. Returns the number of entries moved; ``progress``,
+    when given, is called with the running total after each batch.
+    """
+    if retention_days is None:
+        retention_days = settings.AUDIT_RETENTION_DAYS
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    related = ('user_id', 'user__username', 'content_type_id', 'content_type__app_label', 'content_type__model',
+               'object_id', 'object_repr')
+    expired = AuditEvent.objects.filter(action_time__lt=cutoff).order_by('action_time', 'pk').values(
+        'pk', 'action_time', *related, 'kind', 'message', 'changes',
+    )
+    expired_admin = LogEntry.objects.filter(action_time__lt=cutoff).order_by('action_time', 'pk').values(
+        'pk', 'action_time', *related, 'action_flag', 'change_message',
+    )
+    Path(settings.AUDIT_ARCHIVE_DIR).mkdir(parents=True, exist_ok=True)
+
+    moved = _move(expired, _serialize, AuditEvent, batch_size, 0, progress)
+    return _move(expired_admin, _serialize_admin_entry, LogEntry, batch_size, moved, progress)
+
+
+def archived_months():
+    """``'YYYY-MM'`` of every month that has an archive, oldest first."""
+    return sorted({path.name[len('audit-'):len('audit-YYYY-MM')]
+                   for path in Path(settings.AUDIT_ARCHIVE_DIR).glob('audit-*.jsonl.gz')})
+
+
+def search(first_month=None, last_month=None, user=None, model=None, object_id=None, text=None):
+    """
+    Yields archived entries, oldest first, from the months between
+    ``first_month`` and ``last_month`` (``'YYYY-MM'``, inclusive) that
+    match every given filter: ``user`` is a username, ``model`` an
+    ``app_label.model`` label and ``text`` a case-insensitive substring of
+    the message or object description.
+    """
+    text = text.lower() if text else None
+    for month in archived_months():
+        if (first_month and month < first_month) or (last_month and month > last_month):
+            continue
+        seen = set()
+        for path in archive_paths(month):
+            with gzip.open(path, 'rt', encoding='utf-8') as archive:
+                for line in archive:
+                    record = json.loads(line)
+                    if record['id'] in seen:
+                        continue
+                    seen.add(record['id'])
+                    if user and record['username'] != user:
+                        continue
+                    if model and record['model'] != model:
+                        continue
+                    if object_id and str(record['object_id']) != str(object_id):
+                        continue
+                    if text and text not in f"{record['message']}\n{record['object_repr']}".lower():
+                        continue
+                    yield record
@@ -1,15 +1,47 @@
-from threading import local
+"""
+The user of the current request, for code such as signal receivers that
+has no request at hand.
+
+It is kept in a context variable rather than a thread-local: under ASGI
+many requests share a thread, and each one runs in its own context, so
+concurrent requests never see each other's user. Sync code called from an
+async view through ``sync_to_async`` inherits the context of its caller.
+"""
+from contextvars import ContextVar
+
+
+
+class _UserRef:
+    # asgiref compares context values when it copies them back from a
+    # thread; holding the lazy ``request.user`` in a plain object keeps
+    # that comparison from loading the user inside the event loop.
+    __slots__ = ('user',)
+
+    def __init__(self, user):
+        self.user = user
+
+
+_current_user = ContextVar('current_user', default=_UserRef(None))
 
-_thread_locals = local()
 
 def get_current_user():
     """
     Returns the user object for the current request.
     """
-    return getattr(_thread_locals, 'user', None)
+    return _current_user.get().user
+
 
 def set_current_user(user):
     """
-    Sets the user object for the current request.
+    Sets the user object for the current request; returns a token for
+    ``reset_current_user()``.
+    """
+    return _current_user.set(_UserRef(user))
+
+
+def reset_current_user(token):
+    """
+    Restores the user that was current before ``set_current_user()``
+    returned ``token``.
     """
-    _thread_locals.user = user
\ No newline at end of file
+    _current_user.reset(token)
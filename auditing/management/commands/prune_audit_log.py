@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from auditing import archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves audit log entries older than the retention window into monthly gzip JSONL "
+        "archives, deleting them from the database in small batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.AUDIT_RETENTION_DAYS,
+                            help='Retention window in days (default: AUDIT_RETENTION_DAYS).')
+        parser.add_argument('--batch-size', type=int, default=archive.DEFAULT_BATCH_SIZE,
+                            help='Entries archived and deleted per batch.')
+
+    def handle(self, *args, **options):
+        def progress(moved):
+            self.stdout.write(f"\r{moved} entries archived", ending='')
+            self.stdout.flush()
+
+        moved = archive.prune(options['days'], options['batch_size'], progress)
+        if moved:
+            self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {moved} audit log entries older than {options['days']} days to {settings.AUDIT_ARCHIVE_DIR}."
+        ))
@@ -0,0 +1,28 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from auditing import archive
+
+
+class Command(BaseCommand):
+    help = "Searches the archived audit log months, printing matching entries as JSON lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='first_month', help='First month to search (YYYY-MM).')
+        parser.add_argument('--to', dest='last_month', help='Last month to search (YYYY-MM).')
+        parser.add_argument('--user', help='Only entries by this username.')
+        parser.add_argument('--model', help='Only entries about this model, e.g. trips.trip.')
+        parser.add_argument('--object-id', help='Only entries about this object id.')
+        parser.add_argument('--contains', dest='text', help='Text to look for in the message or object.')
+
+    def handle(self, *args, **options):
+        matches = archive.search(
+            options['first_month'], options['last_month'], user=options['user'],
+            model=options['model'], object_id=options['object_id'], text=options['text'],
+        )
+        count = 0
+        for record in matches:
+            self.stdout.write(json.dumps(record, ensure_ascii=False))
+            count += 1
+        self.stderr.write(f"{count} matching entries")
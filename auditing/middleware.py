@@ -1,19 +1,43 @@
-from .local_user import set_current_user
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .local_user import reset_current_user, set_current_user
+from .writer import audit_batch, async_audit_batch
 
 
 class CurrentUserMiddleware:
+    """
+    Makes the request user available to ``get_current_user()`` and writes
+    the request's audit events together once the response is ready. It
+    runs natively in both sync and async middleware chains, so async views
+    under ASGI don't pay for a thread switch here.
+    """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        # Set the user for the entire duration of the request
-        set_current_user(getattr(request, 'user', None))
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
 
+        # Set the user for the entire duration of the request
+        token = set_current_user(getattr(request, 'user', None))
         try:
-            # Process the request
-            response = self.get_response(request)
+            # Process the request; its audit events are written together
+            # in one insert once the response is ready
+            with audit_batch():
+                return self.get_response(request)
         finally:
             # Clean up the user after the request is finished
-            set_current_user(None)
+            reset_current_user(token)
 
-        return response
\ No newline at end of file
+    async def __acall__(self, request):
+        token = set_current_user(getattr(request, 'user', None))
+        try:
+            async with async_audit_batch():
+                return await self.get_response(request)
+        finally:
+            reset_current_user(token)
@@ -0,0 +1,113 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:42
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+COPY_BATCH_SIZE = 5000
+CHANGE, LOGIN, LOGOUT = 2, 4, 5
+SESSION_MESSAGES = {'User logged in': LOGIN, 'User logged out': LOGOUT}
+
+
+def _user_type_id(apps):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    app_label, model = settings.AUTH_USER_MODEL.lower().split('.')
+    return ContentType.objects.filter(app_label=app_label, model=model).values_list('pk', flat=True).first()
+
+
+def _kind(entry, user_type_id):
+    # Logins and logouts were logged to django_admin_log as changes of the
+    # user; they become events of their own kinds.
+    if entry['action_flag'] == CHANGE and entry['content_type_id'] == user_type_id:
+        for prefix, kind in SESSION_MESSAGES.items():
+            if entry['change_message'].startswith(prefix):
+                return kind
+    return entry['action_flag']
+
+
+def move_log_entries(apps, schema_editor):
+    # Move the history written to django_admin_log so far over to the new
+    # table, in primary key batches; each batch is deleted from the old
+    # table once copied, so no entry is kept (or pruned) twice. Entries
+    # without a content type or with a non-numeric object id cannot be keyed
+    # and are left where they are.
+    LogEntry = apps.get_model('admin', 'LogEntry')
+    AuditEvent = apps.get_model('auditing', 'AuditEvent')
+    user_type_id = _user_type_id(apps)
+    entries = LogEntry.objects.filter(content_type__isnull=False).order_by('pk').values(
+        'pk', 'action_time', 'user_id', 'action_flag', 'content_type_id', 'object_id', 'object_repr',
+        'change_message',
+    )
+    last_pk = 0
+    while True:
+        batch = list(entries.filter(pk__gt=last_pk)[:COPY_BATCH_SIZE])
+        if not batch:
+            return
+        last_pk = batch[-1]['pk']
+        movable = [entry for entry in batch if (entry['object_id'] or '').isdigit()]
+        AuditEvent.objects.bulk_create([
+            AuditEvent(
+                action_time=entry['action_time'], user_id=entry['user_id'], kind=_kind(entry, user_type_id),
+                content_type_id=entry['content_type_id'], object_id=int(entry['object_id']),
+                object_repr=entry['object_repr'], message=entry['change_message'],
+            )
+            for entry in movable
+        ])
+        LogEntry.objects.filter(pk__in=[entry['pk'] for entry in movable]).delete()
+
+
+def restore_log_entries(apps, schema_editor):
+    # Events without a user cannot be stored in django_admin_log and are lost;
+    # logins and logouts go back to being changes of the user.
+    LogEntry = apps.get_model('admin', 'LogEntry')
+    AuditEvent = apps.get_model('auditing', 'AuditEvent')
+    events = AuditEvent.objects.filter(user__isnull=False).order_by('pk')
+    last_pk = 0
+    while True:
+        batch = list(events.filter(pk__gt=last_pk)[:COPY_BATCH_SIZE])
+        if not batch:
+            return
+        last_pk = batch[-1].pk
+        LogEntry.objects.bulk_create([
+            LogEntry(
+                action_time=event.action_time, user_id=event.user_id,
+                action_flag=CHANGE if event.kind in (LOGIN, LOGOUT) else event.kind,
+                content_type_id=event.content_type_id, object_id=str(event.object_id),
+                object_repr=event.object_repr, change_message=event.message,
+            )
+            for event in batch
+        ])
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('admin', '0003_logentry_add_action_flag_choices'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action_time', models.DateTimeField()),
+                ('kind', models.PositiveSmallIntegerField(choices=[(1, 'Created'), (2, 'Changed'), (3, 'Deleted'), (4, 'Logged in'), (5, 'Logged out')])),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('object_repr', models.CharField(max_length=200)),
+                ('message', models.TextField(blank=True)),
+                ('changes', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='audit_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-action_time', '-id'],
+                'indexes': [models.Index(fields=['content_type', 'object_id', 'action_time'], name='audit_object_time_idx'), models.Index(fields=['action_time', 'id'], name='audit_time_idx'), models.Index(fields=['user', 'action_time', 'id'], name='audit_user_time_idx'), models.Index(fields=['content_type', 'action_time', 'id'], name='audit_ctype_time_idx'), models.Index(fields=['kind', 'action_time', 'id'], name='audit_kind_time_idx')],
+            },
+        ),
+        migrations.RunPython(move_log_entries, restore_log_entries),
+    ]
@@ -1,3 +1,52 @@
+from django.conf import settings
+from django.contrib.admin.models import ADDITION, CHANGE, DELETION
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
-# Create your models here.
+
+class EventKind(models.IntegerChoices):
+    """
+    Kind of an audit event. The first three match Django's ``LogEntry``
+    action flags; session events have kinds of their own so they can be
+    filtered on the column rather than by message text.
+    """
+    CREATED = ADDITION, 'Created'
+    CHANGED = CHANGE, 'Changed'
+    DELETED = DELETION, 'Deleted'
+    LOGIN = 4, 'Logged in'
+    LOGOUT = 5, 'Logged out'
+
+
+SESSION_KINDS = (EventKind.LOGIN, EventKind.LOGOUT)
+
+
+class AuditEvent(models.Model):
+    """
+    One audited action. Objects are keyed by typed ``content_type`` and
+    ``object_id`` columns, so the history of a single trip or customer is
+    one range scan of the composite index.
+    """
+    action_time = models.DateTimeField()
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+                             related_name='audit_events')
+    kind = models.PositiveSmallIntegerField(choices=EventKind.choices)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name='+')
+    object_id = models.PositiveBigIntegerField()
+    object_repr = models.CharField(max_length=200)
+    message = models.TextField(blank=True)
+    # Field-level diff of a change: {"field": [old, new], ...}
+    changes = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+
+    class Meta:
+        ordering = ['-action_time', '-id']
+        indexes = [
+            models.Index(fields=['content_type', 'object_id', 'action_time'], name='audit_object_time_idx'),
+            models.Index(fields=['action_time', 'id'], name='audit_time_idx'),
+            models.Index(fields=['user', 'action_time', 'id'], name='audit_user_time_idx'),
+            models.Index(fields=['content_type', 'action_time', 'id'], name='audit_ctype_time_idx'),
+            models.Index(fields=['kind', 'action_time', 'id'], name='audit_kind_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.object_repr}"
@@ -1,3 +1,271 @@
-from django.test import TestCase
+import asyncio
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.admin.models import ADDITION, LogEntry
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import connection, transaction
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.testing import QueryBudgetTestCase, SeededDataMixin
+from customers.models import Customer
+from trips.models import Trip
+from . import archive
+from .local_user import get_current_user, reset_current_user, set_current_user
+from .middleware import CurrentUserMiddleware
+from .models import AuditEvent, EventKind
+from .writer import audit_batch
+
+
+class AuditingViewQueryBudgetTests(QueryBudgetTestCase):
+    def test_action_logs(self):
+        self.assertQueryBudget(reverse('action_logs'), 5)
+
+    def test_action_logs_filtered_page(self):
+        url = reverse('action_logs') + f'?kind={EventKind.LOGIN}&start_date=2000-01-01&before=99999999999999999-1'
+        self.assertQueryBudget(url, 5)
+
+
+@mock.patch('auditing.views.LOG_PAGE_SIZE', 4)
+class ActionLogPaginationTests(SeededDataMixin, TestCase):
+    def _page(self, query=''):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('action_logs') + query)
+        self.assertEqual(response.status_code, 200)
+        return response.context
+
+    def test_older_and_newer_pages_cover_every_entry_once(self):
+        seen = []
+        context = self._page()
+        pages = [context]
+        while context['older_cursor']:
+            context = self._page(f"?before={context['older_cursor']}")
+            pages.append(context)
+        for page in pages:
+            seen.extend(entry.pk for entry in page['logs'])
+        expected = list(AuditEvent.objects.order_by('-action_time', '-pk').values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+
+        newer = self._page(f"?after={pages[-1]['newer_cursor']}")
+        self.assertEqual([entry.pk for entry in newer['logs']], [entry.pk for entry in pages[-2]['logs']])
+
+    def test_filters_use_the_event_kind_column(self):
+        context = self._page(f'?kind={EventKind.LOGIN}&user={self.admin.pk}')
+        self.assertEqual(context['logs'], [])
+        context = self._page(f'?kind={EventKind.LOGIN}')
+        self.assertTrue(context['logs'])
+        self.assertTrue(all(entry.kind == EventKind.LOGIN for entry in context['logs']))
+        self.assertIn(f'kind={EventKind.LOGIN}', context['filter_query'])
+
+    def test_malformed_cursor_shows_the_first_page(self):
+        self.assertEqual(self._page('?before=not-a-cursor')['logs'], self._page()['logs'])
+
+
+class AuditWriterTests(SeededDataMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(reset_current_user, set_current_user(self.admin))
+
+    def _inserts(self, queries):
+        return [query for query in queries if query['sql'].startswith('INSERT INTO "auditing_auditevent"')]
+
+    def test_events_of_a_batch_are_written_in_one_insert(self):
+        before = AuditEvent.objects.count()
+        with CaptureQueriesContext(connection) as ctx, audit_batch():
+            with self.captureOnCommitCallbacks(execute=True):
+                customer = Customer.objects.create(name='Ravi', phone='8000000001')
+                self.trip.status = Trip.TripStatus.CANCELLED
+                self.trip.save()
+            self.assertEqual(AuditEvent.objects.count(), before)
+        self.assertEqual(len(self._inserts(ctx.captured_queries)), 1)
+
+        entries = AuditEvent.objects.order_by('-pk')[:2]
+        self.assertEqual(
+            {(entry.kind, entry.message) for entry in entries},
+            {(EventKind.CREATED, "Customer 'Ravi' was created"), (EventKind.CHANGED, f"Trip #{self.trip.pk} was cancelled")},
+        )
+        self.assertEqual(entries[0].user, self.admin)
+        self.assertIn(customer.pk, {entry.object_id for entry in entries})
+
+    def test_changes_are_diffed_against_the_loaded_values(self):
+        trip = Trip.objects.get(pk=self.trip.pk)
+        old_remarks = trip.remarks
+        trip.remarks = 'Pick up at the airport'
+        trip.total_price += 100
+        with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+            trip.save()
+        # The row is not read back to compute the diff.
+        self.assertFalse([query for query in ctx.captured_queries if query['sql'].startswith('SELECT "trips_trip"')])
+
+        event = AuditEvent.objects.latest('pk')
+        self.assertEqual(event.changes['remarks'], [old_remarks, 'Pick up at the airport'])
+        self.assertEqual(set(event.changes), {'remarks', 'total_price'})
+
+        # A second save of the same instance diffs against the first.
+        trip.status = Trip.TripStatus.ON_GOING
+        with self.captureOnCommitCallbacks(execute=True):
+            trip.save()
+        self.assertEqual(set(AuditEvent.objects.latest('pk').changes), {'status'})
+
+    def test_object_pages_show_their_timeline(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            trip = Trip.objects.get(pk=self.trip.pk)
+            trip.remarks = 'Timeline entry'
+            trip.save()
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('trip_update', args=[trip.pk]))
+        self.assertContains(response, 'Timeline entry')
+        self.assertEqual(response.context['history'][0].object_id, trip.pk)
+
+        response = self.client.get(reverse('customer_update', args=[trip.customer_id]))
+        self.assertEqual(response.context['history'], [])
+
+    def test_rolled_back_events_are_dropped(self):
+        before = AuditEvent.objects.count()
+        with audit_batch(), self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Customer.objects.create(name='Ghost', phone='8000000002')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(AuditEvent.objects.count(), before)
+
+    def test_deletions_and_anonymous_changes(self):
+        customer = Customer.objects.create(name='Sita', phone='8000000003')
+        with self.captureOnCommitCallbacks(execute=True):
+            customer.delete()
+        entry = AuditEvent.objects.latest('pk')
+        self.assertEqual((entry.kind, entry.message), (EventKind.DELETED, "Customer 'Sita' was deleted"))
+
+        set_current_user(None)
+        before = AuditEvent.objects.count()
+        with self.captureOnCommitCallbacks(execute=True):
+            Customer.objects.create(name='Anon', phone='8000000004')
+        self.assertEqual(AuditEvent.objects.count(), before)
+
+
+class AuditArchiveTests(SeededDataMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(archive_dir.cleanup)
+        archive_settings = override_settings(AUDIT_ARCHIVE_DIR=archive_dir.name, AUDIT_RETENTION_DAYS=90)
+        archive_settings.enable()
+        self.addCleanup(archive_settings.disable)
+
+        entries = list(AuditEvent.objects.order_by('pk'))
+        self.old = entries[:5]
+        for months_ago, entry in enumerate(self.old, start=4):
+            entry.action_time = timezone.now() - timedelta(days=31 * months_ago)
+            entry.save(update_fields=['action_time'])
+
+    def test_prune_moves_old_entries_into_monthly_archives(self):
+        total = AuditEvent.objects.count()
+        out = io.StringIO()
+        call_command('prune_audit_log', '--batch-size', '2', stdout=out)
+        self.assertEqual(AuditEvent.objects.count(), total - len(self.old))
+        self.assertFalse(AuditEvent.objects.filter(pk__in=[entry.pk for entry in self.old]).exists())
+        self.assertIn(f'Archived {len(self.old)} audit log entries', out.getvalue())
+
+        months = {entry.action_time.strftime('%Y-%m') for entry in self.old}
+        self.assertEqual(archive.archived_months(), sorted(months))
+        self.assertEqual([record['id'] for record in archive.search()], [entry.pk for entry in reversed(self.old)])
+
+        # Nothing left to move; a second run is a no-op.
+        self.assertEqual(archive.prune(), 0)
+
+    def test_search_filters_archived_entries(self):
+        archive.prune()
+        trip_type = f'{Trip._meta.app_label}.{Trip._meta.model_name}'
+        target = next(entry for entry in self.old if entry.content_type.model_class() is Trip)
+        matches = list(archive.search(model=trip_type, object_id=target.object_id))
+        self.assertEqual([record['id'] for record in matches], [target.pk])
+        self.assertEqual(matches[0]['message'], target.message)
+
+        month = target.action_time.strftime('%Y-%m')
+        self.assertTrue(all(record['action_time'].startswith(month)
+                            for record in archive.search(first_month=month, last_month=month)))
+        self.assertEqual(list(archive.search(text='no such message')), [])
+
+    def test_prune_also_moves_expired_admin_log_entries(self):
+        old = LogEntry.objects.create(
+            user=self.admin, content_type=ContentType.objects.get_for_model(Customer), object_id='1',
+            object_repr='Customer 1', action_flag=ADDITION, change_message='[{"added": {}}]',
+        )
+        LogEntry.objects.filter(pk=old.pk).update(action_time=timezone.now() - timedelta(days=200))
+        recent = LogEntry.objects.create(
+            user=self.admin, content_type=ContentType.objects.get_for_model(Customer), object_id='2',
+            object_repr='Customer 2', action_flag=ADDITION,
+        )
+
+        self.assertEqual(archive.prune(), len(self.old) + 1)
+        self.assertEqual(list(LogEntry.objects.values_list('pk', flat=True)), [recent.pk])
+        record = next(record for record in archive.search() if record['id'] == f'admin:{old.pk}')
+        self.assertEqual((record['kind'], record['object_repr']), (EventKind.CREATED, 'Customer 1'))
+
+    def test_repeated_batches_are_read_once(self):
+        archive.prune()
+        path = archive.archive_paths(archive.archived_months()[0])[0]
+        shutil.copy(path, path.with_name(path.name.replace('.jsonl.gz', '9.jsonl.gz')))
+        self.assertEqual(len(list(archive.search())), len(self.old))
+
+    def test_failed_write_keeps_the_rows_and_the_archives_intact(self):
+        archive.prune(batch_size=2)
+        # A later entry whose segment never makes it to disk.
+        entry = AuditEvent.objects.order_by('-action_time').first()
+        AuditEvent.objects.filter(pk=entry.pk).update(action_time=timezone.now() - timedelta(days=100))
+        with mock.patch('auditing.archive.os.replace', side_effect=OSError('No space left on device')):
+            with self.assertRaises(OSError):
+                archive.prune()
+        self.assertTrue(AuditEvent.objects.filter(pk=entry.pk).exists())
+        self.assertEqual(list(Path(settings.AUDIT_ARCHIVE_DIR).glob('*.part')), [])
+        self.assertEqual(len(list(archive.search())), len(self.old))
+
+        self.assertEqual(archive.prune(), 1)
+        self.assertEqual(len(list(archive.search())), len(self.old) + 1)
+
+
+class CurrentUserMiddlewareTests(SimpleTestCase):
+    def _request(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        return request
+
+    def test_sync_requests_see_their_user(self):
+        seen = []
+
+        def view(request):
+            seen.append(get_current_user())
+            return HttpResponse()
+
+        middleware = CurrentUserMiddleware(view)
+        self.assertFalse(iscoroutinefunction(middleware))
+        middleware(self._request('ravi'))
+        self.assertEqual(seen, ['ravi'])
+        self.assertIsNone(get_current_user())
+
+    async def test_concurrent_async_requests_keep_their_own_user(self):
+        seen = {}
+
+        async def view(request):
+            await asyncio.sleep(0)  # let the other request set its user
+            seen[request.user] = get_current_user()
+            return HttpResponse()
+
+        middleware = CurrentUserMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        await asyncio.gather(*(middleware(self._request(user)) for user in ('ravi', 'sita', 'anil')))
+        self.assertEqual(seen, {'ravi': 'ravi', 'sita': 'sita', 'anil': 'anil'})
+        self.assertIsNone(get_current_user())
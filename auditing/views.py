@@ -1,41 +1,108 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
 from django.shortcuts import render
 from django.contrib.auth.decorators import user_passes_test
-from django.contrib.admin.models import LogEntry
 from django.db.models import Q
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth import get_user_model
 
+from core.dates import filter_by_days, parse_day
+from .models import AuditEvent, EventKind
+from .writer import registered_models
+
 User = get_user_model()
 
+LOG_PAGE_SIZE = 50
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
 
 def is_admin(user):
     return user.is_superuser
 
 
+def encode_cursor(entry):
+    """Opaque page cursor for the position of ``entry`` in ``(action_time, id)`` order."""
+    return f"{(entry.action_time - EPOCH) // timedelta(microseconds=1)}-{entry.pk}"
+
+
+def decode_cursor(value):
+    """Returns the ``(action_time, id)`` of a cursor, or ``None`` when it is missing or malformed."""
+    try:
+        micros, pk = (int(part) for part in (value or '').split('-'))
+    except ValueError:
+        return None
+    return EPOCH + timedelta(microseconds=micros), pk
+
+
+def _int_or_none(value):
+    return int(value) if value and value.isdigit() else None
+
+
 @user_passes_test(is_admin)
 def action_log_view(request):
-    # Get content type for User model
-    user_content_type = ContentType.objects.get_for_model(User)
+    """
+    One page of the audit log, newest first. Pages are addressed by a
+    keyset cursor on ``(action_time, id)`` rather than an offset, and every
+    filter is an equality or range on an indexed column, so a page costs
+    the same however large the table grows.
+    """
+    user_id = _int_or_none(request.GET.get('user'))
+    content_type_id = _int_or_none(request.GET.get('model'))
+    kind = _int_or_none(request.GET.get('kind'))
+    start_date_str = request.GET.get('start_date')
+    end_date_str = request.GET.get('end_date')
 
-    # Fetch all log entries, getting related user and content type for efficiency
-    all_logs = LogEntry.objects.select_related('user', 'content_type').all().order_by('-action_time')
+    logs = AuditEvent.objects.select_related('user', 'content_type')
+    if user_id:
+        logs = logs.filter(user_id=user_id)
+    if content_type_id:
+        logs = logs.filter(content_type_id=content_type_id)
+    if kind in EventKind.values:
+        logs = logs.filter(kind=kind)
+    logs = filter_by_days(logs, 'action_time', parse_day(start_date_str), parse_day(end_date_str))
 
-    # Filter for session logs (login/logout) - these are logged against User model
-    session_logs = all_logs.filter(
-        content_type=user_content_type,
-        change_message__icontains='logged'
-    )
+    # "before" pages towards older entries, "after" back towards newer ones;
+    # one row beyond the page tells whether there is anything further.
+    before = decode_cursor(request.GET.get('before'))
+    after = decode_cursor(request.GET.get('after')) if before is None else None
+    if after is not None:
+        time, pk = after
+        rows = list(logs.filter(Q(action_time__gt=time) | Q(action_time=time, pk__gt=pk))
+                    .order_by('action_time', 'pk')[:LOG_PAGE_SIZE + 1])
+        has_newer = len(rows) > LOG_PAGE_SIZE
+        page = rows[:LOG_PAGE_SIZE][::-1]
+        has_older = True
+    else:
+        if before is not None:
+            time, pk = before
+            logs = logs.filter(Q(action_time__lt=time) | Q(action_time=time, pk__lt=pk))
+        rows = list(logs.order_by('-action_time', '-pk')[:LOG_PAGE_SIZE + 1])
+        page = rows[:LOG_PAGE_SIZE]
+        has_older = len(rows) > LOG_PAGE_SIZE
+        has_newer = before is not None
 
-    # Get all non-user model logs (Trip, Customer, Vendor, Vehicle actions)
-    action_logs = all_logs.exclude(content_type=user_content_type)
+    # Filter choices come from small tables: the users, and the models the
+    # audit log covers (content types are cached per process).
+    models = [User, *registered_models()]
+    content_types = sorted(ContentType.objects.get_for_models(*models).values(), key=lambda ct: ct.name)
 
-    print(f"Total logs: {all_logs.count()}")
-    print(f"Session logs: {session_logs.count()}")
-    print(f"Action logs: {action_logs.count()}")
+    filters = request.GET.copy()
+    for key in ('before', 'after'):
+        filters.pop(key, None)
 
     context = {
-        'action_logs': action_logs,
-        'session_logs': session_logs,
+        'logs': page,
+        'older_cursor': encode_cursor(page[-1]) if page and has_older else None,
+        'newer_cursor': encode_cursor(page[0]) if page and has_newer else None,
+        'filter_query': filters.urlencode(),
+        'users': User.objects.order_by('username').only('pk', 'username'),
+        'content_types': content_types,
+        'kinds': EventKind.choices,
+        'selected_user': user_id,
+        'selected_model': content_type_id,
+        'selected_kind': kind,
+        'start_date': start_date_str,
+        'end_date': end_date_str,
         'title': 'User Action Logs'
     }
-    return render(request, 'auditing/log_list.html', context)
\ No newline at end of file
+    return render(request, 'auditing/log_list.html', context)
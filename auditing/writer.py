@@ -0,0 +1,184 @@
+"""
+Buffered writer for the audit log.
+
+Models are audited by calling ``register()`` once, which connects a
+``post_save`` and a ``post_delete`` receiver for them. Events are not
+written as they happen: each one is held until its transaction commits
+(and dropped if it rolls back), then queued for the current request.
+``CurrentUserMiddleware`` wraps every request in ``audit_batch()`` (or
+``async_audit_batch()`` under an async chain), so all the events of a
+request go out in one bulk INSERT once the response is ready. Outside a
+batch, e.g. in management commands, an event is written as soon as its
+transaction commits.
+
+Changes carry a field-level diff against the values the instance was
+loaded with. ``register()`` has the model keep those values as it is
+read from the database, so no extra query is needed to compute it.
+"""
+import logging
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .local_user import get_current_user
+from .models import AuditEvent, EventKind
+
+logger = logging.getLogger(__name__)
+
+# Events of the innermost open batch; a context variable, like the current
+# user, so concurrent async requests each collect their own.
+_batch = ContextVar('audit_batch', default=None)
+_registry = {}
+
+
+def _current_batch():
+    return _batch.get()
+
+
+def _queue(event):
+    batch = _current_batch()
+    if batch is None:
+        _write([event])
+    else:
+        batch.append(event)
+
+
+def _write(events):
+    try:
+        AuditEvent.objects.bulk_create(events)
+    except Exception:
+        # Auditing must never turn a completed request into an error.
+        logger.exception("Could not write %d audit events", len(events))
+
+
+def record(user, instance, kind, message, changes=None):
+    """Queues an audit event of ``kind`` (an ``EventKind``) by ``user`` about ``instance``."""
+    event = AuditEvent(
+        action_time=timezone.now(),
+        user_id=user.pk,
+        kind=kind,
+        content_type=ContentType.objects.get_for_model(instance, for_concrete_model=False),
+        object_id=instance.pk,
+        object_repr=str(instance)[:200],
+        message=message,
+        changes=changes,
+    )
+    transaction.on_commit(lambda: _queue(event))
+
+
+@contextmanager
+def audit_batch():
+    """Collects the events committed inside the block and writes them together on exit."""
+    entries = []
+    token = _batch.set(entries)
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+        if entries:
+            _write(entries)
+
+
+@asynccontextmanager
+async def async_audit_batch():
+    """``audit_batch()`` for async code; the insert runs in a worker thread."""
+    entries = []
+    token = _batch.set(entries)
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+        if entries:
+            await sync_to_async(_write)(entries)
+
+
+def _default_label(instance):
+    return f"{instance._meta.verbose_name.title()} '{instance}'"
+
+
+def _keep_loaded_values(model):
+    from_db = model.from_db
+
+    def keeping_from_db(cls, db, field_names, values):
+        instance = from_db.__func__(cls, db, field_names, values)
+        instance._audit_loaded = dict(zip(field_names, values))
+        return instance
+
+    model.from_db = classmethod(keeping_from_db)
+
+
+def _audited_fields(model):
+    # Timestamps maintained by Django change on every save and say nothing.
+    return [
+        field.attname for field in model._meta.concrete_fields
+        if not field.primary_key and not getattr(field, 'auto_now', False)
+    ]
+
+
+def register(model, label=_default_label, change_verb=None):
+    """
+    Audits creation, changes and deletion of ``model`` by the current user.
+    ``label(instance)`` names the object in the log messages and
+    ``change_verb(instance)`` may replace "updated" for particular changes.
+    """
+    _registry[model] = label, change_verb, _audited_fields(model)
+    _keep_loaded_values(model)
+    post_save.connect(_log_save, sender=model, dispatch_uid=f'audit_save_{model._meta.label}')
+    post_delete.connect(_log_delete, sender=model, dispatch_uid=f'audit_delete_{model._meta.label}')
+
+
+def diff(instance, fields):
+    """``{field: [old, new]}`` of the loaded ``fields`` whose value has changed since loading."""
+    loaded = getattr(instance, '_audit_loaded', None)
+    if not loaded:
+        return None
+    changes = {}
+    for attname in fields:
+        if attname in loaded:
+            old, new = loaded[attname], getattr(instance, attname)
+            if old != new:
+                changes[attname] = [old, new]
+    return changes
+
+
+def _log_save(sender, instance, created, raw=False, **kwargs):
+    label, change_verb, fields = _registry[sender]
+    user = get_current_user()
+    if not raw and user and user.is_authenticated:
+        if created:
+            kind, verb, changes = EventKind.CREATED, 'created', None
+        else:
+            kind, verb = EventKind.CHANGED, (change_verb and change_verb(instance)) or 'updated'
+            changes = diff(instance, fields)
+        record(user, instance, kind, f"{label(instance)} was {verb}", changes)
+    # Later saves of the same instance are diffed against this one.
+    instance._audit_loaded = {attname: instance.__dict__[attname] for attname in fields if attname in instance.__dict__}
+
+
+def _log_delete(sender, instance, **kwargs):
+    user = get_current_user()
+    if not (user and user.is_authenticated):
+        return
+    label, _, _ = _registry[sender]
+    record(user, instance, EventKind.DELETED, f"{label(instance)} was deleted")
+
+
+def registered_models():
+    """Models audited through ``register()``."""
+    return list(_registry)
+
+
+def history(instance, limit=50):
+    """The latest ``limit`` audit events of ``instance``, newest first, from one indexed lookup."""
+    return list(
+        AuditEvent.objects.filter(
+            content_type=ContentType.objects.get_for_model(instance, for_concrete_model=False),
+            object_id=instance.pk,
+        ).select_related('user').order_by('-action_time', '-id')[:limit]
+    )
@@ -1,3 +1,42 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.urls import reverse
 
-# Create your tests here.
+from core.testing import QueryBudgetTestCase
+
+
+class AuthenticationViewQueryBudgetTests(QueryBudgetTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.staff = User.objects.filter(is_superuser=False).order_by('pk').first()
+
+    def test_login(self):
+        self.assertQueryBudget(reverse('login'), 0)
+
+    def test_logout(self):
+        self.assertQueryBudget(reverse('logout'), 5)
+
+    def test_admin_index(self):
+        self.assertQueryBudget(reverse('admin:index'), 3)
+
+    def test_create_staff(self):
+        self.assertQueryBudget(reverse('create_staff'), 2)
+
+    def test_user_list(self):
+        self.assertQueryBudget(reverse('user_list'), 4)
+
+    def test_user_list_api(self):
+        self.assertQueryBudget(reverse('user_list_api'), 4)
+
+    def test_user_update(self):
+        self.assertQueryBudget(reverse('user_update', args=[self.staff.pk]), 5)
+
+    def test_user_delete(self):
+        self.assertQueryBudget(reverse('user_delete', args=[self.staff.pk]), 3)
+
+    def test_admin_reset_password(self):
+        self.assertQueryBudget(reverse('admin_reset_password', args=[self.staff.pk]), 3)
+
+    def test_profile(self):
+        self.assertQueryBudget(reverse('profile'), 3)
@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     path('create-staff/', views.create_staff_view, name='create_staff'),
     path('users/', views.user_list_view, name='user_list'),
+    path('users/api/list/', views.user_list_api, name='user_list_api'),
     path('users/<int:pk>/update/', views.user_update_view, name='user_update'),
     path('users/<int:pk>/delete/', views.user_delete_view, name='user_delete'),
     path('users/<int:pk>/reset-password/', views.admin_reset_password_view, name='admin_reset_password'),
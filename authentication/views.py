@@ -3,6 +3,8 @@ from django.contrib.auth.models import User
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import permission_required, login_required, user_passes_test
 from django.contrib import messages
+
+from core.listing import ListEngine, list_json_response
 from .forms import StaffUserCreationForm, StaffUserChangeForm, AdminPasswordResetForm
 
 
@@ -28,16 +30,32 @@ def create_staff_view(request):
     return render(request, 'authentication/user_form.html', context)
 
 
+def _user_list_page(request):
+    engine = ListEngine(
+        User.objects.prefetch_related('groups'),
+        sort_fields={'username': 'username', 'email': 'email', 'date_joined': 'date_joined'},
+        default_sort='username',
+        search_fields=('username', 'first_name', 'last_name', 'email'),
+    )
+    return engine.paginate(request.GET)
+
+
 @permission_required('auth.view_user', raise_exception=True)
 def user_list_view(request):
-    users = User.objects.all().order_by('username')
+    page = _user_list_page(request)
     context = {
-        'users': users,
+        'page': page,
+        'users': page.rows,
         'title': 'User Management'
     }
     return render(request, 'authentication/user_list.html', context)
 
 
+@permission_required('auth.view_user', raise_exception=True)
+def user_list_api(request):
+    return list_json_response(request, _user_list_page(request), 'authentication/user_rows.html')
+
+
 @permission_required('auth.change_user', raise_exception=True)
 def user_update_view(request, pk):
     user = get_object_or_404(User, pk=pk)
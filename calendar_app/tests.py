@@ -1,3 +1,27 @@
-from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
 
-# Create your tests here.
+from core.testing import QueryBudgetTestCase
+
+
+class CalendarViewQueryBudgetTests(QueryBudgetTestCase):
+    def test_calendar(self):
+        self.assertQueryBudget(reverse('calendar'), 3)
+
+    def test_calendar_day_api(self):
+        day = timezone.localdate(self.trip.trip_date)
+        self.assertQueryBudget(reverse('calendar_day_api') + f'?date={day.isoformat()}', 3)
+
+    def test_calendar_day_api_lists_the_days_trips(self):
+        self.client.force_login(self.admin)
+        day = timezone.localdate(self.trip.trip_date)
+        response = self.client.get(reverse('calendar_day_api'), {'date': day.isoformat()})
+        trip = next(row for row in response.json()['trips'] if row['id'] == self.trip.pk)
+        self.assertEqual(trip['customer'], self.trip.customer.name)
+        self.assertEqual(trip['vendor'], self.trip.vehicle.vendor.name)
+
+    def test_calendar_day_api_rejects_bad_dates(self):
+        self.client.force_login(self.admin)
+        for value in ['', 'yesterday', '2026-02-30']:
+            response = self.client.get(reverse('calendar_day_api'), {'date': value})
+            self.assertEqual(response.status_code, 400)
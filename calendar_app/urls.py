@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path('', views.calendar_view, name='calendar'),
+    path('api/day/', views.calendar_day_api, name='calendar_day_api'),
 ]
\ No newline at end of file
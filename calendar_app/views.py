@@ -2,9 +2,13 @@ import calendar
 from datetime import date
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from django.db.models.functions import TruncDate  # Corrected from TruncDay
-from django.db.models import Count
-from trips.models import Trip
+from django.http import JsonResponse
+from django.utils import timezone
+from core.dates import filter_by_days, month_bounds, parse_day
+from trips.models import DailyTripStats, Trip
+
+# Trips listed in a day's popover; the rest are summarised as a count.
+DAY_DETAIL_LIMIT = 50
 
 
 @login_required
@@ -17,35 +21,13 @@ def calendar_view(request):
         year = today.year
         month = today.month
 
-    # Get all trips for the given month and year
-    trips_in_month = Trip.objects.filter(trip_date__year=year, trip_date__month=month).select_related('customer',
-                                                                                                      'vehicle',
-                                                                                                      'vehicle__vendor')
-
-    # Group by date and get the count with trip details
-    daily_trip_counts = (
-        trips_in_month.annotate(date_only=TruncDate('trip_date'))
-        .values('date_only')
-        .annotate(count=Count('id'))
-        .values('date_only', 'count')
-    )
-
-    # Convert to dictionary {day: count}
-    trip_counts = {item['date_only'].day: item['count'] for item in daily_trip_counts}
-
-    # Get trip details for tooltips
-    trip_details = {}
-    for trip in trips_in_month:
-        day = trip.trip_date.day
-        if day not in trip_details:
-            trip_details[day] = []
-        trip_details[day].append({
-            'customer': trip.customer.name,
-            'vehicle': str(trip.vehicle),
-            'vendor': trip.vehicle.vendor.name,
-            'status': trip.get_status_display(),
-            'id': trip.id
-        })
+    # The whole grid comes from one narrow query on the daily rollup as a
+    # dictionary {day: count}; trip details are fetched per day on demand
+    # from calendar_day_api.
+    daily_stats = filter_by_days(DailyTripStats.objects, 'date', *month_bounds(year, month)).filter(
+        total_trips__gt=0
+    ).values_list('date', 'total_trips')
+    trip_counts = {day.day: count for day, count in daily_stats}
 
     # Generate calendar grid
     cal = calendar.Calendar()
@@ -75,7 +57,6 @@ def calendar_view(request):
         'current_year': year,
         'current_month': month,
         'trip_counts': trip_counts,
-        'trip_details': trip_details,
         'prev_month': prev_month,
         'next_month': next_month,
         'today': date.today(),
@@ -86,3 +67,34 @@ def calendar_view(request):
     }
     return render(request, 'calendar/calendar.html', context)
 
+
+
+@login_required
+def calendar_day_api(request):
+    """Projected trip details for one calendar day, for the day popovers."""
+    day = parse_day(request.GET.get('date'))
+    if day is None:
+        return JsonResponse({'error': 'A valid date (YYYY-MM-DD) is required.'}, status=400)
+
+    trips = list(
+        filter_by_days(Trip.objects, 'trip_date', day, day)
+        .order_by('trip_date', 'pk')
+        .values('id', 'trip_date', 'status', 'customer__name', 'vehicle__number', 'vehicle__type',
+                'vehicle__vendor__name')[:DAY_DETAIL_LIMIT + 1]
+    )
+    statuses = dict(Trip.TripStatus.choices)
+    return JsonResponse({
+        'date': day.isoformat(),
+        'trips': [
+            {
+                'id': trip['id'],
+                'time': timezone.localtime(trip['trip_date']).strftime('%H:%M'),
+                'customer': trip['customer__name'],
+                'vehicle': f"{trip['vehicle__number']} - {trip['vehicle__type']}",
+                'vendor': trip['vehicle__vendor__name'],
+                'status': statuses.get(trip['status'], trip['status']),
+            }
+            for trip in trips[:DAY_DETAIL_LIMIT]
+        ],
+        'has_more': len(trips) > DAY_DETAIL_LIMIT,
+    })
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ConfigurationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'configuration'
+
+    def ready(self):
+        # Connects the cache invalidation signals
+        import configuration.signals
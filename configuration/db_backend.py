@@ -1,16 +1,95 @@
+import smtplib
+import threading
+import time
+
 from django.core.mail.backends.smtp import EmailBackend as SmtpEmailBackend
 from .models import SiteConfiguration
 
 
+class SmtpConnectionPool:
+    """
+    Keeps authenticated SMTP sessions alive between sends.
+
+    Connections are keyed by everything that identifies a session (host,
+    port, credentials and TLS/SSL mode), so changing the site settings
+    naturally stops old sessions from being reused; they are closed the next
+    time the pool is touched.
+    """
+
+    def __init__(self, max_idle=4, idle_timeout=60):
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._idle = {}
+
+    def acquire(self, key):
+        """Returns a live idle connection for ``key`` or ``None``."""
+        stale = []
+        candidate = None
+        now = time.monotonic()
+        with self._lock:
+            for other_key in list(self._idle):
+                if other_key != key:
+                    stale.extend(conn for conn, _ in self._idle.pop(other_key))
+            idle = self._idle.get(key, [])
+            while idle:
+                conn, released_at = idle.pop()
+                if now - released_at > self.idle_timeout:
+                    stale.append(conn)
+                    continue
+                candidate = conn
+                break
+        for conn in stale:
+            self._quit(conn)
+        if candidate is not None and self._is_alive(candidate):
+            return candidate
+        if candidate is not None:
+            self._quit(candidate)
+        return None
+
+    def release(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append((conn, time.monotonic()))
+                return
+        self._quit(conn)
+
+    def clear(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn, _ in connections:
+                self._quit(conn)
+
+    @staticmethod
+    def _is_alive(conn):
+        try:
+            return conn.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    @staticmethod
+    def _quit(conn):
+        try:
+            conn.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.close()
+
+
+smtp_pool = SmtpConnectionPool()
+
+
 class DbEmailBackend(SmtpEmailBackend):
     def __init__(self, fail_silently=False, **kwargs):
         # First, let the parent class initialize with any default
         # or settings.py values.
         super().__init__(fail_silently=fail_silently, **kwargs)
 
-        # Now, get our configuration from the database
+        # Now, get our configuration from the process-level cache, which
+        # only goes to the database when the settings changed or expired.
         try:
-            config = SiteConfiguration.get_solo()
+            config = SiteConfiguration.get_cached()
 
             # Override the connection attributes with our database values
             # only if they have been set in the admin.
@@ -28,4 +107,25 @@ class DbEmailBackend(SmtpEmailBackend):
         except SiteConfiguration.DoesNotExist:
             # If the config object hasn't been created in the admin yet,
             # just use the default settings and don't raise an error.
-            pass
\ No newline at end of file
+            pass
+
+    def _pool_key(self):
+        return (self.host, self.port, self.username, self.password, self.use_tls, self.use_ssl)
+
+    def open(self):
+        if self.connection:
+            return False
+        # Reuse an authenticated session from an earlier send when possible;
+        # otherwise the parent connects, negotiates TLS and logs in.
+        self.connection = smtp_pool.acquire(self._pool_key())
+        if self.connection is not None:
+            return True
+        return super().open()
+
+    def close(self):
+        if self.connection is None:
+            return
+        # Hand the session back to the pool instead of sending QUIT.
+        with self._lock:
+            connection, self.connection = self.connection, None
+            smtp_pool.release(self._pool_key(), connection)
@@ -1,6 +1,18 @@
+import threading
+import time
+
 from django.db import models
 from solo.models import SingletonModel
 
+# Seconds a process keeps its copy of the settings. Saves made in this
+# process clear it immediately; other worker processes pick them up once
+# their copy expires.
+CACHE_TTL = 60
+
+_cache_lock = threading.Lock()
+_cached_config = None
+_cached_at = 0.0
+
 class SiteConfiguration(SingletonModel):
     email_host = models.CharField(max_length=100, blank=True, null=True, help_text="e.g., smtp.gmail.com")
     email_port = models.PositiveIntegerField(default=587, help_text="e.g., 587 for TLS")
@@ -12,5 +24,24 @@ class SiteConfiguration(SingletonModel):
     def __str__(self):
         return "Site Configuration"
 
+    @classmethod
+    def get_cached(cls):
+        """
+        Returns the singleton from a process-level cache, reading the database
+        at most once per ``CACHE_TTL`` seconds.
+        """
+        global _cached_config, _cached_at
+        with _cache_lock:
+            if _cached_config is None or time.monotonic() - _cached_at > CACHE_TTL:
+                _cached_config = cls.get_solo()
+                _cached_at = time.monotonic()
+            return _cached_config
+
+    @classmethod
+    def clear_cached(cls):
+        global _cached_config
+        with _cache_lock:
+            _cached_config = None
+
     class Meta:
         verbose_name = "Site Configuration"
\ No newline at end of file
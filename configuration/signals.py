@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .db_backend import smtp_pool
+from .models import SiteConfiguration
+
+
+@receiver(post_save, sender=SiteConfiguration)
+@receiver(post_delete, sender=SiteConfiguration)
+def clear_site_configuration_cache(sender, **kwargs):
+    """Drops the cached settings and any SMTP sessions opened with the old ones."""
+    SiteConfiguration.clear_cached()
+    smtp_pool.clear()
@@ -1,3 +1,74 @@
+import smtplib
+from unittest import mock
+
+from django.core.mail import EmailMessage
 from django.test import TestCase
+from django.urls import reverse
+
+from core.testing import QueryBudgetTestCase
+from .db_backend import DbEmailBackend, smtp_pool
+from .models import SiteConfiguration
+
+
+class ConfigurationViewQueryBudgetTests(QueryBudgetTestCase):
+    def test_site_settings(self):
+        self.assertQueryBudget(reverse('site_settings'), 3)
+
+
+class DbEmailBackendTests(TestCase):
+
+    def setUp(self):
+        SiteConfiguration.clear_cached()
+        smtp_pool.clear()
+        config = SiteConfiguration.get_solo()
+        config.email_host = 'smtp.example.com'
+        config.email_port = 587
+        config.email_host_user = 'user@example.com'
+        config.email_host_password = 'secret'
+        config.email_use_tls = True
+        config.save()
+        self.addCleanup(smtp_pool.clear)
+
+    def _send(self, to):
+        EmailMessage('Subject', 'Body', 'noreply@example.com', [to], connection=DbEmailBackend()).send()
+
+    def test_configuration_is_read_once_per_process(self):
+        DbEmailBackend()
+        with self.assertNumQueries(0):
+            backend = DbEmailBackend()
+            DbEmailBackend()
+        self.assertEqual(backend.host, 'smtp.example.com')
+
+    def test_saving_settings_invalidates_cached_configuration(self):
+        DbEmailBackend()
+        config = SiteConfiguration.get_solo()
+        config.email_host = 'mail.example.org'
+        config.save()
+        self.assertEqual(DbEmailBackend().host, 'mail.example.org')
+
+    @mock.patch('django.core.mail.backends.smtp.smtplib.SMTP')
+    def test_authenticated_connection_is_reused_across_sends(self, smtp_class):
+        smtp_class.return_value.noop.return_value = (250, b'OK')
+        for n in range(3):
+            self._send(f'to{n}@example.com')
+        smtp_class.assert_called_once()
+        smtp_class.return_value.login.assert_called_once_with('user@example.com', 'secret')
+        self.assertEqual(smtp_class.return_value.sendmail.call_count, 3)
+        smtp_class.return_value.quit.assert_not_called()
+
+    @mock.patch('django.core.mail.backends.smtp.smtplib.SMTP')
+    def test_dead_or_outdated_connections_are_rebuilt(self, smtp_class):
+        smtp_class.return_value.noop.side_effect = smtplib.SMTPServerDisconnected()
+        self._send('first@example.com')
+        self._send('second@example.com')
+        self.assertEqual(smtp_class.call_count, 2)
 
-# Create your tests here.
+        smtp_class.reset_mock()
+        smtp_class.return_value.noop.side_effect = None
+        smtp_class.return_value.noop.return_value = (250, b'OK')
+        config = SiteConfiguration.get_solo()
+        config.email_host = 'mail.example.org'
+        config.save()
+        self._send('third@example.com')
+        smtp_class.assert_called_once()
+        self.assertEqual(smtp_class.call_args.args[:2], ('mail.example.org', 587))
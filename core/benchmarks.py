@@ -0,0 +1,201 @@
+"""
+Query-plan benchmark for the hot list, dashboard and lookup queries.
+
+Each query shape is run twice against a large seeded dataset: once as a
+baseline, with the tuned indexes dropped and the older lookups in place
+(``district__iexact``, ``trip_date__date`` casts), and once with the
+indexes as migrated and the current lookups. The report shows both query
+plans and the median timings side by side. Run it through
+``python manage.py benchmark_queries``; ``--keep-indexes`` runs the
+baseline with the indexes present to isolate the cost of the lookup form.
+"""
+import random
+import statistics
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+from typing import Callable
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from customers.models import Customer
+from trips.models import Trip
+from vehicles.models import Vehicle
+from vendors.models import Vendor, normalize_district
+from .dates import filter_by_days
+
+BENCH_PREFIX = 'bench-'
+DISTRICTS = ['Guntur', 'Krishna', 'Visakhapatnam', 'Nellore', 'Prakasam', 'Kurnool',
+             'Chittoor', 'Kadapa', 'Anantapur', 'East Godavari', 'West Godavari', 'Srikakulam']
+
+# Indexes whose effect the benchmark measures; the baseline run drops them.
+TUNED_INDEXES = {
+    Trip: ['trip_status_date_idx', 'trip_status_created_idx', 'trip_date_idx', 'trip_created_idx'],
+    Customer: ['customer_created_idx'],
+    Vendor: ['vendor_district_name_idx', 'vendor_name_idx'],
+    Vehicle: ['vehicle_created_idx', 'vehicle_type_vendor_idx'],
+}
+
+
+@dataclass
+class QueryShape:
+    name: str
+    # Called with ``baseline=True`` for the pre-index form of the query.
+    build: Callable
+
+
+def _district_filter(prefix, district, baseline):
+    if baseline:
+        return {f'{prefix}district__iexact': district}
+    return {f'{prefix}district_key': normalize_district(district)}
+
+
+def _report_range(first_day, last_day, baseline):
+    trips = Trip.objects.values('pk', 'trip_date', 'total_price')
+    if baseline:
+        return trips.filter(trip_date__date__gte=first_day, trip_date__date__lte=last_day)
+    return filter_by_days(trips, 'trip_date', first_day, last_day)
+
+
+def query_shapes():
+    # Counts and aggregates in the views drop the default ordering, so the
+    # shapes standing in for them do too.
+    now = timezone.now()
+    today = timezone.localdate(now)
+    district = DISTRICTS[1].upper()
+    return [
+        QueryShape('dashboard upcoming count', lambda baseline: Trip.objects.filter(
+            trip_date__gte=now, status=Trip.TripStatus.UPCOMING).order_by().values('pk')),
+        QueryShape('dashboard period revenue', lambda baseline: Trip.objects.filter(
+            created_at__gte=now - timedelta(days=30), status=Trip.TripStatus.COMPLETED,
+        ).order_by().values('total_price', 'vendor_price')),
+        QueryShape('dashboard period chart', lambda baseline: Trip.objects.filter(
+            created_at__gte=now - timedelta(days=7)).order_by().values('created_at')),
+        QueryShape('dashboard latest trips', lambda baseline: Trip.objects.order_by('-created_at')[:5]),
+        QueryShape('calendar month', lambda baseline: Trip.objects.filter(
+            trip_date__gte=now, trip_date__lt=now + timedelta(days=31))),
+        QueryShape('report date range', lambda baseline: _report_range(
+            today - timedelta(days=30), today, baseline)),
+        QueryShape('calendar day details', lambda baseline: _report_range(today, today, baseline)),
+        QueryShape('trip list first page', lambda baseline: Trip.objects.order_by('-trip_date', '-pk')[:26]),
+        QueryShape('customer list first page', lambda baseline: Customer.objects.order_by('-created_at', '-pk')[:26]),
+        QueryShape('vendors by district', lambda baseline: Vendor.objects.filter(
+            **_district_filter('', district, baseline)).order_by('name').values('id', 'name')),
+        QueryShape('vehicles by district and type', lambda baseline: Vehicle.objects.filter(
+            type=Vehicle.VehicleType.SUV, **_district_filter('vendor__', district, baseline))),
+    ]
+
+
+def clear_seed():
+    # Raw deletes skip the per-row signal handlers (rollup, dashboard), which
+    # the bulk-created rows never went through either; the querysets are
+    # listed in dependency order since nothing cascades.
+    for queryset in [
+        Trip.objects.filter(customer__name__startswith=BENCH_PREFIX),
+        Vehicle.objects.filter(vendor__name__startswith=BENCH_PREFIX),
+        Customer.objects.filter(name__startswith=BENCH_PREFIX),
+        Vendor.objects.filter(name__startswith=BENCH_PREFIX),
+    ]:
+        queryset._raw_delete(queryset.db)
+
+
+def seed(trips, batch_size=2000):
+    """Bulk-inserts ``trips`` trips plus proportional vendors, vehicles and customers."""
+    rng = random.Random(42)
+    now = timezone.now()
+    vendor_count = max(trips // 500, len(DISTRICTS))
+    with transaction.atomic():
+        vendors = Vendor.objects.bulk_create([
+            Vendor(name=f'{BENCH_PREFIX}vendor-{i}', district=DISTRICTS[i % len(DISTRICTS)],
+                   district_key=normalize_district(DISTRICTS[i % len(DISTRICTS)]), area=f'Area {i}')
+            for i in range(vendor_count)
+        ], batch_size=batch_size)
+        vehicle_types = [choice for choice, _ in Vehicle.VehicleType.choices]
+        vehicles = Vehicle.objects.bulk_create([
+            Vehicle(number=f'BN{i:08d}', type=vehicle_types[i % len(vehicle_types)], make='Toyota',
+                    model='Innova', vendor=vendors[i % vendor_count])
+            for i in range(vendor_count * 10)
+        ], batch_size=batch_size)
+        customers = Customer.objects.bulk_create([
+            Customer(name=f'{BENCH_PREFIX}customer-{i}', phone=f'B{i:09d}')
+            for i in range(max(trips // 4, 1))
+        ], batch_size=batch_size)
+        statuses = [choice for choice, _ in Trip.TripStatus.choices]
+        for start in range(0, trips, batch_size):
+            Trip.objects.bulk_create([
+                Trip(customer=rng.choice(customers), vehicle=rng.choice(vehicles),
+                     trip_date=now + timedelta(days=rng.randint(-365, 60), minutes=rng.randint(0, 1439)),
+                     status=rng.choice(statuses), total_price=Decimal('3000.00'),
+                     vendor_price=Decimal('2400.00'), advance_paid=Decimal('500.00'))
+                for _ in range(start, min(start + batch_size, trips))
+            ])
+        # auto_now_add stamps every row with the same instant; spread the
+        # creation times out so created_at ranges are selective.
+        Trip.objects.filter(customer__name__startswith=BENCH_PREFIX).update(
+            created_at=F('trip_date') - timedelta(days=7))
+        Customer.objects.filter(name__startswith=BENCH_PREFIX).update(
+            created_at=now - timedelta(days=400))
+    analyze()
+
+
+def analyze():
+    """Refreshes the planner statistics after a bulk load."""
+    tables = [model._meta.db_table for model in TUNED_INDEXES]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(f"ANALYZE TABLE {', '.join(tables)}")
+            cursor.fetchall()
+        elif connection.vendor == 'postgresql':
+            for table in tables:
+                cursor.execute(f'ANALYZE {table}')
+        elif connection.vendor == 'sqlite':
+            cursor.execute('ANALYZE')
+
+
+def _indexes(model):
+    by_name = {index.name: index for index in model._meta.indexes}
+    return [by_name[name] for name in TUNED_INDEXES[model]]
+
+
+def drop_tuned_indexes():
+    with connection.schema_editor() as editor:
+        for model in TUNED_INDEXES:
+            for index in _indexes(model):
+                editor.remove_index(model, index)
+
+
+def restore_tuned_indexes():
+    with connection.schema_editor() as editor:
+        for model in TUNED_INDEXES:
+            for index in _indexes(model):
+                editor.add_index(model, index)
+
+
+def measure(queryset, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        list(queryset.all())
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), queryset.explain()
+
+
+def run(shapes, repeat, drop_indexes=True):
+    """Returns ``{shape name: {'baseline': (ms, plan), 'indexed': (ms, plan)}}``."""
+    results = {shape.name: {} for shape in shapes}
+    if drop_indexes:
+        drop_tuned_indexes()
+    try:
+        analyze()
+        for shape in shapes:
+            results[shape.name]['baseline'] = measure(shape.build(baseline=True), repeat)
+    finally:
+        if drop_indexes:
+            restore_tuned_indexes()
+    analyze()
+    for shape in shapes:
+        results[shape.name]['indexed'] = measure(shape.build(baseline=False), repeat)
+    return results
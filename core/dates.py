@@ -0,0 +1,59 @@
+"""
+Index-friendly date range filtering.
+
+Filters such as ``trip_date__date__gte`` wrap the column in a ``DATE()``
+cast, which keeps MySQL from using any index on it. The helpers here turn
+inclusive day bounds into half-open ``[start, end)`` ranges on the raw
+column instead: aware datetimes at local midnight for ``DateTimeField``
+columns and plain dates for ``DateField`` columns.
+"""
+from datetime import date, datetime, time, timedelta
+
+from django.db import models
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+
+def day_start(day):
+    """Aware datetime of local midnight at the start of ``day``."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def day_bounds(day):
+    """Returns the aware ``[start, end)`` datetimes of a local calendar day."""
+    start = day_start(day)
+    return start, day_start(day + timedelta(days=1))
+
+
+def parse_day(value):
+    """Parses a ``YYYY-MM-DD`` string, returning ``None`` when it is missing or invalid."""
+    try:
+        return parse_date(value or '')
+    except ValueError:
+        return None
+
+
+def filter_by_days(queryset, field, first_day=None, last_day=None):
+    """
+    Filters ``queryset`` to rows whose ``field`` falls on ``first_day``
+    through ``last_day``, both inclusive. Either bound may be ``None``.
+    """
+    model_field = queryset.model._meta.get_field(field)
+    is_datetime = isinstance(model_field, models.DateTimeField)
+
+    def lower_bound(day):
+        return day_start(day) if is_datetime else day
+
+    filters = {}
+    if first_day is not None:
+        filters[f'{field}__gte'] = lower_bound(first_day)
+    if last_day is not None:
+        filters[f'{field}__lt'] = lower_bound(last_day + timedelta(days=1))
+    return queryset.filter(**filters)
+
+
+def month_bounds(year, month):
+    """First and last day of a month."""
+    first = date(year, month, 1)
+    following = (first + timedelta(days=32)).replace(day=1)
+    return first, following - timedelta(days=1)
@@ -0,0 +1,182 @@
+"""
+Server-side list engine shared by the management list pages.
+
+Rows are paged with keyset (seek) pagination: each page is fetched with a
+``WHERE (sort_col, id) > (last_value, last_id)`` style condition instead of
+an OFFSET, so the cost of a page stays flat however deep the user pages and
+however large the table grows.
+"""
+import base64
+import binascii
+import datetime
+import json
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import JsonResponse
+from django.template.loader import render_to_string
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+
+@dataclass
+class ListPage:
+    rows: list
+    sort: str
+    query: str
+    page_size: int
+    next_cursor: str = None
+    previous_cursor: str = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        # isoformat() keeps microseconds, which auto_now columns rely on for
+        # an exact seek position.
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(value, pk):
+    raw = json.dumps([_encode_value(value), pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Returns ``(value, pk)`` or ``None`` when the cursor is malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return value, int(pk)
+    except (ValueError, TypeError, binascii.Error):
+        return None
+
+
+class ListEngine:
+    """
+    Keyset paginator with column sorting and text search over a queryset.
+
+    ``sort_fields`` maps the public column names accepted in ``?sort=`` to
+    ORM lookups, e.g. ``{'customer': 'customer__name'}``. Sort columns must
+    be non-nullable; the primary key is always added as a tie-breaker so
+    the seek position is unique.
+    """
+
+    def __init__(self, queryset, sort_fields, default_sort, search_fields=(),
+                 page_size=DEFAULT_PAGE_SIZE):
+        self.queryset = queryset
+        self.model = queryset.model
+        self.sort_fields = sort_fields
+        self.default_sort = default_sort
+        self.search_fields = search_fields
+        self.page_size = page_size
+
+    def _resolve_field(self, lookup):
+        model = self.model
+        parts = lookup.split('__')
+        for part in parts[:-1]:
+            model = model._meta.get_field(part).related_model
+        return model._meta.get_field(parts[-1])
+
+    def _parse_sort(self, sort):
+        descending = sort.startswith('-')
+        key = sort.lstrip('-')
+        if key not in self.sort_fields:
+            return self._parse_sort(self.default_sort)
+        return key, descending
+
+    def _seek_filter(self, lookup, value, pk, forward):
+        op = 'gt' if forward else 'lt'
+        return Q(**{f'{lookup}__{op}': value}) | Q(**{lookup: value, f'pk__{op}': pk})
+
+    def _search(self, queryset, query):
+        if not query or not self.search_fields:
+            return queryset
+        condition = Q()
+        for lookup in self.search_fields:
+            condition |= Q(**{f'{lookup}__icontains': query})
+        return queryset.filter(condition)
+
+    def paginate(self, params):
+        """Builds a :class:`ListPage` from request query parameters."""
+        key, descending = self._parse_sort(params.get('sort') or self.default_sort)
+        sort = f"-{key}" if descending else key
+        lookup = self.sort_fields[key]
+        query = (params.get('q') or '').strip()
+
+        try:
+            page_size = min(int(params.get('page_size', self.page_size)), MAX_PAGE_SIZE)
+        except ValueError:
+            page_size = self.page_size
+        page_size = max(page_size, 1)
+
+        queryset = self._search(self.queryset, query)
+
+        after = decode_cursor(params['after']) if params.get('after') else None
+        before = decode_cursor(params['before']) if params.get('before') and not after else None
+        cursor = after or before
+        if cursor is not None:
+            try:
+                value = self._resolve_field(lookup).to_python(cursor[0])
+            except ValidationError:
+                value = None
+            if value is None:
+                cursor = before = None
+
+        # Walking backwards means seeking in the opposite direction and
+        # flipping the rows back afterwards.
+        backwards = before is not None
+        ascending = descending == backwards
+        prefix = '' if ascending else '-'
+        queryset = queryset.order_by(f'{prefix}{lookup}', f'{prefix}pk')
+        if cursor is not None:
+            queryset = queryset.filter(self._seek_filter(lookup, value, cursor[1], ascending))
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if backwards:
+            rows.reverse()
+
+        def cursor_for(row):
+            value = row
+            for part in lookup.split('__'):
+                value = getattr(value, part)
+            return encode_cursor(value, row.pk)
+
+        page = ListPage(rows=rows, sort=sort, query=query, page_size=page_size)
+        if rows:
+            if (has_more and not backwards) or (backwards and cursor is not None):
+                page.next_cursor = cursor_for(rows[-1])
+            if (has_more and backwards) or (not backwards and cursor is not None):
+                page.previous_cursor = cursor_for(rows[0])
+        return page
+
+
+def list_json_response(request, page, rows_template, context=None):
+    """
+    Serialises a page for the list tables: the rows are rendered with the
+    same partial the HTML page uses, so both paths share one row layout.
+    """
+    row_context = {'page': page, **(context or {})}
+    return JsonResponse({
+        'html': render_to_string(rows_template, row_context, request=request),
+        'count': len(page.rows),
+        'sort': page.sort,
+        'q': page.query,
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    })
@@ -0,0 +1,100 @@
+"""
+HTTP load test for the trip form's lookup endpoints.
+
+Opens ``concurrency`` keep-alive connections to a running server and has
+each of them send requests back to back until ``requests`` have been made
+in total, recording the latency of every one. It needs nothing beyond the
+standard library, so the same run can be pointed at the WSGI deployment
+and at ``Taxi_Managment.asgi`` served by an ASGI server to compare their
+requests per second and tail latency. Run it through
+``python manage.py loadtest_lookups``.
+"""
+import asyncio
+import statistics
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+# The lookups the trip form fires on every filter change.
+DEFAULT_PATHS = [
+    '/vendors/api/by-district/?district=Guntur',
+    '/vehicles/api/by-vendor/?district=Guntur&type=SUV',
+    '/vehicles/api/search/?q=AP&district=Guntur',
+    '/trips/api/trips-feed/',
+]
+
+
+@dataclass
+class Result:
+    latencies: list = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def requests_per_second(self):
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, percent):
+        """Latency in milliseconds below which ``percent`` of the requests finished."""
+        if len(self.latencies) < 2:
+            return self.latencies[0] * 1000 if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100, method='inclusive')[percent - 1] * 1000
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = None
+    for line in head.split(b'\r\n')[1:]:
+        name, _, value = line.partition(b':')
+        if name.strip().lower() == b'content-length':
+            length = int(value.strip())
+    if length is None:
+        # Without a length the server closes the connection after the body.
+        await reader.read()
+        return status, False
+    await reader.readexactly(length)
+    return status, True
+
+
+async def _client(base, path, headers, remaining, result):
+    reader = writer = None
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {base.netloc}\r\nConnection: keep-alive\r\n{headers}\r\n"
+    ).encode()
+    try:
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            if writer is None:
+                reader, writer = await asyncio.open_connection(base.hostname, base.port or 80)
+            started = time.perf_counter()
+            try:
+                writer.write(request)
+                await writer.drain()
+                status, keep_alive = await _read_response(reader)
+            except (OSError, asyncio.IncompleteReadError):
+                result.errors += 1
+                writer.close()
+                writer = None
+                continue
+            result.latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                result.errors += 1
+            if not keep_alive:
+                writer.close()
+                writer = None
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def run(base_url, path, requests, concurrency, cookie=None):
+    """Sends ``requests`` GETs for ``path`` over ``concurrency`` connections."""
+    base = urlsplit(base_url)
+    headers = f"Cookie: {cookie}\r\n" if cookie else ''
+    result = Result()
+    remaining = [requests]
+    started = time.perf_counter()
+    await asyncio.gather(*(_client(base, path, headers, remaining, result) for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - started
+    return result
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+
+from core import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a large dataset and prints the query plans and median timings of the hot "
+        "dashboard, list and lookup queries, with and without the tuned indexes. "
+        "Run it against a scratch copy of the database: the baseline run drops and "
+        "re-creates indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--trips', type=int, default=100000,
+                            help='Number of trips to seed (vendors, vehicles and customers scale with it).')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Executions per query; the median is reported.')
+        parser.add_argument('--keep', action='store_true',
+                            help='Leave the seeded rows in place for further runs.')
+        parser.add_argument('--keep-indexes', action='store_true',
+                            help='Run the baseline with the indexes in place, comparing only the lookup forms.')
+        parser.add_argument('--reuse', action='store_true',
+                            help='Benchmark rows seeded by an earlier --keep run instead of seeding again.')
+
+    def handle(self, *args, **options):
+        if not options['reuse']:
+            benchmarks.clear_seed()
+            self.stdout.write(f"Seeding {options['trips']} trips...")
+            benchmarks.seed(options['trips'])
+        try:
+            shapes = benchmarks.query_shapes()
+            results = benchmarks.run(shapes, options['repeat'], drop_indexes=not options['keep_indexes'])
+        finally:
+            if not options['keep']:
+                benchmarks.clear_seed()
+
+        self.stdout.write(f"\n{'query':<32} {'baseline ms':>12} {'indexed ms':>12} {'speed-up':>9}")
+        for shape in shapes:
+            before, _ = results[shape.name]['baseline']
+            after, _ = results[shape.name]['indexed']
+            speedup = before / after if after else float('inf')
+            self.stdout.write(f"{shape.name:<32} {before:>12.2f} {after:>12.2f} {speedup:>8.1f}x")
+
+        for shape in shapes:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{shape.name}"))
+            for label in ('baseline', 'indexed'):
+                self.stdout.write(f"  {label}:")
+                for line in results[shape.name][label][1].splitlines():
+                    self.stdout.write(f"    {line}")
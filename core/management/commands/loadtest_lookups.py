@@ -0,0 +1,41 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import loadtest
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-tests the trip form's lookup endpoints on one or more running servers and prints "
+        "requests per second and p50/p99 latency for each. Point one --target at the WSGI "
+        "deployment and another at Taxi_Managment.asgi under an ASGI server to compare them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', required=True, metavar='NAME=URL',
+                            help='Server to test, e.g. wsgi=http://127.0.0.1:8000; repeatable.')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Endpoint path with query string; repeatable. Defaults to the trip form lookups.')
+        parser.add_argument('--requests', type=int, default=5000, help='Requests per endpoint and target.')
+        parser.add_argument('--concurrency', type=int, default=200, help='Simultaneous connections.')
+        parser.add_argument('--cookie', help='Cookie header to send, e.g. sessionid=... for login-only endpoints.')
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['target']:
+            name, _, url = target.partition('=')
+            if not url.startswith('http://'):
+                raise CommandError(f"Expected NAME=http://host:port, got {target!r}")
+            targets.append((name, url))
+
+        self.stdout.write(f"{'target':<10} {'endpoint':<52} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for path in options['paths'] or loadtest.DEFAULT_PATHS:
+            for name, url in targets:
+                result = asyncio.run(loadtest.run(
+                    url, path, options['requests'], options['concurrency'], options['cookie'],
+                ))
+                self.stdout.write(
+                    f"{name:<10} {path:<52} {result.requests_per_second:>9.1f} {result.percentile(50):>8.1f} "
+                    f"{result.percentile(99):>8.1f} {result.errors:>7}"
+                )
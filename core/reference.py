@@ -0,0 +1,62 @@
+"""
+Cached reference data for the form and list pages.
+
+The district list, the vehicle types and the package price map change far
+less often than the pages that show them are loaded, so they are built
+together and kept in the Django cache, with the price map already
+serialized for the trip form's script. ``core.signals`` drops the cached
+copy after any change to a vendor or package is committed, so a page
+normally gets all of it without a query.
+
+With a cache shared between processes (Redis, Memcached) that reaches
+every worker at once. The default per-process cache only drops the copy
+of the worker that made the change, so entries also expire after
+``REFERENCE_TTL``, bounding how long another worker can show an old
+district list or package price.
+"""
+import json
+from dataclasses import dataclass
+
+from django.core.cache import cache
+
+from trips.models import Package
+from vehicles.models import Vehicle
+from vendors.models import Vendor
+
+# Bumped whenever ReferenceData changes shape, so processes running the old
+# code never unpickle the new layout (or the other way round).
+REFERENCE_VERSION = 1
+CACHE_KEY = f'core:reference:v{REFERENCE_VERSION}'
+REFERENCE_TTL = 300
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    districts: tuple
+    vehicle_types: tuple
+    # Package id (as a string) -> base charges (as a string).
+    package_prices: dict
+    package_prices_json: str
+
+
+def build_reference_data():
+    package_prices = {str(pk): str(charges) for pk, charges in Package.objects.values_list('id', 'charges')}
+    return ReferenceData(
+        districts=tuple(Vendor.objects.values_list('district', flat=True).distinct().order_by('district')),
+        vehicle_types=tuple(Vehicle.VehicleType.choices),
+        package_prices=package_prices,
+        package_prices_json=json.dumps(package_prices),
+    )
+
+
+def get_reference_data():
+    """Returns the cached reference data, building it on a miss."""
+    data = cache.get(CACHE_KEY)
+    if data is None:
+        data = build_reference_data()
+        cache.set(CACHE_KEY, data, REFERENCE_TTL)
+    return data
+
+
+def invalidate_reference_data():
+    cache.delete(CACHE_KEY)
@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from trips.models import Package
+from vendors.models import Vendor
+from .reference import invalidate_reference_data
+
+
+@receiver([post_save, post_delete], sender=Vendor)
+@receiver([post_save, post_delete], sender=Package)
+def drop_reference_data(sender, **kwargs):
+    # Wait for the commit so a concurrent page cannot cache the old rows again.
+    transaction.on_commit(invalidate_reference_data)
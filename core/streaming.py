@@ -0,0 +1,79 @@
+"""
+Building blocks for large downloads streamed with ``StreamingHttpResponse``.
+
+Rows are read in keyset-paged chunks rather than with ``QuerySet.iterator()``
+because MySQLdb buffers the whole result set client side; each chunk is a
+short indexed query, so memory stays flat however many rows are exported.
+"""
+import io
+
+from django.db.models import Q
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """Pseudo-buffer whose ``write()`` returns the value, for ``csv.writer``."""
+
+    def write(self, value):
+        return value
+
+
+class ChunkBuffer(io.RawIOBase):
+    """
+    Write-only, non-seekable sink that collects bytes until drained.
+
+    ``zipfile`` falls back to data descriptors when it cannot seek, so an
+    archive written here can be sent to the client piece by piece.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._offset = 0
+        self.pending = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._offset += len(data)
+        self.pending += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        self.pending = 0
+        return data
+
+
+def _keyset(row, field):
+    if isinstance(row, dict):
+        return row[field], row['pk']
+    return getattr(row, field), row.pk
+
+
+def iterate_in_chunks(queryset, field, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields the rows of ``queryset`` ordered by ``(field, pk)``, fetching
+    ``chunk_size`` rows per query. Rows may be model instances or the dicts
+    of a ``values()`` queryset; dicts must include ``field`` and ``'pk'`` so
+    each chunk can seek past the previous one.
+    """
+    queryset = queryset.order_by(field, 'pk')
+    last = None
+    while True:
+        chunk = queryset
+        if last is not None:
+            chunk = chunk.filter(Q(**{f'{field}__gt': last[0]}) | Q(**{field: last[0], 'pk__gt': last[1]}))
+        rows = list(chunk[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last = _keyset(rows[-1], field)
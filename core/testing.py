@@ -0,0 +1,129 @@
+"""
+Shared test fixtures and the per-app query-budget tests.
+
+``SeededDataMixin`` gives a test case a small dataset of every kind the
+views display. ``QueryBudgetTestCase`` requests each view twice: once
+against that dataset and once after it has been grown several times over.
+The number of SQL queries must be identical on both runs and stay within
+the view's budget, so an N+1 introduced anywhere fails the suite
+immediately.
+"""
+import itertools
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import Group, User
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from auditing.models import AuditEvent, EventKind
+from customers.models import Customer
+from trips.models import Package, Rating, Trip
+from vehicles.models import Vehicle
+from vendors.models import Vendor
+
+DISTRICTS = ['Guntur', 'Krishna', 'Visakhapatnam']
+STATUSES = [choice for choice, _ in Trip.TripStatus.choices]
+
+_sequence = itertools.count(1)
+
+
+def seed_dataset(size):
+    """
+    Creates ``size`` rows of every kind the views display: vendors with
+    vehicles, customers, packages, trips spread over the current month in
+    every status, ratings for completed trips and audit log entries.
+    """
+    now = timezone.now()
+    admin = User.objects.filter(is_superuser=True).first()
+    staff_group, _ = Group.objects.get_or_create(name='Staff')
+    for i in range(size):
+        n = next(_sequence)
+        vendor = Vendor.objects.create(name=f'Vendor {n}', district=DISTRICTS[n % len(DISTRICTS)], area=f'Area {n}')
+        vehicle = Vehicle.objects.create(
+            number=f'AP{n:06d}', type=Vehicle.VehicleType.choices[n % 5][0],
+            make='Toyota', model='Innova', vendor=vendor,
+        )
+        customer = Customer.objects.create(
+            name=f'Customer {n}', phone=f'9{n:09d}', email=f'customer{n}@example.com',
+            from_location='Guntur', to_location='Vijayawada',
+        )
+        package = Package.objects.create(
+            name=f'Package {n}', vehicle_type=vehicle.type, vehicle_model='Innova',
+            charges=Decimal('2500.00'), extra_charge_per_km=Decimal('12.00'),
+        )
+        trip = Trip.objects.create(
+            customer=customer, vehicle=vehicle, package=package if n % 2 else None,
+            trip_date=now + timedelta(days=n % 5, hours=n % 7),
+            status=STATUSES[i % len(STATUSES)],
+            total_price=Decimal('3000.00'), vendor_price=Decimal('2400.00'),
+            advance_paid=Decimal('500.00'), additional_distance=Decimal('10.00'),
+        )
+        if trip.status == Trip.TripStatus.COMPLETED:
+            Rating.objects.create(trip=trip, vendor=vendor, stars=1 + n % 5)
+        user = User.objects.create_user(f'staff{n}', f'staff{n}@example.com')
+        user.groups.add(staff_group)
+        if admin is not None:
+            AuditEvent.objects.create(
+                action_time=now, user=admin, kind=EventKind.CREATED,
+                content_type=ContentType.objects.get_for_model(Trip), object_id=trip.pk,
+                object_repr=str(trip), message=f'Trip #{trip.pk} was created',
+            )
+            AuditEvent.objects.create(
+                action_time=now, user=user, kind=EventKind.LOGIN,
+                content_type=ContentType.objects.get_for_model(User), object_id=user.pk,
+                object_repr=str(user), message='User logged in from IP address: 127.0.0.1',
+            )
+
+
+class SeededDataMixin:
+    """
+    Seeds ``small_size`` rows of everything with ``seed_dataset`` for a
+    ``TestCase``, with a superuser as ``admin`` and the first ``trip``,
+    ``package`` and ``completed_trip``.
+    """
+    small_size = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com')
+        seed_dataset(cls.small_size)
+        cls.trip = Trip.objects.order_by('pk').first()
+        cls.package = Package.objects.order_by('pk').first()
+        cls.completed_trip = Trip.objects.filter(status=Trip.TripStatus.COMPLETED).order_by('pk').first()
+
+
+class QueryBudgetTestCase(SeededDataMixin, TestCase):
+    large_size = 12
+
+    def _count_queries(self, url):
+        # Views such as logout end the session, so log in again every time.
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertLess(response.status_code, 400, f'GET {url} returned {response.status_code}')
+        return len(ctx.captured_queries), ctx.captured_queries
+
+    def assertQueryBudget(self, url, budget):
+        """
+        Asserts ``url`` stays within ``budget`` queries and that the count
+        does not change when the dataset grows.
+        """
+        # The first hit may populate lazily created rows and process caches
+        # (the SiteConfiguration singleton, ContentType lookups), so it is
+        # not measured.
+        self._count_queries(url)
+        small_count, _ = self._count_queries(url)
+        seed_dataset(self.large_size)
+        large_count, queries = self._count_queries(url)
+        detail = '\n'.join(q['sql'] for q in queries)
+        self.assertEqual(
+            small_count, large_count,
+            f'GET {url} ran {small_count} queries on the small dataset but {large_count} on the '
+            f'large one; the view issues queries per row.\n{detail}'
+        )
+        self.assertLessEqual(large_count, budget, f'GET {url} exceeded its query budget.\n{detail}')
@@ -0,0 +1,34 @@
+"""
+Form widgets shared across the apps.
+"""
+from django import forms
+
+# Most options a typeahead endpoint returns for one query.
+TYPEAHEAD_LIMIT = 20
+
+
+class TypeaheadSelect(forms.Select):
+    """
+    Select for a ``ModelChoiceField`` over a large table. Only the empty
+    choice and the current value are rendered; the page fetches further
+    options from ``url`` (``?q=<prefix>``) as the user types, so the cost
+    of the form does not grow with the table.
+    """
+
+    def __init__(self, url, attrs=None):
+        super().__init__(attrs)
+        self.attrs['data-typeahead-url'] = url
+
+    def optgroups(self, name, value, attrs=None):
+        iterator = self.choices
+        selected = [v for v in value if v not in (None, '')]
+        options = [self.create_option(name, '', iterator.field.empty_label or '', not selected, 0)]
+        try:
+            objects = list(iterator.queryset.filter(pk__in=selected)) if selected else []
+        except (TypeError, ValueError):
+            # A bound form may carry a malformed value; it is reported by
+            # the field's validation, here there is just nothing to show.
+            objects = []
+        for index, obj in enumerate(objects, start=1):
+            options.append(self.create_option(name, obj.pk, iterator.field.label_from_instance(obj), True, index))
+        return [(None, options, 0)]
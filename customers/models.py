@@ -26,4 +26,8 @@ class Customer(models.Model):
         return f"{self.name} - {self.phone}"
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='customer_created_idx'),
+            models.Index(fields=['name'], name='customer_name_idx'),
+        ]
\ No newline at end of file
@@ -1,3 +1,52 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from core.testing import QueryBudgetTestCase
+from .models import Customer
+
+User = get_user_model()
+
+
+class CustomerViewQueryBudgetTests(QueryBudgetTestCase):
+    def test_customer_list(self):
+        self.assertQueryBudget(reverse('customer_list'), 3)
+
+    def test_customer_list_api(self):
+        self.assertQueryBudget(reverse('customer_list_api'), 3)
+
+    def test_customer_add(self):
+        self.assertQueryBudget(reverse('customer_add'), 2)
+
+    def test_customer_update(self):
+        self.assertQueryBudget(reverse('customer_update', args=[self.trip.customer_id]), 4)
+
+    def test_customer_delete(self):
+        self.assertQueryBudget(reverse('customer_delete', args=[self.trip.customer_id]), 3)
+
+    def test_customer_search_api(self):
+        self.assertQueryBudget(reverse('customer_search_api') + '?q=Customer', 3)
+
+
+class CustomerSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.anita = Customer.objects.create(name='Anita Rao', phone='8000000011')
+        cls.anil = Customer.objects.create(name='Anil Kumar', phone='8000000021')
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com')
+
+    def search(self, query):
+        self.client.force_login(self.admin)
+        return self.client.get(reverse('customer_search_api'), {'q': query}).json()
+
+    def test_matches_phone_prefix(self):
+        self.assertEqual(self.search('80000000'), [
+            {'id': self.anita.pk, 'name': 'Anita Rao - 8000000011'},
+            {'id': self.anil.pk, 'name': 'Anil Kumar - 8000000021'},
+        ])
+        self.assertEqual([c['id'] for c in self.search('800000002')], [self.anil.pk])
+
+    def test_matches_name_prefix_ignoring_case(self):
+        self.assertEqual([c['id'] for c in self.search('ani')], [self.anil.pk, self.anita.pk])
+        self.assertEqual([c['id'] for c in self.search('anit')], [self.anita.pk])
+        self.assertEqual(self.search('Rao'), [])
@@ -10,4 +10,6 @@ urlpatterns = [
     path('<int:pk>/update/', views.customer_update_view, name='customer_update'),
     path('<int:pk>/delete/', views.customer_delete_view, name='customer_delete'),
     path('add/ajax/', views.customer_add_ajax_view, name='customer_add_ajax'),
+    path('api/list/', views.customer_list_api, name='customer_list_api'),
+    path('api/search/', views.customer_search_api, name='customer_search_api'),
 ]
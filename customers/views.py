@@ -2,21 +2,56 @@ from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, permission_required
+
+from auditing.writer import history as audit_history
+from core.listing import ListEngine, list_json_response
+from core.widgets import TYPEAHEAD_LIMIT
 from .models import Customer
 from .forms import CustomerForm
 
 
+def _customer_list_page(request):
+    engine = ListEngine(
+        Customer.objects.all(),
+        sort_fields={'name': 'name', 'phone': 'phone', 'created_at': 'created_at'},
+        default_sort='-created_at',
+        search_fields=('name', 'phone', 'email'),
+    )
+    return engine.paginate(request.GET)
+
+
 # This is the list view we already created
 @login_required
 def customer_list_view(request):
-    customers = Customer.objects.all()
+    page = _customer_list_page(request)
     context = {
-        'customers': customers,
+        'page': page,
+        'customers': page.rows,
         'title': 'Customers'
     }
     return render(request, 'customers/customer_list.html', context)
 
 
+@login_required
+def customer_list_api(request):
+    return list_json_response(request, _customer_list_page(request), 'customers/customer_rows.html')
+
+
+@login_required
+def customer_search_api(request):
+    # Typeahead for the trip form: a phone prefix when the query is a
+    # number, otherwise a name prefix. Both are prefix matches on indexed
+    # columns, so a lookup stays cheap however many customers there are.
+    query = request.GET.get('q', '').strip()
+    customers = Customer.objects.all()
+    if query.lstrip('+').isdigit():
+        customers = customers.filter(phone__istartswith=query).order_by('phone')
+    elif query:
+        customers = customers.filter(name__istartswith=query).order_by('name', 'pk')
+    customers = customers.only('pk', 'name', 'phone')[:TYPEAHEAD_LIMIT]
+    return JsonResponse([{'id': c.pk, 'name': str(c)} for c in customers], safe=False)
+
+
 # ADD THIS NEW VIEW
 @login_required
 def customer_add_view(request):
@@ -54,6 +89,7 @@ def customer_update_view(request, pk):
 
     context = {
         'form': form,
+        'history': audit_history(customer),
         'title': 'Update Customer'  # Dynamic title for the template
     }
     return render(request, 'customers/customer_form.html', context)
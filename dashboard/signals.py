@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from customers.models import Customer
+from trips.models import Rating
+from trips.stats import rollup_refreshed
+from vehicles.models import Vehicle
+from vendors.models import Vendor
+from .snapshot import invalidate_snapshots
+
+
+@receiver([post_save, post_delete], sender=Vehicle)
+@receiver([post_save, post_delete], sender=Vendor)
+@receiver([post_save, post_delete], sender=Customer)
+@receiver([post_save, post_delete], sender=Rating)
+def drop_dashboard_snapshots(sender, **kwargs):
+    # Wait for the commit so a concurrent dashboard hit cannot cache the
+    # pre-change numbers again.
+    transaction.on_commit(invalidate_snapshots)
+
+
+@receiver(rollup_refreshed)
+def drop_dashboard_snapshots_after_rollup(sender, **kwargs):
+    # Every trip change refreshes the daily rollup once committed, and the
+    # snapshot reads the rollup, so it is dropped only after the refresh
+    # rather than by a commit hook of its own that could run first.
+    invalidate_snapshots()
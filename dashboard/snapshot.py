@@ -0,0 +1,139 @@
+"""
+Cached dashboard snapshot.
+
+Every widget on the dashboard is computed together, once per ``period``,
+and kept in each process's own cache under a version read from the
+``shared`` cache, which every worker process sees. Once a change to a
+vehicle, vendor, customer or rating commits, and once the trip rollup has
+been refreshed after a change to a trip, ``dashboard.signals`` replaces
+the version, so every worker rebuilds its snapshot on its next hit
+instead of serving the old totals until they expire. A dashboard hit
+normally costs one query beyond the session and user, for the version.
+"""
+import uuid
+from datetime import timedelta
+
+from django.core.cache import cache, caches
+from django.db.models import Avg, Count, Sum
+from django.utils import timezone
+
+from core.dates import filter_by_days
+from customers.models import Customer
+from trips.models import DailyTripStats, Trip
+from vendors.models import Vendor
+
+PERIODS = {
+    'week': "Last 7 Days",
+    'month': "Last 30 Days",
+    'year': "Last 12 Months",
+}
+# Upper bound on how long a snapshot is served; it also limits how stale
+# the time-based "upcoming trips" count can get between changes.
+SNAPSHOT_TTL = 300
+VERSION_KEY = 'dashboard:snapshot:version'
+
+
+def _version():
+    shared = caches['shared']
+    version = shared.get(VERSION_KEY)
+    if version is None:
+        shared.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = shared.get(VERSION_KEY)
+    return version
+
+
+def _cache_key(period, day, version):
+    return f'dashboard:snapshot:{period}:{day.isoformat()}:{version}'
+
+
+def build_snapshot(period):
+    now = timezone.now()
+    today = timezone.localdate(now)
+
+    # --- WIDGET DATA ---
+    total_vendors = Vendor.objects.count()
+    total_customers = Customer.objects.count()
+    upcoming_trips_count = Trip.objects.filter(trip_date__gte=now, status='Upcoming').count()
+
+    # Calculate total agent revenue instead of total price, from the daily rollup
+    total_agent_revenue_agg = DailyTripStats.objects.aggregate(total=Sum('agent_revenue'))
+    total_agent_revenue = total_agent_revenue_agg['total'] or 0.00
+
+    # --- LATEST TRIPS FOR TABLE ---
+    latest_trips = list(Trip.objects.select_related('customer', 'vehicle').order_by('-created_at')[:5])
+
+    # --- TRIPS ANALYTIC CHART DATA ---
+    # Read from the daily rollup: at most a year of rows instead of a
+    # GROUP BY over the trips booked in the period.
+    if period == 'month':
+        start_date = today - timedelta(days=29)
+    elif period == 'year':
+        start_date = today - timedelta(days=365)
+    else:  # Default to 'week'
+        start_date = today - timedelta(days=6)
+
+    period_stats = list(
+        filter_by_days(DailyTripStats.objects, 'date', start_date, today).values_list(
+            'date', 'created_trips', 'created_agent_revenue')
+    )
+
+    if period == 'year':
+        data_map = {}
+        for day, created, _ in period_stats:
+            key = day.strftime('%Y-%m')
+            data_map[key] = data_map.get(key, 0) + created
+        month_range = [(now - timedelta(days=30 * i)) for i in range(11, -1, -1)]
+        chart_labels = [date.strftime('%b %Y') for date in month_range]
+        trip_series_data = [data_map.get(date.strftime('%Y-%m'), 0) for date in month_range]
+    else:
+        data_map = {day: created for day, created, _ in period_stats}
+        date_range = [start_date + timedelta(days=i) for i in range((today - start_date).days + 1)]
+        chart_labels = [date.strftime('%b %d') for date in date_range]
+        trip_series_data = [data_map.get(date, 0) for date in date_range]
+
+    # Period revenue is the Agent Revenue of the completed trips booked in the period
+    period_revenue = sum((revenue for _, _, revenue in period_stats), 0) or 0.00
+
+    sales_chart_options = {
+        "series": [{"name": "Trips Created", "data": trip_series_data}],
+        "chart": {"height": 350, "type": 'area', "toolbar": {"show": False}},
+        "dataLabels": {"enabled": False},
+        "stroke": {"curve": 'smooth', "width": 2},
+        "xaxis": {"categories": chart_labels},
+        "colors": ['#3e60d5'],
+        "tooltip": {"x": {"format": 'dd MMM yyyy'}},
+    }
+
+    # --- TOP 5 VENDOR LIST DATA ---
+    top_vendors = list(Vendor.objects.annotate(
+        average_rating=Avg('ratings__stars'),
+        num_ratings=Count('ratings')
+    ).filter(average_rating__isnull=False).order_by('-average_rating', '-num_ratings')[:5])
+
+    return {
+        "total_vendors": total_vendors, "total_customers": total_customers,
+        "upcoming_trips_count": upcoming_trips_count,
+        "total_revenue": f"{total_agent_revenue:,.2f}",  # This now represents agent revenue
+        "latest_trips": latest_trips,
+        "sales_chart_options": sales_chart_options,
+        "current_period": period, "current_period_display": PERIODS[period],
+        "period_revenue": f"{period_revenue:,.2f}",  # This now represents period agent revenue
+        "top_vendors": top_vendors,
+    }
+
+
+def get_snapshot(period):
+    """Returns the cached snapshot for ``period``, building it on a miss."""
+    if period not in PERIODS:
+        period = 'week'
+    key = _cache_key(period, timezone.localdate(), _version())
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_snapshot(period)
+        cache.set(key, snapshot, SNAPSHOT_TTL)
+    return snapshot
+
+
+def invalidate_snapshots():
+    """Outdates the snapshots of every process; they are rebuilt on their next hit."""
+    caches['shared'].set(VERSION_KEY, uuid.uuid4().hex, None)
@@ -1,3 +1,91 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Sum
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.testing import QueryBudgetTestCase, seed_dataset
+from customers.models import Customer
+from trips import stats
+from trips.models import DailyTripStats, Trip
+from . import snapshot
+
+
+class DashboardQueryBudgetTests(QueryBudgetTestCase):
+    def _count_queries(self, url):
+        # Budget the snapshot build; cache hits are covered below.
+        cache.clear()
+        return super()._count_queries(url)
+
+    def test_dashboard(self):
+        self.assertQueryBudget(reverse('dashboard'), 10)
+
+    def test_dashboard_month(self):
+        self.assertQueryBudget(reverse('dashboard') + '?period=month', 10)
+
+    def test_dashboard_year(self):
+        self.assertQueryBudget(reverse('dashboard') + '?period=year', 10)
+
+
+class DashboardSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com')
+        seed_dataset(2)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def test_cached_snapshot_needs_only_its_version(self):
+        self.client.get(reverse('dashboard'))
+        # Session, user and the shared snapshot version.
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['total_customers'], 2)
+
+    def test_changes_drop_the_snapshot(self):
+        self.assertEqual(self.client.get(reverse('dashboard')).context['total_customers'], 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            customer = Customer.objects.create(name='New', phone='8000000001')
+        self.assertEqual(self.client.get(reverse('dashboard')).context['total_customers'], 3)
+
+        upcoming = self.client.get(reverse('dashboard')).context['upcoming_trips_count']
+        trip = Trip.objects.order_by('pk').first()
+        with self.captureOnCommitCallbacks(execute=True):
+            Trip.objects.create(customer=customer, vehicle=trip.vehicle, trip_date=timezone.now() + timedelta(days=2),
+                                total_price=Decimal('1000.00'))
+        self.assertEqual(self.client.get(reverse('dashboard')).context['upcoming_trips_count'], upcoming + 1)
+
+    def test_vehicle_changes_drop_the_snapshot(self):
+        vehicle = self.client.get(reverse('dashboard')).context['latest_trips'][0].vehicle
+        with self.captureOnCommitCallbacks(execute=True):
+            vehicle.number = 'AP39ZZ0001'
+            vehicle.save()
+        latest = self.client.get(reverse('dashboard')).context['latest_trips']
+        self.assertIn('AP39ZZ0001', [trip.vehicle.number for trip in latest])
+
+    def test_other_processes_see_the_new_version(self):
+        self.client.get(reverse('dashboard'))
+        Customer.objects.create(name='New', phone='8000000001')
+        # Stands in for the commit hook of another worker process, which
+        # shares only the version with this one.
+        cache_key = snapshot._cache_key('week', timezone.localdate(), snapshot._version())
+        self.assertIsNotNone(cache.get(cache_key))
+        snapshot.invalidate_snapshots()
+        self.assertEqual(self.client.get(reverse('dashboard')).context['total_customers'], 3)
 
-# Create your tests here.
+    def test_rollup_refresh_drops_the_snapshot(self):
+        self.client.get(reverse('dashboard'))
+        trip = Trip.objects.order_by('pk').first()
+        Trip.objects.filter(pk=trip.pk).update(status=Trip.TripStatus.COMPLETED, total_price=Decimal('5000.00'),
+                                               vendor_price=Decimal('4000.00'))
+        # The rollup's own refresh is what outdates the snapshot, whatever
+        # order the commit hooks run in.
+        stats.refresh_days(stats.days_for(trip))
+        expected = DailyTripStats.objects.aggregate(total=Sum('agent_revenue'))['total']
+        self.assertEqual(self.client.get(reverse('dashboard')).context['total_revenue'], f"{expected:,.2f}")
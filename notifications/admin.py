@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from notifications.models import OutboundEmail
+
+
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+
+admin.site.register(OutboundEmail, OutboundEmailAdmin)
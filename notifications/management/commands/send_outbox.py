@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import MAX_ATTEMPTS, drain_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends queued transactional emails over a single SMTP connection. "
+        "For local testing point the site settings at a debugging server such as "
+        "'python -m aiosmtpd -n -l localhost:1025' with TLS turned off."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='Messages claimed from the outbox per round trip.')
+        parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS,
+                            help='Attempts before a message is marked as failed.')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling the outbox instead of exiting once it is empty.')
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Seconds to sleep between polls when --loop is set.')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = drain_outbox(options['batch_size'], options['max_attempts'])
+            if sent or failed or options['verbosity'] > 1:
+                self.stdout.write(f"Sent {sent} email(s), {failed} failed.")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
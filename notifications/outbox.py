@@ -0,0 +1,147 @@
+"""
+Transactional email outbox.
+
+Views call :func:`queue_mail` instead of ``send_mail`` so the message is
+stored in the same transaction as the booking it belongs to. The
+``send_outbox`` management command later drains the table in batches over a
+single SMTP session, retrying failures with exponential backoff.
+"""
+import logging
+from datetime import timedelta
+
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = timedelta(minutes=1)
+BACKOFF_MAX = timedelta(hours=6)
+# How long a claimed row stays hidden from other workers. A worker that dies
+# mid-batch simply lets its rows become due again once the lease runs out.
+CLAIM_LEASE = timedelta(minutes=10)
+
+
+def queue_mail(subject, message, from_email, recipient_list, html_message=None):
+    """Stores an email in the outbox; takes the same arguments as ``send_mail``."""
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=message or '',
+        html_body=html_message or '',
+        from_email=from_email,
+        recipients=list(recipient_list),
+    )
+
+
+def backoff_delay(attempts):
+    """Delay before retry number ``attempts``: 1, 2, 4, ... minutes, capped."""
+    return min(BACKOFF_BASE * 2 ** max(attempts - 1, 0), BACKOFF_MAX)
+
+
+def claim_batch(batch_size):
+    """Leases up to ``batch_size`` due messages to the calling worker."""
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.Status.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if batch:
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+                next_attempt_at=now + CLAIM_LEASE
+            )
+    return batch
+
+
+def _build_message(email, connection):
+    message = EmailMultiAlternatives(
+        email.subject, email.body, email.from_email, email.recipients, connection=connection
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def _record_failure(email, error, max_attempts):
+    attempts = email.attempts + 1
+    changes = {'attempts': attempts, 'last_error': str(error)[:1000]}
+    if attempts >= max_attempts:
+        changes['status'] = OutboundEmail.Status.FAILED
+    else:
+        changes['next_attempt_at'] = timezone.now() + backoff_delay(attempts)
+    OutboundEmail.objects.filter(pk=email.pk).update(**changes)
+
+
+def deliver_batch(batch, connection, max_attempts=MAX_ATTEMPTS):
+    """
+    Sends claimed messages over an already opened ``connection``.
+    Returns a ``(sent, failed)`` tuple.
+    """
+    sent = failed = 0
+    for email in batch:
+        try:
+            connection.send_messages([_build_message(email, connection)])
+        except Exception as error:
+            logger.warning("Outbox email %s failed: %s", email.pk, error)
+            _record_failure(email, error, max_attempts)
+            failed += 1
+            # The server may have dropped the session; carry on with a new one.
+            # If it cannot be reopened the rest of the batch waits out its lease.
+            connection.close()
+            try:
+                connection.open()
+            except Exception as open_error:
+                logger.error("Could not reconnect to the mail server: %s", open_error)
+                break
+        else:
+            OutboundEmail.objects.filter(pk=email.pk).update(
+                status=OutboundEmail.Status.SENT,
+                sent_at=timezone.now(),
+                attempts=F('attempts') + 1,
+                last_error='',
+            )
+            sent += 1
+    return sent, failed
+
+
+def drain_outbox(batch_size=50, max_attempts=MAX_ATTEMPTS):
+    """
+    Delivers every message that is currently due, reusing one mail
+    connection for all batches. Returns a ``(sent, failed)`` tuple.
+    """
+    sent = failed = 0
+    connection = None
+    try:
+        while True:
+            batch = claim_batch(batch_size)
+            if not batch:
+                break
+            if connection is None:
+                connection = get_connection(fail_silently=False)
+                try:
+                    connection.open()
+                except Exception as error:
+                    # Count the outage as an attempt at the claimed batch so it
+                    # backs off (and eventually fails) rather than waiting out
+                    # its lease; the caller polls again later.
+                    logger.error("Could not connect to the mail server: %s", error)
+                    for email in batch:
+                        _record_failure(email, error, max_attempts)
+                    failed += len(batch)
+                    connection = None
+                    break
+            batch_sent, batch_failed = deliver_batch(batch, connection, max_attempts)
+            sent += batch_sent
+            failed += batch_failed
+            if batch_sent + batch_failed < len(batch):
+                # Reconnecting failed; leave the rest for the next run.
+                break
+    finally:
+        if connection is not None:
+            connection.close()
+    return sent, failed
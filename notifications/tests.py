@@ -0,0 +1,83 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from customers.models import Customer
+from trips.models import Trip
+from vehicles.models import Vehicle
+from vendors.models import Vendor
+from .models import OutboundEmail
+from .outbox import backoff_delay, drain_outbox, queue_mail
+
+
+class OutboxTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com')
+        vendor = Vendor.objects.create(name='Vendor', district='Guntur', area='Area')
+        cls.vehicle = Vehicle.objects.create(number='AP000001', type='SUV', make='Toyota',
+                                             model='Innova', vendor=vendor)
+        cls.customer = Customer.objects.create(name='Customer', phone='9000000001',
+                                               email='customer@example.com')
+
+    def test_trip_add_queues_confirmation_instead_of_sending(self):
+        self.client.force_login(self.admin)
+        trip_date = timezone.localtime() + timedelta(days=2)
+        response = self.client.post(reverse('trip_add'), {
+            'customer': self.customer.pk,
+            'vehicle': self.vehicle.pk,
+            'trip_date': trip_date.strftime('%Y-%m-%dT%H:%M'),
+            'total_price': '3000.00',
+            'advance_paid': '0.00',
+            'status': Trip.TripStatus.UPCOMING,
+        })
+        self.assertRedirects(response, reverse('trip_list'))
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutboundEmail.objects.get()
+        self.assertEqual(queued.recipients, ['customer@example.com'])
+        self.assertIn('Trip Confirmed', queued.subject)
+
+    def test_drain_sends_pending_mail_over_one_connection(self):
+        for n in range(3):
+            queue_mail(f'Subject {n}', '', 'noreply@example.com', [f'to{n}@example.com'],
+                       html_message='<p>Hi</p>')
+
+        self.assertEqual(drain_outbox(batch_size=2), (3, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.Status.SENT).exists())
+
+    def test_failed_send_is_retried_with_backoff_then_given_up(self):
+        email = queue_mail('Subject', 'Body', 'noreply@example.com', ['to@example.com'])
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                        side_effect=OSError('connection refused')):
+            self.assertEqual(drain_outbox(max_attempts=2), (0, 1))
+            email.refresh_from_db()
+            self.assertEqual(email.status, OutboundEmail.Status.PENDING)
+            self.assertEqual(email.attempts, 1)
+            self.assertGreater(email.next_attempt_at, timezone.now())
+
+            # Not due yet, so a second run leaves it alone.
+            self.assertEqual(drain_outbox(max_attempts=2), (0, 0))
+
+            OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+            self.assertEqual(drain_outbox(max_attempts=2), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.Status.FAILED)
+        self.assertEqual(email.last_error, 'connection refused')
+
+    def test_unreachable_mail_server_counts_as_a_failed_attempt(self):
+        email = queue_mail('Subject', 'Body', 'noreply@example.com', ['to@example.com'])
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.open',
+                        side_effect=OSError('connection refused')):
+            self.assertEqual(drain_outbox(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboundEmail.Status.PENDING, 1))
+        self.assertEqual(email.last_error, 'connection refused')
+        self.assertLessEqual(email.next_attempt_at, timezone.now() + backoff_delay(1))
@@ -0,0 +1,53 @@
+"""
+Batch download of trip PDFs as a single ZIP archive.
+
+Trips are read in keyset-paged chunks and their documents rendered in
+parallel by the PDF worker pool (cached files are reused as they are);
+each file is added to the archive as soon as it is ready and the archive
+is streamed out behind it, so neither the trips nor the PDFs of a large
+batch are ever held in memory together.
+"""
+import zipfile
+
+from core.dates import filter_by_days
+from core.streaming import ChunkBuffer, iterate_in_chunks
+from trips.models import Trip
+from .pdf import TRIP_DOCUMENTS, render_trip_pdfs
+
+# Trips fetched per query; also bounds the rendered HTML held at once.
+BATCH_CHUNK_SIZE = 200
+# Largest batch served over HTTP, as a date range and as a document count;
+# bigger batches are left to the batch_trip_pdfs management command.
+MAX_BATCH_DAYS = 31
+MAX_BATCH_DOCUMENTS = 500
+
+
+def batch_trips(first_day=None, last_day=None, vendor_id=None, status=None):
+    """Trips of a batch: a ``trip_date`` range, optionally one vendor and one status."""
+    trips = Trip.objects.with_financials().select_related('customer', 'vehicle', 'vehicle__vendor', 'package')
+    trips = filter_by_days(trips, 'trip_date', first_day, last_day)
+    if vendor_id:
+        trips = trips.filter(vehicle__vendor_id=vendor_id)
+    if status:
+        trips = trips.filter(status=status)
+    return trips
+
+
+def stream_trip_pdfs_zip(trips, kind, progress=None):
+    """
+    Yields the bytes of a ZIP holding the ``kind`` PDF of every trip.
+    ``progress``, when given, is called with the number of documents added
+    so far after each one.
+    """
+    filename = TRIP_DOCUMENTS[kind].filename
+    buffer = ChunkBuffer()
+    # PDFs are already compressed; the fastest level still shrinks their
+    # text streams without holding up the workers.
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        documents = render_trip_pdfs(iterate_in_chunks(trips, 'trip_date', BATCH_CHUNK_SIZE), kind)
+        for done, (trip, path) in enumerate(documents, 1):
+            archive.write(path, filename.format(id=trip.id))
+            if progress is not None:
+                progress(done)
+            yield buffer.drain()
+    yield buffer.drain()
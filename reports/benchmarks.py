@@ -0,0 +1,56 @@
+"""
+Micro-benchmark of per-document PDF rendering.
+
+For each document kind it times, in this process, the Django template
+render and two layouts of the resulting HTML: "cold", parsing the
+stylesheet and building a font configuration for every document as the
+renderer used to, and "warm", through ``pdf_worker.write_pdf`` with the
+setup shared across documents. Run it through
+``python manage.py benchmark_pdfs``.
+"""
+import statistics
+import time
+
+from django.template.loader import get_template
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+
+from . import pdf_worker
+from .pdf import TRIP_DOCUMENTS
+
+DEFAULT_KINDS = ('customer', 'vendor')
+
+
+def _median_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def _write_cold(html):
+    font_config = FontConfiguration()
+    stylesheet = CSS(filename=str(pdf_worker.STYLESHEET), font_config=font_config)
+    return HTML(string=html).write_pdf(stylesheets=[stylesheet], font_config=font_config)
+
+
+def run(trip, kinds=DEFAULT_KINDS, repeat=20):
+    """Returns ``{kind: {'template': ms, 'cold': ms, 'warm': ms}}`` of medians for ``trip``."""
+    pdf_worker.load_stylesheets()
+    results = {}
+    for kind in kinds:
+        document = TRIP_DOCUMENTS[kind]
+        template = get_template(document.template_name)
+        context = {'trip': trip, **document.context_for(trip)}
+        html = template.render(context)
+        # One untimed pass each so imports and lazy caches are warm.
+        _write_cold(html)
+        pdf_worker.write_pdf(html)
+        results[kind] = {
+            'template': _median_ms(lambda: template.render(context), repeat),
+            'cold': _median_ms(lambda: _write_cold(html), repeat),
+            'warm': _median_ms(lambda: pdf_worker.write_pdf(html), repeat),
+        }
+    return results
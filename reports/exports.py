@@ -0,0 +1,103 @@
+"""
+Streaming CSV and XLSX writers for the report exports.
+
+Both take an iterable of rows (lists of plain values) and produce the file
+incrementally. XLSX workbooks are written with the standard library: the
+static package parts go out first and the worksheet is deflated into the
+zip as the rows arrive.
+"""
+import csv
+import re
+import zipfile
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from core.streaming import ChunkBuffer, Echo
+
+# Flush the XLSX buffer to the client once this much output is pending.
+FLUSH_BYTES = 64 * 1024
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+_SPREADSHEET_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_RELATIONSHIP_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_PACKAGE_RELS_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+# Control characters are not allowed anywhere in an XML document.
+_ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def stream_csv(rows):
+    writer = csv.writer(Echo())
+    # The byte order mark makes Excel read the file as UTF-8.
+    yield '\ufeff'
+    for row in rows:
+        yield writer.writerow(['' if value is None else value for value in row])
+
+
+def _column_letter(index):
+    letters = ''
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _cell(reference, value):
+    if value is None or value == '':
+        return ''
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f'<c r="{reference}"><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML.sub('', str(value)))
+    return f'<c r="{reference}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _row(number, values):
+    cells = ''.join(_cell(f'{_column_letter(col)}{number}', value) for col, value in enumerate(values, 1))
+    return f'<row r="{number}">{cells}</row>'
+
+
+def _static_parts(sheet_name):
+    return {
+        '[Content_Types].xml': (
+            f'{_XML_HEADER}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '</Types>'
+        ),
+        '_rels/.rels': (
+            f'{_XML_HEADER}<Relationships xmlns="{_PACKAGE_RELS_NS}">'
+            f'<Relationship Id="rId1" Type="{_RELATIONSHIP_NS}/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        ),
+        'xl/workbook.xml': (
+            f'{_XML_HEADER}<workbook xmlns="{_SPREADSHEET_NS}" xmlns:r="{_RELATIONSHIP_NS}">'
+            f'<sheets><sheet name="{escape(sheet_name)}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ),
+        'xl/_rels/workbook.xml.rels': (
+            f'{_XML_HEADER}<Relationships xmlns="{_PACKAGE_RELS_NS}">'
+            f'<Relationship Id="rId1" Type="{_RELATIONSHIP_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+            '</Relationships>'
+        ),
+    }
+
+
+def stream_xlsx(rows, sheet_name='Sheet1'):
+    buffer = ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _static_parts(sheet_name).items():
+            archive.writestr(name, content)
+        yield buffer.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(f'{_XML_HEADER}<worksheet xmlns="{_SPREADSHEET_NS}"><sheetData>'.encode())
+            for number, values in enumerate(rows, 1):
+                sheet.write(_row(number, values).encode())
+                if buffer.pending >= FLUSH_BYTES:
+                    yield buffer.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield buffer.drain()
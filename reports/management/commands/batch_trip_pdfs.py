@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.dates import parse_day
+from reports.batch import batch_trips, stream_trip_pdfs_zip
+from reports.pdf import TRIP_DOCUMENTS
+from trips.models import Trip
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes a ZIP of the invoice, customer confirmation or vendor order PDFs of every "
+        "trip in a date range, rendering uncached documents in parallel."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Path of the ZIP file to write.')
+        parser.add_argument('--kind', choices=sorted(TRIP_DOCUMENTS), default='invoice',
+                            help='Document to generate for each trip.')
+        parser.add_argument('--start-date', help='First trip date (YYYY-MM-DD), inclusive.')
+        parser.add_argument('--end-date', help='Last trip date (YYYY-MM-DD), inclusive.')
+        parser.add_argument('--vendor', type=int, help='Only trips with vehicles of this vendor id.')
+        parser.add_argument('--status', choices=Trip.TripStatus.values, help='Only trips with this status.')
+
+    def handle(self, *args, **options):
+        days = []
+        for option in ('start_date', 'end_date'):
+            value = options[option]
+            day = parse_day(value)
+            if value and day is None:
+                raise CommandError(f"Invalid --{option.replace('_', '-')}: {value}")
+            days.append(day)
+
+        trips = batch_trips(*days, vendor_id=options['vendor'], status=options['status'])
+        total = trips.count()
+
+        def progress(done):
+            self.stdout.write(f"\r{done}/{total} documents", ending='')
+            self.stdout.flush()
+
+        with open(options['output'], 'wb') as output:
+            for chunk in stream_trip_pdfs_zip(trips, options['kind'], progress):
+                output.write(chunk)
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(f"Wrote {total} documents to {options['output']}"))
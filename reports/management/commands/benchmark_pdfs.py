@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reports import benchmarks
+from reports.pdf import TRIP_DOCUMENTS
+from trips.models import Trip
+
+
+class Command(BaseCommand):
+    help = (
+        "Prints the median per-document template and layout times of the trip PDFs, with "
+        "the stylesheet and fonts set up per document (cold) and shared (warm)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', action='append', choices=sorted(TRIP_DOCUMENTS), dest='kinds',
+                            help='Document to measure; repeatable. Defaults to the customer and vendor confirmations.')
+        parser.add_argument('--trip', type=int, help='Trip to render; defaults to the most recent one.')
+        parser.add_argument('--repeat', type=int, default=20, help='Renders per measurement; the median is reported.')
+
+    def handle(self, *args, **options):
+        trips = Trip.objects.with_financials().select_related('customer', 'vehicle', 'vehicle__vendor', 'package')
+        if options['trip']:
+            trip = trips.filter(pk=options['trip']).first()
+        else:
+            trip = trips.order_by('-created_at').first()
+        if trip is None:
+            raise CommandError("No trip to render.")
+
+        kinds = options['kinds'] or benchmarks.DEFAULT_KINDS
+        results = benchmarks.run(trip, kinds, options['repeat'])
+
+        self.stdout.write(f"Trip #{trip.pk}, median of {options['repeat']} renders\n")
+        self.stdout.write(f"{'document':<12} {'template ms':>12} {'cold ms':>9} {'warm ms':>9} {'docs/s/core':>12}")
+        for kind in kinds:
+            timing = results[kind]
+            per_document = timing['template'] + timing['warm']
+            throughput = 1000 / per_document if per_document else float('inf')
+            self.stdout.write(f"{kind:<12} {timing['template']:>12.2f} {timing['cold']:>9.2f} "
+                              f"{timing['warm']:>9.2f} {throughput:>12.1f}")
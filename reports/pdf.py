@@ -0,0 +1,220 @@
+"""
+Trip PDF rendering with an on-disk cache.
+
+Documents are rendered by a pool of worker processes so WeasyPrint's layout
+work does not run on, or compete for the CPU with, the threads serving
+interactive requests. Each result is stored under a name derived from
+everything the document shows: the trip id, the source of the template
+(and the templates it extends) and of the stylesheet, the ``updated_at`` of
+the trip and its customer, vehicle and vendor, the trip's package and its
+name (packages have no ``updated_at``), and any computed figures passed to
+the template. A repeat download is served
+straight from the file; any edit changes the name, so stale versions are
+never served and are removed once replaced.
+"""
+import functools
+import hashlib
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.template.loader import get_template
+from django.template.loader_tags import ExtendsNode
+
+from . import pdf_worker
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the next queued document to finish before giving up
+# on the pool as hung.
+RENDER_TIMEOUT = 60
+# Documents queued per worker during batch rendering; enough to keep every
+# worker busy without holding a whole batch of HTML in memory.
+QUEUE_PER_WORKER = 2
+
+# Part of every cache key, so restyled documents are rendered afresh.
+STYLESHEET_VERSION = hashlib.sha256(pdf_worker.STYLESHEET.read_bytes()).hexdigest()
+
+
+
+@functools.cache
+def template_version(template_name):
+    """
+    Hash of the source of ``template_name`` and of every template it
+    extends, part of the cache key so a redesigned document is rendered
+    afresh. Read once per process, like the stylesheet.
+    """
+    digest = hashlib.sha256()
+    name = template_name
+    while name:
+        template = get_template(name).template
+        digest.update(template.source.encode())
+        parents = template.nodelist.get_nodes_by_type(ExtendsNode)
+        name = parents[0].parent_name.resolve({}) if parents else None
+    return digest.hexdigest()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def invoice_context(trip):
+    """Invoice figures; ``trip`` must come from ``with_financials()``."""
+    base_price = trip.total_price
+    additional_cost = Decimal('0.00')
+
+    if trip.additional_distance and trip.additional_distance > 0:
+        additional_cost = trip.extra_km_cost
+        base_price -= additional_cost  # Adjust base price to what it was before finalization
+
+    grand_total = base_price + additional_cost
+    balance_due = grand_total - (trip.advance_paid or 0) - (trip.final_payment_amount or 0)
+    return {
+        'base_price': base_price,
+        'additional_cost': additional_cost,
+        'grand_total': grand_total,
+        'balance_due': balance_due,
+    }
+
+
+@dataclass(frozen=True)
+class TripDocument:
+    template_name: str
+    # Download name, formatted with the trip ``id``.
+    filename: str
+    # Extra template context computed from the trip.
+    context: Optional[Callable] = None
+
+    def context_for(self, trip):
+        return self.context(trip) if self.context else {}
+
+
+TRIP_DOCUMENTS = {
+    'customer': TripDocument('reports/pdfs/customer_confirmation.html', 'customer_confirmation_{id}.pdf'),
+    'vendor': TripDocument('reports/pdfs/vendor_confirmation.html', 'vendor_order_{id}.pdf'),
+    'invoice': TripDocument('reports/pdfs/invoice.html', 'invoice_{id}.pdf', invoice_context),
+}
+
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PDF_RENDER_WORKERS,
+                # Forking a threaded web worker is unsafe; spawned workers
+                # start clean and only import WeasyPrint.
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=pdf_worker.init_worker,
+            )
+        return _executor
+
+
+def shutdown_pool():
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def cache_path(trip, kind, context=None):
+    """
+    Path of the cached ``kind`` PDF of ``trip``. ``trip`` must have
+    ``customer``, ``vehicle__vendor`` and ``package`` loaded.
+    """
+    document = TRIP_DOCUMENTS[kind]
+    if context is None:
+        context = document.context_for(trip)
+    versions = [
+        str(trip.pk), document.template_name, template_version(document.template_name), STYLESHEET_VERSION,
+        trip.updated_at.isoformat(),
+        trip.customer.updated_at.isoformat(), trip.vehicle.updated_at.isoformat(),
+        trip.vehicle.vendor.updated_at.isoformat(),
+        f'package={trip.package_id}:{trip.package.name if trip.package else ""}',
+        *(f'{key}={value}' for key, value in sorted(context.items())),
+    ]
+    digest = hashlib.sha256('\n'.join(versions).encode()).hexdigest()[:32]
+    return Path(settings.PDF_CACHE_DIR) / str(trip.pk) / f'{Path(document.template_name).stem}-{digest}.pdf'
+
+
+def _remove_stale_versions(path):
+    prefix = path.name.rsplit('-', 1)[0]
+    for stale in path.parent.glob(f'{prefix}-*.pdf'):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+
+
+def _finish(future, trip, path):
+    try:
+        future.result(timeout=RENDER_TIMEOUT)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start a fresh pool for
+        # the next request rather than failing every one after this.
+        logger.exception("PDF rendering pool broke; restarting it")
+        shutdown_pool()
+        raise
+    _remove_stale_versions(path)
+    return trip, path
+
+
+def _wait_for_any(pending):
+    done, _ = wait(pending, timeout=RENDER_TIMEOUT, return_when=FIRST_COMPLETED)
+    if not done:
+        # Every queued document is stuck behind hung workers; the pool
+        # cannot be trusted with another one.
+        logger.error("PDF rendering made no progress in %s seconds; restarting the pool", RENDER_TIMEOUT)
+        for future in pending:
+            future.cancel()
+        shutdown_pool()
+        raise TimeoutError(f"No PDF finished rendering within {RENDER_TIMEOUT} seconds")
+    return done
+
+
+def render_trip_pdfs(trips, kind):
+    """
+    Yields ``(trip, path)`` for each trip once its ``kind`` PDF is on disk.
+    Cached documents come back immediately; misses are rendered in parallel
+    across the worker pool and yielded as they complete, so the order is
+    not preserved.
+    """
+    document = TRIP_DOCUMENTS[kind]
+    template = get_template(document.template_name)
+    workers = settings.PDF_RENDER_WORKERS
+    pending = {}
+    for trip in trips:
+        context = document.context_for(trip)
+        path = cache_path(trip, kind, context)
+        if path.exists():
+            yield trip, path
+            continue
+
+        html = template.render({'trip': trip, **context})
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if not workers:
+            pdf_worker.render_pdf(html, str(path))
+            _remove_stale_versions(path)
+            yield trip, path
+            continue
+
+        pending[_pool().submit(pdf_worker.render_pdf, html, str(path))] = trip, path
+        if len(pending) >= workers * QUEUE_PER_WORKER:
+            for future in _wait_for_any(pending):
+                yield _finish(future, *pending.pop(future))
+
+    while pending:
+        for future in _wait_for_any(pending):
+            yield _finish(future, *pending.pop(future))
+
+
+def render_trip_pdf(trip, kind):
+    """Returns the path of the ``kind`` PDF for ``trip``, rendering it on a cache miss."""
+    _, path = next(render_trip_pdfs([trip], kind))
+    return path
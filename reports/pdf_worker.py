@@ -0,0 +1,57 @@
+"""
+Code that runs inside the PDF rendering processes.
+
+It deliberately imports nothing from Django: the pool uses the ``spawn``
+start method, so each worker only loads WeasyPrint and receives ready-made
+HTML from the web process.
+
+The shared stylesheet and the font configuration it registers are parsed
+once per process and reused for every document, leaving only layout to
+be done per PDF.
+"""
+import os
+from pathlib import Path
+
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+
+# Added to the workers' niceness so rendering yields the CPU to the web
+# processes serving interactive requests.
+WORKER_NICENESS = 10
+STYLESHEET = Path(__file__).with_name('pdf_styles.css')
+
+_font_config = None
+_stylesheets = None
+
+
+def load_stylesheets():
+    """Parses the shared stylesheet and font setup on first use in this process."""
+    global _font_config, _stylesheets
+    if _stylesheets is None:
+        _font_config = FontConfiguration()
+        _stylesheets = [CSS(filename=str(STYLESHEET), font_config=_font_config)]
+    return _stylesheets, _font_config
+
+
+def init_worker():
+    if hasattr(os, 'nice'):
+        os.nice(WORKER_NICENESS)
+    load_stylesheets()
+
+
+def write_pdf(html, target=None):
+    """Lays out ``html`` with the shared stylesheet; returns the bytes when ``target`` is ``None``."""
+    stylesheets, font_config = load_stylesheets()
+    return HTML(string=html).write_pdf(target, stylesheets=stylesheets, font_config=font_config)
+
+
+def render_pdf(html, target):
+    """Renders ``html`` to the file ``target``, replacing it atomically."""
+    partial = f'{target}.{os.getpid()}.part'
+    try:
+        write_pdf(html, partial)
+        os.replace(partial, target)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return target
@@ -1,3 +1,300 @@
-from django.test import TestCase
+import csv
+import io
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
+from xml.etree import ElementTree
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.dates import filter_by_days
+from core.streaming import iterate_in_chunks
+from core.testing import QueryBudgetTestCase, SeededDataMixin, seed_dataset
+from trips.models import Package, Trip
+from . import pdf_worker
+from .pdf import cache_path, render_trip_pdfs, shutdown_pool, template_version
+
+
+class TemporaryPdfCacheMixin:
+    """Points the PDF cache at a throwaway directory for each test."""
+
+    def setUp(self):
+        super().setUp()
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        pdf_settings = override_settings(PDF_CACHE_DIR=cache_dir.name)
+        pdf_settings.enable()
+        self.addCleanup(pdf_settings.disable)
+
+
+class ReportViewQueryBudgetTests(TemporaryPdfCacheMixin, QueryBudgetTestCase):
+    def test_trip_report(self):
+        self.assertQueryBudget(reverse('trip_report'), 4)
+
+    def test_trip_report_date_range(self):
+        self.assertQueryBudget(reverse('trip_report') + '?start_date=2000-01-01&end_date=2100-12-31', 4)
+
+    def test_generate_bill(self):
+        self.assertQueryBudget(reverse('generate_bill', args=[self.completed_trip.pk]), 3)
+
+    def test_pdf_customer_confirmation(self):
+        self.assertQueryBudget(reverse('pdf_customer_confirmation', args=[self.trip.pk]), 3)
+
+    def test_pdf_vendor_confirmation(self):
+        self.assertQueryBudget(reverse('pdf_vendor_confirmation', args=[self.trip.pk]), 3)
+
+
+class TripReportExportTests(SeededDataMixin, TestCase):
+    def _download(self, export_format, **params):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('trip_report_export', args=[export_format]), params)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_csv_export_has_every_trip_and_a_summary_footer(self):
+        response, content = self._download('csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.reader(io.StringIO(content.decode('utf-8-sig'))))
+        self.assertEqual(rows[0][:3], ['Trip ID', 'Trip Date', 'Customer'])
+        self.assertEqual(len(rows), Trip.objects.count() + 2)
+        self.assertEqual(rows[-1][0], 'Total')
+        self.assertEqual(rows[-1][1], f'{Trip.objects.count()} trips')
+
+    def test_export_respects_date_filters(self):
+        response, content = self._download('csv', start_date='2000-01-01', end_date='2000-01-31')
+        rows = list(csv.reader(io.StringIO(content.decode('utf-8-sig'))))
+        self.assertEqual(rows[-1][:2], ['Total', '0 trips'])
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(response['Content-Disposition'],
+                         'attachment; filename="trip_report_2000-01-01_2000-01-31.csv"')
+
+    def test_export_filename_ignores_malformed_dates(self):
+        response, _ = self._download('csv', start_date='x"; y', end_date='2000-1-5')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="trip_report_2000-01-05.csv"')
+
+    def test_xlsx_export_is_a_valid_workbook(self):
+        response, content = self._download('xlsx')
+        self.assertIn('.xlsx', response['Content-Disposition'])
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertIsNone(archive.testzip())
+            sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+        namespace = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+        self.assertEqual(len(sheet.findall('.//s:row', namespace)), Trip.objects.count() + 2)
+
+    def test_unknown_format_is_not_found(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('trip_report_export', args=['pdf']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_chunked_iteration_visits_every_row_once(self):
+        seed_dataset(5)
+        rows = Trip.objects.values('pk', 'trip_date')
+        with CaptureQueriesContext(connection) as ctx:
+            seen = [row['pk'] for row in iterate_in_chunks(rows, 'trip_date', chunk_size=3)]
+        self.assertEqual(sorted(seen), sorted(Trip.objects.values_list('pk', flat=True)))
+        self.assertEqual(len(ctx.captured_queries), len(seen) // 3 + 1)
+
+
+class TripReportDateRangeTests(SeededDataMixin, TestCase):
+    def test_end_date_is_inclusive_and_half_open(self):
+        vehicle, customer = self.trip.vehicle, self.trip.customer
+        inside = Trip.objects.create(customer=customer, vehicle=vehicle,
+                                     trip_date=timezone.make_aware(datetime(2001, 5, 31, 23, 59, 59)))
+        Trip.objects.create(customer=customer, vehicle=vehicle,
+                            trip_date=timezone.make_aware(datetime(2001, 6, 1, 0, 0)))
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('trip_report'), {'start_date': '2001-05-01', 'end_date': '2001-05-31'})
+        self.assertEqual([trip.pk for trip in response.context['trips']], [inside.pk])
+
+    def test_range_filter_does_not_cast_the_column(self):
+        trips = filter_by_days(Trip.objects.all(), 'trip_date', date(2001, 5, 1), date(2001, 5, 31))
+        lookups = trips.query.where.children
+        self.assertEqual([lookup.lookup_name for lookup in lookups], ['gte', 'lt'])
+        # Plain column references, not a DATE() cast of the column.
+        self.assertEqual({type(lookup.lhs).__name__ for lookup in lookups}, {'Col'})
+        self.assertEqual(lookups[1].rhs, timezone.make_aware(datetime(2001, 6, 1)))
+
+
+@override_settings(PDF_RENDER_WORKERS=0)
+class TripPdfCacheTests(TemporaryPdfCacheMixin, SeededDataMixin, TestCase):
+    def _download(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('pdf_customer_confirmation', args=[self.trip.pk]))
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertIn(f'customer_confirmation_{self.trip.pk}.pdf', response['Content-Disposition'])
+        return b''.join(response.streaming_content)
+
+    def test_repeat_downloads_are_served_from_the_cache(self):
+        with mock.patch('reports.pdf.pdf_worker.render_pdf', wraps=pdf_worker.render_pdf) as render:
+            first = self._download()
+            second = self._download()
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith(b'%PDF'))
+
+    def test_trip_changes_replace_the_cached_file(self):
+        self._download()
+        trip = Trip.objects.select_related('customer', 'vehicle__vendor', 'package').get(pk=self.trip.pk)
+        old_path = cache_path(trip, 'customer')
+        trip.remarks = 'Pick up at the airport'
+        trip.save()
+        trip.refresh_from_db()
+        self.assertNotEqual(cache_path(trip, 'customer'), old_path)
+
+        self._download()
+        self.assertFalse(old_path.exists())
+        self.assertTrue(cache_path(trip, 'customer').exists())
+
+    def test_package_renames_replace_the_cached_invoice(self):
+        package = Package.objects.create(name='Airport', vehicle_type='SUV', vehicle_model='Innova',
+                                         charges=Decimal('2500.00'), extra_charge_per_km=Decimal('12.50'))
+        Trip.objects.filter(pk=self.trip.pk).update(package=package)
+        trips = Trip.objects.with_financials().select_related('customer', 'vehicle__vendor', 'package')
+        old_path = cache_path(trips.get(pk=self.trip.pk), 'invoice')
+        package.name = 'Airport Drop'
+        package.save()
+        self.assertNotEqual(cache_path(trips.get(pk=self.trip.pk), 'invoice'), old_path)
+
+    def test_template_changes_replace_the_cached_file(self):
+        trip = Trip.objects.select_related('customer', 'vehicle__vendor', 'package').get(pk=self.trip.pk)
+        paths = []
+        for base in ['<p>{% block content %}{% endblock %}</p>', '<div>{% block content %}{% endblock %}</div>']:
+            loader = ('django.template.loaders.locmem.Loader', {
+                'reports/pdfs/customer_confirmation.html':
+                    "{% extends 'reports/pdfs/pdf_base.html' %}{% block content %}{{ trip.pk }}{% endblock %}",
+                'reports/pdfs/pdf_base.html': base,
+            })
+            templates = [{'BACKEND': 'django.template.backends.django.DjangoTemplates',
+                          'OPTIONS': {'loaders': [loader]}}]
+            with override_settings(TEMPLATES=templates):
+                template_version.cache_clear()
+                self.addCleanup(template_version.cache_clear)
+                paths.append(cache_path(trip, 'customer'))
+        self.assertNotEqual(paths[0], paths[1])
+
+    @override_settings(PDF_RENDER_WORKERS=1)
+    def test_rendering_in_the_worker_pool(self):
+        try:
+            self.assertTrue(self._download().startswith(b'%PDF'))
+        finally:
+            shutdown_pool()
+
+    @override_settings(PDF_RENDER_WORKERS=1)
+    def test_hung_worker_times_out(self):
+        released = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(pool.shutdown)
+        self.addCleanup(released.set)
+        trip = Trip.objects.select_related('customer', 'vehicle__vendor', 'package').get(pk=self.trip.pk)
+        with mock.patch('reports.pdf._pool', return_value=pool), \
+                mock.patch('reports.pdf.RENDER_TIMEOUT', 0.1), \
+                mock.patch('reports.pdf.pdf_worker.render_pdf', lambda html, target: released.wait()), \
+                mock.patch('reports.pdf.shutdown_pool') as shutdown:
+            with self.assertRaises(TimeoutError):
+                list(render_trip_pdfs([trip], 'customer'))
+        shutdown.assert_called_once_with()
+
+
+@override_settings(PDF_RENDER_WORKERS=0)
+class TripPdfBatchTests(TemporaryPdfCacheMixin, SeededDataMixin, TestCase):
+    def _range(self):
+        today = timezone.localdate()
+        return {'start_date': (today - timedelta(days=1)).isoformat(),
+                'end_date': (today + timedelta(days=20)).isoformat()}
+
+    def _download(self, kind, **params):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('trip_pdf_batch', args=[kind]), {**self._range(), **params})
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.addCleanup(archive.close)
+        self.assertIsNone(archive.testzip())
+        return response, archive
+
+    def test_zip_holds_one_document_per_trip(self):
+        response, archive = self._download('invoice')
+        expected = {f'invoice_{pk}.pdf' for pk in Trip.objects.values_list('pk', flat=True)}
+        self.assertEqual(set(archive.namelist()), expected)
+        self.assertEqual(response['X-Document-Count'], str(len(expected)))
+        self.assertTrue(archive.read(f'invoice_{self.trip.pk}.pdf').startswith(b'%PDF'))
+
+    def test_filters_by_status_and_vendor(self):
+        _, archive = self._download('vendor', status=Trip.TripStatus.COMPLETED)
+        completed = Trip.objects.filter(status=Trip.TripStatus.COMPLETED).values_list('pk', flat=True)
+        self.assertEqual(set(archive.namelist()), {f'vendor_order_{pk}.pdf' for pk in completed})
+
+        vendor_id = self.trip.vehicle.vendor_id
+        _, archive = self._download('customer', vendor=vendor_id)
+        trips = Trip.objects.filter(vehicle__vendor_id=vendor_id).values_list('pk', flat=True)
+        self.assertEqual(set(archive.namelist()), {f'customer_confirmation_{pk}.pdf' for pk in trips})
+
+    def test_reuses_cached_documents(self):
+        self._download('customer')
+        with mock.patch('reports.pdf.pdf_worker.render_pdf', wraps=pdf_worker.render_pdf) as render:
+            self._download('customer')
+        render.assert_not_called()
+
+    def test_rejects_unknown_kinds_and_filters(self):
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(reverse('trip_pdf_batch', args=['receipt'])).status_code, 404)
+        url = reverse('trip_pdf_batch', args=['invoice'])
+        self.assertEqual(self.client.get(url, {**self._range(), 'status': 'Lost'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {**self._range(), 'vendor': 'x'}).status_code, 400)
+
+    def test_requires_a_bounded_batch(self):
+        self.client.force_login(self.admin)
+        url = reverse('trip_pdf_batch', args=['invoice'])
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start_date': '2026-01-01', 'end_date': 'x"y'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start_date': '2026-01-01', 'end_date': '2026-03-01'}).status_code, 400)
+        with mock.patch('reports.views.MAX_BATCH_DOCUMENTS', 1):
+            self.assertEqual(self.client.get(url, self._range()).status_code, 400)
+
+    def test_filename_is_built_from_the_parsed_dates(self):
+        first = timezone.localdate() - timedelta(days=1)
+        last = date.fromisoformat(self._range()['end_date'])
+        response, _ = self._download('invoice', start_date=f'{first.year}-{first.month}-{first.day}')
+        self.assertEqual(response['Content-Disposition'],
+                         f'attachment; filename="trip_invoice_pdfs_{first.isoformat()}_{last.isoformat()}.zip"')
+
+    def test_management_command_writes_the_archive(self):
+        output_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(output_dir.cleanup)
+        target = f'{output_dir.name}/invoices.zip'
+        out = io.StringIO()
+        call_command('batch_trip_pdfs', target, '--kind', 'invoice', stdout=out)
+        with zipfile.ZipFile(target) as archive:
+            self.assertEqual(len(archive.namelist()), Trip.objects.count())
+        self.assertIn(f'{Trip.objects.count()}/{Trip.objects.count()} documents', out.getvalue())
+
+
+class PdfWorkerSetupTests(SeededDataMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.multiple(pdf_worker, _font_config=None, _stylesheets=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_stylesheet_and_fonts_are_set_up_once_per_process(self):
+        with mock.patch.object(pdf_worker, 'CSS', wraps=pdf_worker.CSS) as css, \
+                mock.patch.object(pdf_worker, 'FontConfiguration', wraps=pdf_worker.FontConfiguration) as fonts:
+            pdf_worker.write_pdf('<p>one</p>')
+            pdf_worker.write_pdf('<p>two</p>')
+        css.assert_called_once()
+        fonts.assert_called_once()
+
+    def test_benchmark_command_reports_each_document(self):
+        out = io.StringIO()
+        call_command('benchmark_pdfs', '--repeat', '1', '--trip', str(self.trip.pk), stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertTrue(any(line.startswith('customer') for line in lines))
+        self.assertTrue(any(line.startswith('vendor') for line in lines))
@@ -3,6 +3,8 @@ from . import views
 
 urlpatterns = [
     path('trips/', views.trip_report_view, name='trip_report'),
+    path('trips/export/<str:export_format>/', views.trip_report_export_view, name='trip_report_export'),
+    path('trips/pdfs/<str:kind>/', views.trip_pdf_batch_view, name='trip_pdf_batch'),
     path('trips/<int:pk>/bill/', views.generate_bill_view, name='generate_bill'),
     path('trips/<int:pk>/pdf/customer/', views.generate_customer_pdf, name='pdf_customer_confirmation'),
     path('trips/<int:pk>/pdf/vendor/', views.generate_vendor_pdf, name='pdf_vendor_confirmation'),
@@ -1,17 +1,58 @@
-from django.http import HttpResponse
+from django.http import FileResponse, Http404, HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from django.db.models import Sum, Count, F, DecimalField
-from datetime import datetime
-from weasyprint import HTML
-
-from django.template.loader import render_to_string
+from django.db.models import Sum, Count
+from django.utils import timezone
+from functools import partial
 
+from core.dates import filter_by_days, parse_day
+from core.streaming import iterate_in_chunks
 from trips.models import Trip
+from .exports import XLSX_CONTENT_TYPE, stream_csv, stream_xlsx
+from .batch import MAX_BATCH_DAYS, MAX_BATCH_DOCUMENTS, batch_trips, stream_trip_pdfs_zip
+from .pdf import TRIP_DOCUMENTS, invoice_context, render_trip_pdf
 from django.shortcuts import get_object_or_404
 from decimal import Decimal
 
 
+# Columns of the CSV/XLSX export: (header, value key).
+EXPORT_COLUMNS = [
+    ('Trip ID', 'pk'),
+    ('Trip Date', 'trip_date'),
+    ('Customer', 'customer__name'),
+    ('Phone', 'customer__phone'),
+    ('Vehicle', 'vehicle__number'),
+    ('Vendor', 'vehicle__vendor__name'),
+    ('Package', 'package__name'),
+    ('Status', 'status'),
+    ('Total Price', 'total_price'),
+    ('Vendor Price', 'vendor_price'),
+    ('Advance Paid', 'advance_paid'),
+    ('Agent Revenue', 'commission'),
+    ('Balance Due', 'balance_due'),
+]
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', stream_csv),
+    'xlsx': (XLSX_CONTENT_TYPE, partial(stream_xlsx, sheet_name='Trips')),
+}
+
+
+def _filter_trips(trips, start_date_str, end_date_str):
+    # Apply filters if dates are provided, as a range on the raw trip_date
+    # column so the index on it can be used
+    return filter_by_days(trips, 'trip_date', parse_day(start_date_str), parse_day(end_date_str))
+
+
+def _report_summary(trips):
+    # Calculate totals from the filtered trips
+    return trips.aggregate(
+        total_trips=Count('id'),
+        total_revenue=Sum('total_price'),
+        total_agent_revenue=Sum('commission'),
+        total_advance=Sum('advance_paid')
+    )
+
+
 @login_required
 def trip_report_view(request):
     # Get filter parameters from the form submission
@@ -19,24 +60,11 @@ def trip_report_view(request):
     end_date_str = request.GET.get('end_date')
 
     # Start with all trips
-    trips = Trip.objects.select_related('customer', 'vehicle', 'package').all()
-
-    # Apply filters if dates are provided
-    if start_date_str:
-        start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-        trips = trips.filter(trip_date__date__gte=start_date)
-
-    if end_date_str:
-        end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
-        trips = trips.filter(trip_date__date__lte=end_date)
-
-    # Calculate totals from the filtered trips
-    summary = trips.aggregate(
-        total_trips=Count('id'),
-        total_revenue=Sum('total_price'),
-        total_agent_revenue=Sum(F('total_price') - F('vendor_price'), output_field=DecimalField()),
-        total_advance=Sum('advance_paid')
+    trips = _filter_trips(
+        Trip.objects.with_financials().select_related('customer', 'vehicle', 'vehicle__vendor', 'package'),
+        start_date_str, end_date_str,
     )
+    summary = _report_summary(trips)
 
     context = {
         'trips': trips,
@@ -48,56 +76,117 @@ def trip_report_view(request):
     return render(request, 'reports/trip_report.html', context)
 
 
-@login_required
-def generate_bill_view(request, pk):
-    trip = get_object_or_404(Trip.objects.select_related('customer', 'vehicle', 'package', 'vehicle__vendor'), pk=pk)
+def _export_rows(trips):
+    statuses = dict(Trip.TripStatus.choices)
+    yield [header for header, _ in EXPORT_COLUMNS]
+    rows = trips.values(*(key for _, key in EXPORT_COLUMNS))
+    for row in iterate_in_chunks(rows, 'trip_date'):
+        row['trip_date'] = timezone.localtime(row['trip_date']).strftime('%Y-%m-%d %H:%M')
+        row['status'] = statuses.get(row['status'], row['status'])
+        yield [row[key] for _, key in EXPORT_COLUMNS]
+
+    # The totals are only queried once every row has been sent.
+    summary = _report_summary(trips)
+    footer = {
+        'pk': 'Total',
+        'trip_date': f"{summary['total_trips']} trips",
+        'total_price': summary['total_revenue'] or Decimal('0.00'),
+        'advance_paid': summary['total_advance'] or Decimal('0.00'),
+        'commission': summary['total_agent_revenue'] or Decimal('0.00'),
+    }
+    yield [footer.get(key) for _, key in EXPORT_COLUMNS]
 
-    # Calculate financial details
-    base_price = trip.total_price
-    additional_cost = Decimal('0.00')
 
-    if trip.additional_distance and trip.additional_distance > 0:
-        if trip.package and trip.package.extra_charge_per_km is not None:
-            extra_km_rate = trip.package.extra_charge_per_km
-        else:
-            extra_km_rate = trip.vehicle.price_per_km
+@login_required
+def trip_report_export_view(request, export_format):
+    """
+    Streams the trip report for the same date filters as CSV or XLSX, with
+    the summary totals as the last row.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise Http404("Unknown export format")
+    first_day = parse_day(request.GET.get('start_date'))
+    last_day = parse_day(request.GET.get('end_date'))
+    trips = filter_by_days(Trip.objects.with_financials(), 'trip_date', first_day, last_day)
+
+    content_type, writer = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(writer(_export_rows(trips)), content_type=content_type)
+    # Named from the parsed dates only, never the raw query strings.
+    period = '_'.join(day.isoformat() for day in (first_day, last_day) if day) or 'all'
+    response['Content-Disposition'] = f'attachment; filename="trip_report_{period}.{export_format}"'
+    return response
 
-        additional_cost = trip.additional_distance * extra_km_rate
-        base_price -= additional_cost  # Adjust base price to what it was before finalization
 
-    grand_total = base_price + additional_cost
-    balance_due = grand_total - (trip.advance_paid or 0) - (trip.final_payment_amount or 0)
+@login_required
+def generate_bill_view(request, pk):
+    trip = get_object_or_404(
+        Trip.objects.with_financials().select_related('customer', 'vehicle', 'package', 'vehicle__vendor'), pk=pk
+    )
 
+    # Calculate financial details; the extra-km cost comes from the database
     context = {
         'trip': trip,
-        'base_price': base_price,
-        'additional_cost': additional_cost,
-        'grand_total': grand_total,
-        'balance_due': balance_due,
+        **invoice_context(trip),
         'title': f'Invoice for Trip #{trip.id}'
     }
     return render(request, 'reports/invoice.html', context)
 
 
-@login_required
-def generate_customer_pdf(request, pk):
-    trip = get_object_or_404(Trip.objects.select_related('customer', 'vehicle'), pk=pk)
-    html_string = render_to_string('reports/pdfs/customer_confirmation.html', {'trip': trip})
+def _trip_pdf_response(pk, kind):
+    trip = get_object_or_404(
+        Trip.objects.with_financials().select_related('customer', 'vehicle', 'vehicle__vendor', 'package'), pk=pk
+    )
+    # Rendered by the PDF worker pool on the first download, then served
+    # from the cached file until the trip or its related rows change.
+    path = render_trip_pdf(trip, kind)
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=TRIP_DOCUMENTS[kind].filename.format(id=trip.id),
+                        content_type='application/pdf')
 
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="customer_confirmation_{trip.id}.pdf"'
 
-    HTML(string=html_string).write_pdf(response)
-    return response
+@login_required
+def generate_customer_pdf(request, pk):
+    return _trip_pdf_response(pk, 'customer')
 
 
 @login_required
 def generate_vendor_pdf(request, pk):
-    trip = get_object_or_404(Trip.objects.select_related('customer', 'vehicle', 'vehicle__vendor'), pk=pk)
-    html_string = render_to_string('reports/pdfs/vendor_confirmation.html', {'trip': trip})
+    return _trip_pdf_response(pk, 'vendor')
 
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="vendor_order_{trip.id}.pdf"'
 
-    HTML(string=html_string).write_pdf(response)
-    return response
\ No newline at end of file
+@login_required
+def trip_pdf_batch_view(request, kind):
+    """
+    Streams a ZIP of the ``kind`` PDF (invoice, customer confirmation or
+    vendor order) of every trip in a ``start_date``..``end_date`` range of
+    at most ``MAX_BATCH_DAYS`` days, plus optional ``vendor`` and ``status``
+    filters. Batches beyond ``MAX_BATCH_DOCUMENTS`` documents are refused;
+    the batch_trip_pdfs command builds those.
+    """
+    if kind not in TRIP_DOCUMENTS:
+        raise Http404("Unknown document type")
+    first_day = parse_day(request.GET.get('start_date'))
+    last_day = parse_day(request.GET.get('end_date'))
+    vendor_id = request.GET.get('vendor') or None
+    status = request.GET.get('status') or None
+    if first_day is None or last_day is None or last_day < first_day:
+        return HttpResponseBadRequest("Choose a start and end date")
+    if (last_day - first_day).days >= MAX_BATCH_DAYS:
+        return HttpResponseBadRequest(f"Choose a range of at most {MAX_BATCH_DAYS} days")
+    if vendor_id is not None and not vendor_id.isdigit():
+        return HttpResponseBadRequest("Invalid vendor")
+    if status is not None and status not in Trip.TripStatus.values:
+        return HttpResponseBadRequest("Invalid status")
+
+    trips = batch_trips(first_day, last_day, vendor_id, status)
+    count = trips.count()
+    if count > MAX_BATCH_DOCUMENTS:
+        return HttpResponseBadRequest(
+            f"{count} documents match; narrow the filters to at most {MAX_BATCH_DOCUMENTS}"
+        )
+    response = StreamingHttpResponse(stream_trip_pdfs_zip(trips, kind), content_type='application/zip')
+    # Lets the client show progress while the archive is still being built.
+    response['X-Document-Count'] = count
+    response['Content-Disposition'] = (
+        f'attachment; filename="trip_{kind}_pdfs_{first_day.isoformat()}_{last_day.isoformat()}.zip"'
+    )
+    return response
@@ -0,0 +1,308 @@
+"""
+Global search over customers, trips, vehicles and vendors.
+
+Each indexed object is broken into normalized words ("tokens") stored in
+``SearchToken`` alongside a ``SearchDocument`` with the text a hit shows.
+``search.signals`` rewrites an object's entries, in a transaction of their
+own, once the save or delete that changes it has committed, including the
+objects that display it (a customer's trips show the customer's name, a
+vendor's vehicles its name).
+A search then matches each query word as a prefix of the stored tokens,
+which is an index range scan rather than a ``LIKE '%x%'`` over the source
+tables, and ranks objects by the weight of the words they matched.
+``python manage.py rebuild_search_index`` reindexes everything in batches.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Callable
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Max, Q, Sum, Value, When
+from django.urls import reverse
+
+from customers.models import Customer
+from trips.models import Trip
+from vehicles.models import Vehicle
+from vendors.models import Vendor
+from .models import SearchDocument, SearchToken
+
+DEFAULT_LIMIT = 20
+REBUILD_BATCH_SIZE = 500
+# Longest stored token (the column width), and the fewest characters of a
+# query word matched as a prefix; shorter words must match a token exactly
+# so a single letter never scans a large part of the index.
+MAX_TOKEN_LENGTH = 64
+MIN_PREFIX_LENGTH = 2
+MAX_QUERY_TERMS = 5
+
+_WORD = re.compile(r'[^\W_]+')
+_PART = re.compile(r'[^\W\d_]+|\d+')
+
+# Weights of the indexed fields: identifying fields rank above descriptions.
+PRIMARY, SECONDARY, DETAIL = 3, 2, 1
+
+
+def tokenize(text):
+    """
+    Lower-cased words of ``text``. Words mixing letters and digits, such as
+    vehicle numbers, also yield their letter and digit runs, so
+    ``AP07AB1234`` is found by ``1234`` as well as by ``ap07``.
+    """
+    tokens = []
+    for word in _WORD.findall(str(text or '').lower()):
+        tokens.append(word[:MAX_TOKEN_LENGTH])
+        parts = _PART.findall(word)
+        if len(parts) > 1:
+            tokens.extend(part[:MAX_TOKEN_LENGTH] for part in parts)
+    return tokens
+
+
+def _phone(value):
+    # Indexed as written, as bare digits and as the ten-digit local number,
+    # so "+91 98480 12345" is found by "919848012345" and "9848012345" too.
+    value = value or ''
+    digits = re.sub(r'[^0-9]', '', value)
+    return f"{value} {digits} {digits[-10:]}"
+
+
+@dataclass(frozen=True)
+class Index:
+    kind: str
+    model: type
+    # Queryset with what ``text``, ``title`` and ``subtitle`` read loaded.
+    queryset: Callable
+    # ``[(text, weight), ...]`` of an object.
+    text: Callable
+    title: Callable
+    subtitle: Callable
+    url_name: str
+    # Models whose change alters what this index shows, with a function
+    # returning the affected objects of this index as a queryset.
+    depends_on: dict = field(default_factory=dict)
+
+    def documents_for(self, instance):
+        """The objects of this index affected by a change to ``instance`` of a dependency."""
+        return self.depends_on[type(instance)](self.queryset(), instance)
+
+
+def _customer_text(customer):
+    return [
+        (customer.name, PRIMARY), (_phone(customer.phone), PRIMARY), (customer.email, DETAIL),
+        (customer.coming_from, DETAIL), (customer.from_location, DETAIL), (customer.to_location, DETAIL),
+    ]
+
+
+def _route(customer):
+    return ' → '.join(place for place in (customer.from_location, customer.to_location) if place)
+
+
+def _trip_text(trip):
+    return [
+        (trip.pk, PRIMARY), (trip.customer.name, SECONDARY), (_phone(trip.customer.phone), SECONDARY),
+        (trip.vehicle.number, SECONDARY),
+        (trip.customer.from_location, DETAIL), (trip.customer.to_location, DETAIL),
+    ]
+
+
+INDEXES = [
+    Index(
+        kind='customer', model=Customer,
+        queryset=lambda: Customer.objects.all(),
+        text=_customer_text,
+        title=str,
+        subtitle=_route,
+        url_name='customer_update',
+    ),
+    Index(
+        kind='trip', model=Trip,
+        queryset=lambda: Trip.objects.select_related('customer', 'vehicle'),
+        text=_trip_text,
+        title=lambda trip: f"Trip #{trip.pk}",
+        subtitle=lambda trip: (f"{trip.customer.name} · {trip.vehicle.number} · "
+                               f"{trip.trip_date:%d %b %Y} · {trip.status}"),
+        url_name='trip_update',
+        depends_on={
+            Customer: lambda trips, customer: trips.filter(customer=customer),
+            Vehicle: lambda trips, vehicle: trips.filter(vehicle=vehicle),
+        },
+    ),
+    Index(
+        kind='vehicle', model=Vehicle,
+        queryset=lambda: Vehicle.objects.select_related('vendor'),
+        text=lambda vehicle: [
+            (vehicle.number, PRIMARY), (vehicle.make, DETAIL), (vehicle.model, DETAIL),
+            (vehicle.type, DETAIL), (vehicle.vendor.name, DETAIL),
+        ],
+        title=lambda vehicle: vehicle.number,
+        subtitle=lambda vehicle: f"{vehicle.make} {vehicle.model} ({vehicle.vendor.name})",
+        url_name='vehicle_update',
+        depends_on={
+            Vendor: lambda vehicles, vendor: vehicles.filter(vendor=vendor),
+        },
+    ),
+    Index(
+        kind='vendor', model=Vendor,
+        queryset=lambda: Vendor.objects.all(),
+        text=lambda vendor: [(vendor.name, PRIMARY), (vendor.district, SECONDARY), (vendor.area, DETAIL)],
+        title=lambda vendor: vendor.name,
+        subtitle=lambda vendor: f"{vendor.area}, {vendor.district}",
+        url_name='vendor_update',
+    ),
+]
+INDEXES_BY_KIND = {index.kind: index for index in INDEXES}
+INDEXES_BY_MODEL = {index.model: index for index in INDEXES}
+
+
+def _tokens(index, obj):
+    weights = {}
+    for text, weight in index.text(obj):
+        for token in tokenize(text):
+            weights[token] = max(weight, weights.get(token, 0))
+    return weights
+
+
+def index_objects(index, objects):
+    """Replaces the index entries of ``objects``, which come from ``index.queryset()``."""
+    objects = list(objects)
+    if not objects:
+        return
+    ids = [obj.pk for obj in objects]
+    SearchDocument.objects.filter(kind=index.kind, object_id__in=ids).delete()
+    SearchToken.objects.filter(kind=index.kind, object_id__in=ids).delete()
+    SearchDocument.objects.bulk_create([
+        SearchDocument(kind=index.kind, object_id=obj.pk, title=str(index.title(obj))[:200],
+                       subtitle=str(index.subtitle(obj))[:255])
+        for obj in objects
+    ])
+    SearchToken.objects.bulk_create([
+        SearchToken(token=token, kind=index.kind, object_id=obj.pk, weight=weight)
+        for obj in objects
+        for token, weight in _tokens(index, obj).items()
+    ], batch_size=1000)
+
+
+def update(instance):
+    """Reindexes ``instance`` and every indexed object that shows part of it, in one transaction."""
+    index = INDEXES_BY_MODEL.get(type(instance))
+    with transaction.atomic():
+        if index is not None:
+            index_objects(index, [instance])
+        for dependent in INDEXES:
+            if type(instance) in dependent.depends_on:
+                index_objects(dependent, dependent.documents_for(instance))
+
+
+def remove(model, pk):
+    """Drops the index entries of the ``model`` object ``pk``."""
+    index = INDEXES_BY_MODEL[model]
+    with transaction.atomic():
+        SearchDocument.objects.filter(kind=index.kind, object_id=pk).delete()
+        SearchToken.objects.filter(kind=index.kind, object_id=pk).delete()
+
+
+def _drop_range(index, after, up_to, keep):
+    # Entries of objects deleted since they were indexed: ids in the range a
+    # rebuild batch covered that the batch no longer contains.
+    for model in (SearchDocument, SearchToken):
+        stale = model.objects.filter(kind=index.kind, object_id__gt=after)
+        if up_to is not None:
+            stale = stale.filter(object_id__lte=up_to)
+        stale.exclude(object_id__in=keep).delete()
+
+
+def rebuild(batch_size=REBUILD_BATCH_SIZE, progress=None):
+    """
+    Reindexes every object, ``batch_size`` objects per transaction, and
+    drops the entries of objects that no longer exist; returns the count.
+    Each batch replaces its own entries as it commits, so searches keep
+    finding every object while the rebuild runs and no transaction holds
+    more than one batch of rows.
+    """
+    done = 0
+    for index in INDEXES:
+        queryset = index.queryset().order_by('pk')
+        last = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last)[:batch_size])
+            complete = len(batch) < batch_size
+            ids = [obj.pk for obj in batch]
+            with transaction.atomic():
+                index_objects(index, batch)
+                _drop_range(index, last, None if complete else ids[-1], ids)
+            done += len(batch)
+            if progress:
+                progress(done)
+            if complete:
+                break
+            last = ids[-1]
+    return done
+
+
+def query_terms(query):
+    """
+    Distinct lower-cased words of ``query``, whole. Unlike ``tokenize`` a
+    word is not split into its letter and digit runs: ``ap07ab1234`` is
+    indexed whole as well, and its runs would each match large parts of the
+    index (``ap`` every AP-registered vehicle).
+    """
+    words = (word[:MAX_TOKEN_LENGTH] for word in _WORD.findall(str(query or '').lower()))
+    return list(dict.fromkeys(words))[:MAX_QUERY_TERMS]
+
+
+def _match(term):
+    if len(term) < MIN_PREFIX_LENGTH:
+        return Q(token=term)
+    return Q(token__istartswith=term)
+
+
+def search(query, kinds=None, limit=DEFAULT_LIMIT):
+    """
+    Objects matching every word of ``query``, best first, as dicts with
+    their ``type``, ``id``, ``title``, ``subtitle``, ``url`` and ``score``.
+    A word counts double where it is a whole token rather than a prefix.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+
+    matches = Q()
+    score = Value(0)
+    found = {}
+    for i, term in enumerate(terms):
+        match = _match(term)
+        matches |= match
+        score += Case(When(token=term, then=F('weight') * 2), When(match, then=F('weight')),
+                      default=0, output_field=IntegerField())
+        found[f'found_{i}'] = Max(Case(When(match, then=1), default=0, output_field=IntegerField()))
+
+    tokens = SearchToken.objects.filter(matches)
+    if kinds:
+        tokens = tokens.filter(kind__in=kinds)
+    ranked = list(
+        tokens.values('kind', 'object_id')
+        .annotate(score=Sum(score), **found)
+        .filter(**{name: 1 for name in found})
+        .order_by('-score', 'kind', '-object_id')[:limit]
+    )
+    if not ranked:
+        return []
+
+    wanted = Q()
+    for row in ranked:
+        wanted |= Q(kind=row['kind'], object_id=row['object_id'])
+    documents = {(d.kind, d.object_id): d for d in SearchDocument.objects.filter(wanted)}
+
+    results = []
+    for row in ranked:
+        document = documents.get((row['kind'], row['object_id']))
+        if document is None:
+            continue
+        results.append({
+            'type': document.kind,
+            'id': document.object_id,
+            'title': document.title,
+            'subtitle': document.subtitle,
+            'url': reverse(INDEXES_BY_KIND[document.kind].url_name, args=[document.object_id]),
+            'score': row['score'],
+        })
+    return results
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from search import index
+
+
+class Command(BaseCommand):
+    help = (
+        "Reindexes the customers, trips, vehicles and vendors for global search, one batch per transaction. "
+        "Run it once after installing the search app and after loading data with signals disabled."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=index.REBUILD_BATCH_SIZE,
+                            help='Objects indexed per write.')
+
+    def handle(self, *args, **options):
+        def progress(done):
+            self.stdout.write(f"\r{done} objects indexed", ending='')
+            self.stdout.flush()
+
+        done = index.rebuild(options['batch_size'], progress)
+        if done:
+            self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(f"Indexed {done} objects for search."))
@@ -0,0 +1,42 @@
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    What a search hit shows for one indexed object: its title and a line
+    of detail. ``kind`` names the index definition in ``search.index``.
+    """
+    kind = models.CharField(max_length=20)
+    object_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=200)
+    subtitle = models.CharField(max_length=255, blank=True)
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}: {self.title}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='search_document_object_uniq'),
+        ]
+
+
+class SearchToken(models.Model):
+    """
+    One normalized word of an indexed object. Searches are prefix matches
+    on ``token`` alone, so they are range scans of one index however many
+    objects are indexed.
+    """
+    token = models.CharField(max_length=64)
+    kind = models.CharField(max_length=20)
+    object_id = models.PositiveBigIntegerField()
+    # How much a match on this word counts towards the object's rank.
+    weight = models.PositiveSmallIntegerField()
+
+    def __str__(self):
+        return f"{self.token} -> {self.kind} #{self.object_id}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['token', 'kind', 'object_id'], name='search_token_idx'),
+            models.Index(fields=['kind', 'object_id'], name='search_token_object_idx'),
+        ]
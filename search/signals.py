@@ -0,0 +1,52 @@
+import logging
+
+from django.db import DatabaseError, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from customers.models import Customer
+from trips.models import Trip
+from vehicles.models import Vehicle
+from vendors.models import Vendor
+from . import index
+
+logger = logging.getLogger(__name__)
+
+# Two saves touching the same object (a customer edit and an edit of one of
+# their trips) may reindex it at the same moment; the loser of that race
+# fails on the unique document key or a deadlock and simply tries again.
+ATTEMPTS = 2
+
+
+def _reindex(work, *args):
+    for attempt in range(1, ATTEMPTS + 1):
+        try:
+            work(*args)
+            return
+        except DatabaseError:
+            if attempt == ATTEMPTS:
+                # The change itself is already committed; a missed update is
+                # repaired by the next save or by rebuild_search_index.
+                logger.exception("Could not update the search index")
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_save, sender=Trip)
+@receiver(post_save, sender=Vehicle)
+@receiver(post_save, sender=Vendor)
+def index_saved(sender, instance, raw=False, **kwargs):
+    # Indexed once the change commits, in a transaction of its own, so a
+    # rolled back edit never reaches the index. Fixture loads are indexed
+    # by rebuilding.
+    if not raw:
+        transaction.on_commit(lambda: _reindex(index.update, instance))
+
+
+@receiver(post_delete, sender=Customer)
+@receiver(post_delete, sender=Trip)
+@receiver(post_delete, sender=Vehicle)
+@receiver(post_delete, sender=Vendor)
+def unindex_deleted(sender, instance, **kwargs):
+    # Delete clears the instance's pk afterwards, so take it now.
+    pk = instance.pk
+    transaction.on_commit(lambda: _reindex(index.remove, sender, pk))
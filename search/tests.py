@@ -0,0 +1,126 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.testing import QueryBudgetTestCase
+from customers.models import Customer
+from trips.models import Trip
+from vehicles.models import Vehicle
+from vendors.models import Vendor
+from . import index
+from .models import SearchDocument, SearchToken
+
+User = get_user_model()
+
+
+class SearchQueryBudgetTests(QueryBudgetTestCase):
+    def test_search_api(self):
+        index.rebuild()
+        self.assertQueryBudget(reverse('search_api') + '?q=Customer', 4)
+
+
+class TokenizeTests(TestCase):
+    def test_splits_words_and_mixed_identifiers(self):
+        self.assertEqual(index.tokenize('AP07AB1234, Guntur'), ['ap07ab1234', 'ap', '07', 'ab', '1234', 'guntur'])
+        self.assertEqual(index.tokenize('ravi.k@example.com'), ['ravi', 'k', 'example', 'com'])
+        self.assertEqual(index.tokenize(None), [])
+
+    def test_query_words_are_not_split(self):
+        self.assertEqual(index.query_terms('AP07AB1234 ap07ab1234, +91 98480'), ['ap07ab1234', '91', '98480'])
+        self.assertEqual(index.query_terms(None), [])
+
+
+class SearchIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Indexing runs on commit, which test transactions never reach.
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.vendor = Vendor.objects.create(name='Sri Travels', district='Guntur', area='Brodipet')
+            cls.vehicle = Vehicle.objects.create(number='AP07AB1234', type='SUV', make='Toyota', model='Innova',
+                                                 vendor=cls.vendor)
+            cls.customer = Customer.objects.create(name='Anita Rao', phone='+91 80000 00031',
+                                                   from_location='Tenali', to_location='Vijayawada')
+            cls.other = Customer.objects.create(name='Anil Kumar', phone='8000000041', from_location='Anitapur')
+            cls.trip = Trip.objects.create(customer=cls.customer, vehicle=cls.vehicle,
+                                           trip_date=timezone.now() + timedelta(days=1))
+
+    def hits(self, query, **kwargs):
+        return [(hit['type'], hit['id']) for hit in index.search(query, **kwargs)]
+
+    def test_finds_objects_by_any_indexed_field(self):
+        self.assertEqual(self.hits('8000000031'), [('customer', self.customer.pk), ('trip', self.trip.pk)])
+        self.assertEqual(self.hits('1234'), [('vehicle', self.vehicle.pk), ('trip', self.trip.pk)])
+        self.assertEqual(self.hits('brodi'), [('vendor', self.vendor.pk)])
+        self.assertEqual(self.hits('vijayawada', kinds=['customer']), [('customer', self.customer.pk)])
+
+    def test_whole_vehicle_number_matches_only_that_vehicle(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Vehicle.objects.create(number='AP09CD5678', type='SUV', make='Toyota', model='Innova', vendor=self.vendor)
+        self.assertEqual(self.hits('AP07AB1234'), [('vehicle', self.vehicle.pk), ('trip', self.trip.pk)])
+        self.assertEqual(self.hits('ap07'), [('vehicle', self.vehicle.pk), ('trip', self.trip.pk)])
+
+    def test_every_word_must_match_and_whole_words_rank_first(self):
+        self.assertEqual(self.hits('anita rao'), [('customer', self.customer.pk), ('trip', self.trip.pk)])
+        # "anita" is the whole name of one customer and a prefix of the
+        # other's starting point.
+        self.assertEqual(self.hits('anita', kinds=['customer']),
+                         [('customer', self.customer.pk), ('customer', self.other.pk)])
+
+    def test_hits_carry_what_the_result_list_shows(self):
+        hit = index.search('AP07AB1234', kinds=['vehicle'])[0]
+        self.assertEqual(hit['title'], 'AP07AB1234')
+        self.assertEqual(hit['subtitle'], 'Toyota Innova (Sri Travels)')
+        self.assertEqual(hit['url'], reverse('vehicle_update', args=[self.vehicle.pk]))
+
+    def test_changes_reach_the_objects_that_show_them(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.customer.name = 'Anitha Reddy'
+            self.customer.save()
+        self.assertEqual(self.hits('reddy'), [('customer', self.customer.pk), ('trip', self.trip.pk)])
+        self.assertEqual(self.hits('rao'), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.vendor.name = 'Ravi Cabs'
+            self.vendor.save()
+        self.assertEqual(self.hits('ravi'), [('vendor', self.vendor.pk), ('vehicle', self.vehicle.pk)])
+
+    def test_index_follows_commits_only(self):
+        self.customer.name = 'Anitha Reddy'
+        self.customer.save()
+        # Not committed yet: the index still shows the old name.
+        self.assertEqual(self.hits('reddy'), [])
+
+    def test_deleted_objects_leave_the_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.delete()
+        self.assertEqual(self.hits('kumar'), [])
+        self.assertFalse(SearchToken.objects.filter(kind='customer', object_id=self.other.pk).exists())
+
+    def test_short_words_match_whole_tokens_only(self):
+        self.assertEqual(self.hits('a'), [])
+        self.assertEqual(self.hits(str(self.trip.pk), kinds=['trip']), [('trip', self.trip.pk)])
+
+    def test_rebuild_command_restores_the_index(self):
+        SearchDocument.objects.filter(kind='customer').delete()
+        SearchToken.objects.filter(kind='customer').delete()
+        # Left behind by a customer deleted while the index was not updated.
+        SearchDocument.objects.create(kind='customer', object_id=self.other.pk + 100, title='Gone')
+        SearchToken.objects.create(kind='customer', object_id=self.other.pk + 100, token='gone', weight=3)
+        out = StringIO()
+        call_command('rebuild_search_index', '--batch-size', '1', stdout=out)
+        self.assertIn('Indexed 5 objects', out.getvalue())
+        self.assertEqual(self.hits('anil'), [('customer', self.other.pk)])
+        self.assertEqual(self.hits('gone'), [])
+        self.assertEqual(SearchDocument.objects.count(), 5)
+
+    def test_api_requires_login_and_filters_by_type(self):
+        url = reverse('search_api')
+        self.assertEqual(self.client.get(url, {'q': 'anita'}).status_code, 302)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com'))
+        response = self.client.get(url, {'q': 'anita', 'type': ['trip', 'bogus']})
+        self.assertEqual([(hit['type'], hit['id']) for hit in response.json()], [('trip', self.trip.pk)])
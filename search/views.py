@@ -0,0 +1,12 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+
+from . import index
+
+
+@login_required
+def search_api(request):
+    # Ranked hits for the words of ?q=, optionally limited to ?type=trip etc.
+    query = request.GET.get('q', '')
+    kinds = [kind for kind in request.GET.getlist('type') if kind in index.INDEXES_BY_KIND]
+    return JsonResponse(index.search(query, kinds=kinds), safe=False)
@@ -0,0 +1,85 @@
+/*
+ * Server-side list tables.
+ *
+ * A container marked with data-list-endpoint holds a search box, a table
+ * whose sortable headers carry data-sort-key, a tbody marked data-list-rows
+ * and the pager buttons. Every interaction asks the JSON endpoint for one
+ * keyset page and swaps the rendered rows in.
+ */
+document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('[data-list-endpoint]').forEach(initList);
+
+    function initList(container) {
+        const endpoint = container.dataset.listEndpoint;
+        const rows = container.querySelector('[data-list-rows]');
+        const search = container.querySelector('[data-list-search]');
+        const previousBtn = container.querySelector('[data-list-previous]');
+        const nextBtn = container.querySelector('[data-list-next]');
+        const headers = container.querySelectorAll('[data-sort-key]');
+        const state = {sort: container.dataset.sort || '', q: search ? search.value : ''};
+        let searchTimer = null;
+
+        headers.forEach(function (th) {
+            th.style.cursor = 'pointer';
+            th.addEventListener('click', function () {
+                const key = th.dataset.sortKey;
+                state.sort = state.sort === key ? '-' + key : key;
+                load({});
+            });
+        });
+        markSorted();
+
+        if (search) {
+            search.addEventListener('input', function () {
+                clearTimeout(searchTimer);
+                searchTimer = setTimeout(function () {
+                    state.q = search.value.trim();
+                    load({});
+                }, 300);
+            });
+        }
+        if (previousBtn) previousBtn.addEventListener('click', function () {
+            load({before: previousBtn.dataset.cursor});
+        });
+        if (nextBtn) nextBtn.addEventListener('click', function () {
+            load({after: nextBtn.dataset.cursor});
+        });
+
+        async function load(cursor) {
+            // Keep the page's own filters (status, district, ...) from the URL.
+            const params = new URLSearchParams(window.location.search);
+            ['sort', 'q', 'after', 'before'].forEach(function (name) { params.delete(name); });
+            if (state.sort) params.set('sort', state.sort);
+            if (state.q) params.set('q', state.q);
+            Object.keys(cursor).forEach(function (name) { params.set(name, cursor[name]); });
+
+            try {
+                const response = await fetch(endpoint + '?' + params.toString(), {
+                    headers: {'X-Requested-With': 'XMLHttpRequest'}
+                });
+                const data = await response.json();
+                rows.innerHTML = data.html;
+                state.sort = data.sort;
+                setCursor(previousBtn, data.previous);
+                setCursor(nextBtn, data.next);
+                markSorted();
+            } catch (error) {
+                console.error('Error loading list page:', error);
+            }
+        }
+
+        function setCursor(button, cursor) {
+            if (!button) return;
+            button.dataset.cursor = cursor || '';
+            button.disabled = !cursor;
+        }
+
+        function markSorted() {
+            headers.forEach(function (th) {
+                const key = th.dataset.sortKey;
+                th.classList.toggle('text-primary', state.sort === key || state.sort === '-' + key);
+                th.dataset.sortDir = state.sort === key ? 'asc' : (state.sort === '-' + key ? 'desc' : '');
+            });
+        }
+    }
+});
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TripsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'trips'
+
+    def ready(self):
+        # Keeps the daily trip statistics rollup in step with the trips
+        import trips.signals
@@ -2,6 +2,10 @@ import datetime
 from django.utils import timezone
 
 from django import forms
+from django.urls import reverse_lazy
+
+from core.widgets import TypeaheadSelect
+from vehicles.models import Vehicle
 from .models import Trip, Package, Rating
 
 
@@ -14,8 +18,8 @@ class TripForm(forms.ModelForm):
             'advance_paid', 'advance_paid_date', 'status', 'remarks'
         ]
         widgets = {
-            'customer': forms.Select(attrs={'class': 'form-select'}),
-            'vehicle': forms.Select(attrs={'class': 'form-select'}),
+            'customer': TypeaheadSelect(reverse_lazy('customer_search_api'), attrs={'class': 'form-select'}),
+            'vehicle': TypeaheadSelect(reverse_lazy('vehicle_search_api'), attrs={'class': 'form-select'}),
             'package': forms.Select(attrs={'class': 'form-select'}),
             'trip_date': forms.DateTimeInput(attrs={'class': 'form-control', 'type': 'datetime-local'}),
             'total_price': forms.NumberInput(attrs={'class': 'form-control'}),
@@ -30,6 +34,10 @@ class TripForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        # The selected vehicle is labelled like the typeahead's options, which
+        # show the vendor name, so load it with the option.
+        self.fields['vehicle'].queryset = Vehicle.objects.select_related('vendor')
+        self.fields['vehicle'].label_from_instance = lambda vehicle: vehicle.option_label
         today = datetime.datetime.now().strftime('%Y-%m-%dT%H:%M')
         self.fields['trip_date'].widget.attrs['min'] = today
 
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from trips.stats import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the daily trip statistics rollup from the trips table."
+
+    def handle(self, *args, **options):
+        days = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt trip statistics for {days} day(s)."))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_customer_created_idx'),
+        ('trips', '0004_trip_vendor_advance_trip_vendor_advance_date_and_more'),
+        ('vehicles', '0003_vehicle_price_per_km'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='package',
+            options={'ordering': ['name']},
+        ),
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['status', 'trip_date'], name='trip_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['status', 'created_at'], name='trip_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['trip_date'], name='trip_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['created_at'], name='trip_created_idx'),
+        ),
+    ]
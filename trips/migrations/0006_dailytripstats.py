@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0005_alter_package_options_trip_trip_status_date_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyTripStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('total_trips', models.PositiveIntegerField(default=0)),
+                ('upcoming_trips', models.PositiveIntegerField(default=0)),
+                ('ongoing_trips', models.PositiveIntegerField(default=0)),
+                ('completed_trips', models.PositiveIntegerField(default=0)),
+                ('cancelled_trips', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Total price of the completed trips', max_digits=12)),
+                ('agent_revenue', models.DecimalField(decimal_places=2, default=0, help_text='Commission on the completed trips', max_digits=12)),
+                ('advances', models.DecimalField(decimal_places=2, default=0, help_text='Advances taken on all trips', max_digits=12)),
+                ('created_trips', models.PositiveIntegerField(default=0)),
+                ('created_agent_revenue', models.DecimalField(decimal_places=2, default=0, help_text='Commission on completed trips booked this day', max_digits=12)),
+            ],
+            options={
+                'verbose_name_plural': 'daily trip statistics',
+                'ordering': ['date'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0006_dailytripstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailytripstats',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from decimal import Decimal
 
 from django.db import models
+from django.db.models import Case, DecimalField, ExpressionWrapper, F, Q, Value, When
+from django.db.models.functions import Coalesce
 from django.core.validators import MinValueValidator, MaxValueValidator
 from customers.models import Customer
 from vehicles.models import Vehicle
@@ -23,6 +25,52 @@ class Package(models.Model):
         ordering = ["name"]
 
 
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+ZERO = Value(Decimal('0.00'), output_field=MONEY)
+# SQL form of ``Trip.agent_revenue``.
+COMMISSION = Case(
+    When(~Q(total_price=0) & Q(vendor_price__isnull=False) & ~Q(vendor_price=0),
+         then=F('total_price') - F('vendor_price')),
+    default=ZERO,
+    output_field=MONEY,
+)
+
+
+class TripQuerySet(models.QuerySet):
+    def with_financials(self):
+        """
+        Annotates the values behind ``final_balance``, ``agent_revenue`` and
+        ``remaining_amount`` in SQL so lists and reports can filter, sort and
+        aggregate on them without touching ``package``/``vehicle`` per row.
+        The annotations are the figures as loaded and are for rendering lists
+        and reports; the properties always compute from the trip's current
+        fields, so they stay right when a form changes the instance.
+
+        - ``extra_km_rate``: the package rate, falling back to the vehicle's
+          ``price_per_km``
+        - ``extra_km_cost``: ``additional_distance`` charged at that rate
+        - ``balance_due``: ``final_balance`` as loaded
+        - ``commission``: ``agent_revenue`` as loaded
+        - ``remaining_due``: ``remaining_amount`` as loaded
+        """
+        return self.annotate(
+            extra_km_rate=Coalesce('package__extra_charge_per_km', 'vehicle__price_per_km',
+                                   output_field=MONEY),
+        ).annotate(
+            extra_km_cost=ExpressionWrapper(
+                Coalesce('additional_distance', ZERO) * F('extra_km_rate'), output_field=MONEY
+            ),
+            commission=COMMISSION,
+            remaining_due=ExpressionWrapper(F('total_price') - F('advance_paid'), output_field=MONEY),
+        ).annotate(
+            balance_due=ExpressionWrapper(
+                F('total_price') + F('extra_km_cost')
+                - Coalesce('advance_paid', ZERO) - Coalesce('final_payment_amount', ZERO),
+                output_field=MONEY,
+            ),
+        )
+
+
 class Trip(models.Model):
     class TripStatus(models.TextChoices):
         UPCOMING = 'Upcoming', 'Upcoming'
@@ -46,6 +94,8 @@ class Trip(models.Model):
                                          help_text="Advance paid to the vendor")
     vendor_advance_date = models.DateField(blank=True, null=True)
 
+    objects = TripQuerySet.as_manager()
+
     # remaining_amount can be calculated property
     @property
     def final_balance(self):
@@ -86,8 +136,26 @@ class Trip(models.Model):
     def __str__(self):
         return f"Trip for {self.customer.name} on {self.trip_date.strftime('%Y-%m-%d')}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so the daily rollup can take a rescheduled trip out of
+        # the day it was moved from.
+        instance._loaded_trip_date = instance.__dict__.get('trip_date')
+        return instance
+
     class Meta:
         ordering = ['-trip_date']
+        indexes = [
+            # Dashboard: upcoming trips (status + trip_date) and period revenue
+            # (status + created_at).
+            models.Index(fields=['status', 'trip_date'], name='trip_status_date_idx'),
+            models.Index(fields=['status', 'created_at'], name='trip_status_created_idx'),
+            # Calendar months, report date ranges and the default ordering.
+            models.Index(fields=['trip_date'], name='trip_date_idx'),
+            # Dashboard chart over recently created trips.
+            models.Index(fields=['created_at'], name='trip_created_idx'),
+        ]
 
 
 class Rating(models.Model):
@@ -99,3 +167,37 @@ class Rating(models.Model):
 
     def __str__(self):
         return f"{self.stars} stars for {self.vendor.name} on Trip #{self.trip.id}"
+
+
+class DailyTripStats(models.Model):
+    """
+    One row per day summarising the trip table for the calendar and the
+    dashboard charts. The trip figures cover trips taking place on ``date``;
+    the ``created_*`` figures cover trips booked on ``date``. Kept current
+    by ``trips.signals`` and rebuilt with ``manage.py rebuild_trip_stats``.
+    """
+    date = models.DateField(unique=True)
+    total_trips = models.PositiveIntegerField(default=0)
+    upcoming_trips = models.PositiveIntegerField(default=0)
+    ongoing_trips = models.PositiveIntegerField(default=0)
+    completed_trips = models.PositiveIntegerField(default=0)
+    cancelled_trips = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0,
+                                  help_text="Total price of the completed trips")
+    agent_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0,
+                                        help_text="Commission on the completed trips")
+    advances = models.DecimalField(max_digits=12, decimal_places=2, default=0,
+                                   help_text="Advances taken on all trips")
+    created_trips = models.PositiveIntegerField(default=0)
+    created_agent_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0,
+                                                help_text="Commission on completed trips booked this day")
+    # Bumped whenever a trip touching this day changes, which makes it the
+    # validator for conditional requests to the calendar feed.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Trip statistics for {self.date}"
+
+    class Meta:
+        ordering = ['date']
+        verbose_name_plural = "daily trip statistics"
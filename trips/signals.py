@@ -0,0 +1,23 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Trip
+from .stats import days_for, refresh_days
+
+
+# The rollup is recomputed once the change has committed: inside the saving
+# transaction the recount could not see other saves committed meanwhile.
+@receiver(post_save, sender=Trip)
+def update_daily_stats_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(partial(refresh_days, days_for(instance)))
+    instance._loaded_trip_date = instance.trip_date
+
+
+@receiver(post_delete, sender=Trip)
+def update_daily_stats_on_delete(sender, instance, **kwargs):
+    transaction.on_commit(partial(refresh_days, days_for(instance)))
@@ -0,0 +1,120 @@
+"""
+Maintenance of the ``DailyTripStats`` rollup.
+
+Once a save or delete of a trip commits, only the days it touches (the day
+it takes place on, the day it moved away from and the day it was booked)
+are re-aggregated, each with an indexed range query rather than a counter
+adjusted by deltas. A day's row is locked before its trips are read, so two
+saves touching the same day take turns instead of the later write replacing
+figures that miss the other's trip. Anything else that changes trips, such
+as a raw update or a fixture load, needs ``manage.py rebuild_trip_stats``.
+``rollup_refreshed`` is sent once the rows are current, for caches built
+from them.
+"""
+from django.db import transaction
+from django.dispatch import Signal
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from core.dates import filter_by_days
+from .models import COMMISSION, ZERO, DailyTripStats, Trip
+
+STATUS_FIELDS = {
+    Trip.TripStatus.UPCOMING: 'upcoming_trips',
+    Trip.TripStatus.ON_GOING: 'ongoing_trips',
+    Trip.TripStatus.COMPLETED: 'completed_trips',
+    Trip.TripStatus.CANCELLED: 'cancelled_trips',
+}
+COMPLETED = Q(status=Trip.TripStatus.COMPLETED)
+
+# Sent with the refreshed ``days`` after ``refresh_days`` and with no days
+# after ``rebuild``.
+rollup_refreshed = Signal()
+
+
+def _trip_aggregates():
+    aggregates = {
+        'total_trips': Count('pk'),
+        'revenue': Coalesce(Sum('total_price', filter=COMPLETED), ZERO),
+        'agent_revenue': Coalesce(Sum(COMMISSION, filter=COMPLETED), ZERO),
+        'advances': Coalesce(Sum('advance_paid'), ZERO),
+    }
+    for status, field in STATUS_FIELDS.items():
+        aggregates[field] = Count('pk', filter=Q(status=status))
+    return aggregates
+
+
+def _created_aggregates():
+    return {
+        'created_trips': Count('pk'),
+        'created_agent_revenue': Coalesce(Sum(COMMISSION, filter=COMPLETED), ZERO),
+    }
+
+
+def days_for(trip):
+    """Local days whose rollup rows ``trip`` contributes (or contributed) to."""
+    days = {timezone.localdate(trip.trip_date)}
+    if trip.created_at is not None:
+        days.add(timezone.localdate(trip.created_at))
+    loaded = getattr(trip, '_loaded_trip_date', None)
+    if loaded is not None:
+        days.add(timezone.localdate(loaded))
+    return days
+
+
+def refresh_day(day):
+    """Recomputes the rollup row for ``day`` from the trip table, in a transaction of its own."""
+    # The row is created beforehand so there is always one to lock, and it
+    # is locked before anything else is read: under REPEATABLE READ the
+    # transaction's snapshot starts at its first plain read, so the trips
+    # counted below include every save that held the lock before this one.
+    DailyTripStats.objects.get_or_create(date=day)
+    with transaction.atomic():
+        list(DailyTripStats.objects.select_for_update().filter(date=day).values_list('pk'))
+        values = filter_by_days(Trip.objects, 'trip_date', day, day).aggregate(**_trip_aggregates())
+        values.update(filter_by_days(Trip.objects, 'created_at', day, day).aggregate(**_created_aggregates()))
+        if values['total_trips'] or values['created_trips']:
+            DailyTripStats.objects.update_or_create(date=day, defaults=values)
+        else:
+            DailyTripStats.objects.filter(date=day).delete()
+
+
+def refresh_days(days):
+    """Recomputes the rollup rows for ``days``, one day per transaction."""
+    days = sorted(set(days))
+    for day in days:
+        refresh_day(day)
+    rollup_refreshed.send(sender=DailyTripStats, days=days)
+
+
+def rebuild():
+    """Replaces the whole rollup with two GROUP BY passes over the trips."""
+    rows = {}
+    trip_days = Trip.objects.order_by().annotate(day=TruncDate('trip_date')).values('day')
+    for item in trip_days.annotate(**_trip_aggregates()):
+        row = rows.setdefault(item['day'], DailyTripStats(date=item['day']))
+        for field in _trip_aggregates():
+            setattr(row, field, item[field])
+    created_days = Trip.objects.order_by().annotate(day=TruncDate('created_at')).values('day')
+    for item in created_days.annotate(**_created_aggregates()):
+        row = rows.setdefault(item['day'], DailyTripStats(date=item['day']))
+        for field in _created_aggregates():
+            setattr(row, field, item[field])
+    with transaction.atomic():
+        DailyTripStats.objects.all().delete()
+        DailyTripStats.objects.bulk_create(rows.values(), batch_size=1000)
+    rollup_refreshed.send(sender=DailyTripStats, days=None)
+    return len(rows)
+
+
+def feed_events(stats):
+    """FullCalendar events, one per day with trips, from rollup rows."""
+    return [
+        {
+            'title': f"Total Trips: {row.total_trips}",
+            'start': row.date.isoformat(),
+            'allDay': True,
+        }
+        for row in stats if row.total_trips
+    ]
@@ -1,3 +1,289 @@
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Sum
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import escape
+
+from core import reference
+from core.testing import QueryBudgetTestCase
+from customers.models import Customer
+from vehicles.models import Vehicle
+from vendors.models import Vendor
+from .models import DailyTripStats, Package, Trip
+
+User = get_user_model()
+
+
+class TripViewQueryBudgetTests(QueryBudgetTestCase):
+    def test_trip_list(self):
+        self.assertQueryBudget(reverse('trip_list'), 3)
+
+    def test_trip_list_by_status(self):
+        self.assertQueryBudget(reverse('trip_list') + '?status=Completed', 3)
+
+    def test_trip_list_api(self):
+        self.assertQueryBudget(reverse('trip_list_api'), 3)
+
+    def test_trip_add(self):
+        self.assertQueryBudget(reverse('trip_add'), 3)
+
+    def test_trip_update(self):
+        self.assertQueryBudget(reverse('trip_update', args=[self.trip.pk]), 7)
+
+    def test_trip_form_renders_only_selected_customer_and_vehicle(self):
+        self.client.force_login(self.admin)
+        form = self.client.get(reverse('trip_update', args=[self.trip.pk])).context['form']
+        for name, value, url in (('customer', self.trip.customer_id, reverse('customer_search_api')),
+                                 ('vehicle', self.trip.vehicle_id, reverse('vehicle_search_api'))):
+            html = str(form[name])
+            self.assertEqual(html.count('<option'), 2)
+            self.assertIn(f'value="{value}" selected', html)
+            self.assertIn(f'data-typeahead-url="{url}"', html)
+
+    def test_selected_vehicle_is_labelled_like_the_typeahead_options(self):
+        self.client.force_login(self.admin)
+        vehicle = self.trip.vehicle
+        options = self.client.get(reverse('vehicle_search_api'), {'q': vehicle.number}).json()
+        label = next(option['name'] for option in options if option['id'] == vehicle.pk)
+        form = self.client.get(reverse('trip_update', args=[self.trip.pk])).context['form']
+        self.assertIn(f'selected>{escape(label)}</option>', str(form['vehicle']))
+
+    def test_trip_cancel(self):
+        self.assertQueryBudget(reverse('trip_cancel', args=[self.trip.pk]), 3)
+
+    def test_trip_finalize(self):
+        self.assertQueryBudget(reverse('trip_finalize', args=[self.trip.pk]), 3)
+
+    def test_trip_rate(self):
+        self.assertQueryBudget(reverse('trip_rate', args=[self.completed_trip.pk]), 4)
+
+    def test_trip_feed(self):
+        self.assertQueryBudget(reverse('trip_feed'), 2)
+
+    def test_package_list(self):
+        self.assertQueryBudget(reverse('package_list'), 3)
+
+    def test_package_list_api(self):
+        self.assertQueryBudget(reverse('package_list_api'), 3)
+
+    def test_package_add(self):
+        self.assertQueryBudget(reverse('package_add'), 2)
+
+    def test_package_update(self):
+        self.assertQueryBudget(reverse('package_update', args=[self.package.pk]), 3)
+
+    def test_package_delete(self):
+        self.assertQueryBudget(reverse('package_delete', args=[self.package.pk]), 3)
+
+
+class TripFinancialsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        vendor = Vendor.objects.create(name='Vendor', district='Guntur', area='Area')
+        vehicle = Vehicle.objects.create(number='AP000001', type='SUV', make='Toyota', model='Innova',
+                                         vendor=vendor, price_per_km=Decimal('20.00'))
+        customer = Customer.objects.create(name='Customer', phone='9000000001')
+        package = Package.objects.create(name='Airport', vehicle_type='SUV', vehicle_model='Innova',
+                                         charges=Decimal('2500.00'), extra_charge_per_km=Decimal('12.50'))
+        trip_date = timezone.now()
+        cls.package_trip = Trip.objects.create(
+            customer=customer, vehicle=vehicle, package=package, trip_date=trip_date,
+            total_price=Decimal('3000.00'), vendor_price=Decimal('2400.00'), advance_paid=Decimal('500.00'),
+            additional_distance=Decimal('10.00'), final_payment_amount=Decimal('1000.00'),
+        )
+        cls.plain_trip = Trip.objects.create(
+            customer=customer, vehicle=vehicle, trip_date=trip_date,
+            total_price=Decimal('1800.00'), advance_paid=Decimal('200.00'), additional_distance=Decimal('4.00'),
+        )
+        cls.bare_trip = Trip.objects.create(customer=customer, vehicle=vehicle, trip_date=trip_date)
+
+    def test_annotations_match_python_properties(self):
+        annotated = Trip.objects.with_financials()
+        for trip in [self.package_trip, self.plain_trip, self.bare_trip]:
+            fresh = Trip.objects.get(pk=trip.pk)
+            row = annotated.get(pk=trip.pk)
+            self.assertEqual(row.balance_due, fresh.final_balance)
+            self.assertEqual(row.commission, fresh.agent_revenue)
+            self.assertEqual(row.remaining_due, fresh.remaining_amount)
+
+    def test_properties_follow_changes_to_an_annotated_trip(self):
+        trip = Trip.objects.with_financials().select_related('package', 'vehicle').get(pk=self.plain_trip.pk)
+        trip.total_price += Decimal('500.00')
+        trip.vendor_price = Decimal('1500.00')
+        trip.additional_distance = Decimal('0.00')
+        self.assertEqual(trip.remaining_amount, Decimal('2100.00'))
+        self.assertEqual(trip.agent_revenue, Decimal('800.00'))
+        self.assertEqual(trip.final_balance, Decimal('2100.00'))
+        self.assertEqual(trip.balance_due, Decimal('1680.00'))
+
+    def test_extra_km_rate_falls_back_to_vehicle_price(self):
+        rows = {trip.pk: trip for trip in Trip.objects.with_financials()}
+        self.assertEqual(rows[self.package_trip.pk].extra_km_rate, Decimal('12.50'))
+        self.assertEqual(rows[self.package_trip.pk].extra_km_cost, Decimal('125.00'))
+        self.assertEqual(rows[self.plain_trip.pk].extra_km_rate, Decimal('20.00'))
+        self.assertEqual(rows[self.plain_trip.pk].extra_km_cost, Decimal('80.00'))
+        self.assertEqual(rows[self.bare_trip.pk].extra_km_cost, Decimal('0.00'))
+
+    def test_balance_can_be_filtered_sorted_and_summed_in_sql(self):
+        trips = Trip.objects.with_financials()
+        with self.assertNumQueries(1):
+            outstanding = list(trips.filter(balance_due__gt=0).order_by('-balance_due').values_list('pk', flat=True))
+        self.assertEqual(outstanding, [self.plain_trip.pk, self.package_trip.pk])
+        self.assertEqual(trips.aggregate(total=Sum('balance_due'))['total'], Decimal('3305.00'))
+        self.assertEqual(trips.aggregate(total=Sum('commission'))['total'], Decimal('600.00'))
+
+
+class DailyTripStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        vendor = Vendor.objects.create(name='Vendor', district='Guntur', area='Area')
+        cls.vehicle = Vehicle.objects.create(number='AP000001', type='SUV', make='Toyota', model='Innova',
+                                             vendor=vendor)
+        cls.customer = Customer.objects.create(name='Customer', phone='9000000001')
+
+    def _trip(self, trip_date, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Trip.objects.create(customer=self.customer, vehicle=self.vehicle, trip_date=trip_date, **kwargs)
+
+    def _snapshot(self):
+        return list(DailyTripStats.objects.values())
+
+    def test_rollup_follows_saves_and_deletes(self):
+        today = timezone.localdate()
+        later = timezone.now() + timedelta(days=3)
+        trip = self._trip(later, total_price=Decimal('3000.00'), vendor_price=Decimal('2400.00'),
+                          advance_paid=Decimal('500.00'))
+        row = DailyTripStats.objects.get(date=timezone.localdate(later))
+        self.assertEqual((row.total_trips, row.upcoming_trips, row.advances), (1, 1, Decimal('500.00')))
+        self.assertEqual(DailyTripStats.objects.get(date=today).created_trips, 1)
+
+        # Nothing changes until the save commits.
+        trip.status = Trip.TripStatus.COMPLETED
+        with self.captureOnCommitCallbacks(execute=True):
+            trip.save()
+            row.refresh_from_db()
+            self.assertEqual(row.completed_trips, 0)
+        row.refresh_from_db()
+        self.assertEqual((row.upcoming_trips, row.completed_trips), (0, 1))
+        self.assertEqual((row.revenue, row.agent_revenue), (Decimal('3000.00'), Decimal('600.00')))
+        self.assertEqual(DailyTripStats.objects.get(date=today).created_agent_revenue, Decimal('600.00'))
+
+        # Rescheduling moves the trip out of its old day.
+        trip = Trip.objects.get(pk=trip.pk)
+        trip.trip_date = later + timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            trip.save()
+        self.assertFalse(DailyTripStats.objects.filter(date=timezone.localdate(later)).exists())
+        self.assertEqual(DailyTripStats.objects.get(date=timezone.localdate(trip.trip_date)).total_trips, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            trip.delete()
+        self.assertFalse(DailyTripStats.objects.exists())
+
+    def test_rebuild_matches_incremental_rollup(self):
+        now = timezone.now()
+        self._trip(now, status=Trip.TripStatus.COMPLETED, total_price=Decimal('1000.00'),
+                   vendor_price=Decimal('800.00'))
+        self._trip(now, status=Trip.TripStatus.CANCELLED, advance_paid=Decimal('100.00'))
+        self._trip(now - timedelta(days=40))
+        incremental = self._snapshot()
+
+        DailyTripStats.objects.all().delete()
+        call_command('rebuild_trip_stats', stdout=StringIO())
+        rebuilt = self._snapshot()
+        for row in incremental + rebuilt:
+            row.pop('id')
+            row.pop('updated_at')
+        self.assertEqual(rebuilt, incremental)
+
+
+class TripFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        vendor = Vendor.objects.create(name='Vendor', district='Guntur', area='Area')
+        cls.vehicle = Vehicle.objects.create(number='AP000001', type='SUV', make='Toyota', model='Innova',
+                                             vendor=vendor)
+        cls.customer = Customer.objects.create(name='Customer', phone='9000000001')
+        cls.day = timezone.make_aware(datetime(2026, 3, 10, 9, 30))
+        # The rollup the feed reads is updated on commit.
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.trip = Trip.objects.create(customer=cls.customer, vehicle=cls.vehicle, trip_date=cls.day)
+            Trip.objects.create(customer=cls.customer, vehicle=cls.vehicle, trip_date=cls.day + timedelta(days=60))
+
+    def _feed(self, **headers):
+        return self.client.get(reverse('trip_feed'), {'start': '2026-03-01T00:00:00+00:00',
+                                                      'end': '2026-04-12T00:00:00+00:00'}, headers=headers)
+
+    def test_feed_is_limited_to_window(self):
+        response = self._feed()
+        self.assertEqual(response.json(), [{'title': 'Total Trips: 1', 'start': '2026-03-10', 'allDay': True}])
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+    def test_unchanged_window_is_not_modified(self):
+        etag = self._feed()['ETag']
+        with self.assertNumQueries(1):
+            response = self._feed(if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_trip_changes_invalidate_the_feed(self):
+        etag = self._feed()['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Trip.objects.create(customer=self.customer, vehicle=self.vehicle, trip_date=self.day)
+        self.assertEqual(self._feed(if_none_match=etag).status_code, 200)
+
+        etag = self._feed()['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Trip.objects.filter(trip_date__gte=self.day - timedelta(hours=1),
+                                trip_date__lt=self.day + timedelta(hours=1)).first().delete()
+        self.assertEqual(self._feed(if_none_match=etag).status_code, 200)
+
+        etag = self._feed()['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.trip.delete()
+        response = self._feed(if_none_match=etag)
+        self.assertEqual((response.status_code, response.json()), (200, []))
+
+    async def test_feed_under_asgi(self):
+        params = {'start': '2026-03-01T00:00:00+00:00', 'end': '2026-04-12T00:00:00+00:00'}
+        response = await self.async_client.get(reverse('trip_feed'), params)
+        self.assertEqual(response.json(), [{'title': 'Total Trips: 1', 'start': '2026-03-10', 'allDay': True}])
+        response = await self.async_client.get(reverse('trip_feed'), params, headers={'if-none-match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+
+class ReferenceDataTests(TestCase):
+    def setUp(self):
+        cache.delete(reference.CACHE_KEY)
+        Vendor.objects.create(name='Vendor', district='Guntur', area='Area')
+        self.package = Package.objects.create(name='Airport', vehicle_type='SUV', vehicle_model='Innova',
+                                              charges=Decimal('2500.00'), extra_charge_per_km=Decimal('12.50'))
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com'))
+
+    def test_trip_form_reads_cached_reference_data(self):
+        response = self.client.get(reverse('trip_add'))
+        self.assertEqual(list(response.context['districts']), ['Guntur'])
+        self.assertEqual(json.loads(response.context['package_prices_json']), {str(self.package.pk): '2500.00'})
+
+        with self.assertNumQueries(0):
+            data = reference.get_reference_data()
+        self.assertEqual(data.package_prices, {str(self.package.pk): '2500.00'})
 
-# Create your tests here.
+    def test_committed_changes_drop_the_cache(self):
+        reference.get_reference_data()
+        with self.captureOnCommitCallbacks(execute=True):
+            Vendor.objects.create(name='Other', district='Krishna', area='Area')
+            self.package.charges = Decimal('3000.00')
+            self.package.save()
+        data = reference.get_reference_data()
+        self.assertEqual(data.districts, ('Guntur', 'Krishna'))
+        self.assertEqual(data.package_prices, {str(self.package.pk): '3000.00'})
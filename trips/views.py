@@ -1,74 +1,112 @@
-import json
+from datetime import timedelta
 
 from django.conf import settings
-from django.core.mail import send_mail
-from django.db.models import Count
-from django.db.models.functions import TruncDate
+from django.db import transaction
+from django.db.models import Count, Max, Sum
 from django.http import JsonResponse
 from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import http_date, quote_etag
 
 from customers.forms import CustomerForm
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, permission_required
 
-from vehicles.models import Vehicle
-from vendors.models import Vendor
-from .models import Trip, Package
+from auditing.writer import history as audit_history
+from core.dates import filter_by_days, parse_day
+from core.listing import ListEngine, list_json_response
+from core.reference import get_reference_data
+from notifications.outbox import queue_mail
+from .models import DailyTripStats, Trip, Package
+from .stats import feed_events
 from .forms import TripForm, PackageForm, TripFinalizeForm, RatingForm
 
+# Longest window the calendar feed serves in one response.
+FEED_MAX_DAYS = 366
 
-@login_required
-def trip_list_view(request):
+
+def _trip_list_page(request):
     # Get status from URL query parameter
     status_filter = request.GET.get('status', '')
 
-    trips = Trip.objects.select_related('customer', 'vehicle', 'vehicle__vendor').all()
+    trips = Trip.objects.select_related('customer', 'vehicle', 'vehicle__vendor', 'rating').all()
 
     # Apply filter if a status is provided
     if status_filter:
         trips = trips.filter(status=status_filter)
 
+    # A single day, as linked from the calendar
+    day = parse_day(request.GET.get('date'))
+    if day is not None:
+        trips = filter_by_days(trips, 'trip_date', day, day)
+
+    engine = ListEngine(
+        trips,
+        sort_fields={
+            'trip_date': 'trip_date',
+            'created_at': 'created_at',
+            'customer': 'customer__name',
+            'total_price': 'total_price',
+            'status': 'status',
+        },
+        default_sort='-trip_date',
+        search_fields=('customer__name', 'customer__phone', 'vehicle__number'),
+    )
+    return engine.paginate(request.GET)
+
+
+@login_required
+def trip_list_view(request):
+    page = _trip_list_page(request)
     context = {
-        'trips': trips,
+        'page': page,
+        'trips': page.rows,
         'title': 'Trips'
     }
     return render(request, 'trips/trip_list.html', context)
 
 
+@login_required
+def trip_list_api(request):
+    return list_json_response(request, _trip_list_page(request), 'trips/trip_rows.html')
+
+
 @login_required
 def trip_add_view(request):
     if request.method == 'POST':
         form = TripForm(request.POST)
         if form.is_valid():
-            trip = form.save()
-            if trip.customer.email:
-                subject = f'Trip Confirmed: Aronee Booking #{trip.id}'
-                html_message = render_to_string('emails/trip_confirmation.html', {'trip': trip})
-                send_mail(
-                    subject, '',
-                    settings.DEFAULT_FROM_EMAIL,
-                    [trip.customer.email],
-                    html_message=html_message
-                )
+            # The confirmation is queued in the same transaction as the trip and
+            # delivered by the send_outbox worker, never inside the request.
+            with transaction.atomic():
+                trip = form.save()
+                if trip.customer.email:
+                    subject = f'Trip Confirmed: Aronee Booking #{trip.id}'
+                    html_message = render_to_string('emails/trip_confirmation.html', {'trip': trip})
+                    queue_mail(
+                        subject, '',
+                        settings.DEFAULT_FROM_EMAIL,
+                        [trip.customer.email],
+                        html_message=html_message
+                    )
             messages.success(request, 'Trip created successfully!')
             return redirect('trip_list')
     else:
         form = TripForm()
-    packages = Package.objects.all()
-    # Pass only the base charges for auto-filling the price
-
-    package_prices = {str(p.id): str(p.charges) for p in packages}
-    districts = Vendor.objects.values_list('district', flat=True).distinct().order_by('district')
-    vehicle_types = Vehicle.VehicleType.choices
+    # Districts, vehicle types and the base package charges (for
+    # auto-filling the price) come from the cached reference data.
+    reference = get_reference_data()
     context = {
         'form': form,
         'title': 'Create a New Trip',
-        'package_prices_json': json.dumps(package_prices),
+        'package_prices_json': reference.package_prices_json,
         'customer_form': CustomerForm(),
-        'districts': districts,
-        'vehicle_types': vehicle_types,
+        'districts': reference.districts,
+        'vehicle_types': reference.vehicle_types,
     }
     return render(request, 'trips/trip_form.html', context)
 
@@ -84,18 +122,15 @@ def trip_update_view(request, pk):
             return redirect('trip_list')
     else:
         form = TripForm(instance=trip)
-    packages = Package.objects.all()
-    # Pass only the base charges for auto-filling the price
-    districts = Vendor.objects.values_list('district', flat=True).distinct().order_by('district')
-    vehicle_types = Vehicle.VehicleType.choices
-    package_prices = {str(p.id): str(p.charges) for p in packages}
+    reference = get_reference_data()
     context = {
         'form': form,
         'title': 'Update Trip',
-        'package_prices_json': json.dumps(package_prices),
+        'history': audit_history(trip),
+        'package_prices_json': reference.package_prices_json,
         'customer_form': CustomerForm(),
-        'districts': districts,
-        'vehicle_types': vehicle_types,
+        'districts': reference.districts,
+        'vehicle_types': reference.vehicle_types,
     }
     return render(request, 'trips/trip_form.html', context)
 
@@ -105,21 +140,21 @@ def trip_cancel_view(request, pk):
     trip = get_object_or_404(Trip.objects.select_related('customer'), pk=pk)
 
     if request.method == 'POST':
-        trip.status = 'Cancelled'
-        trip.save()
-
-        # --- Send Cancellation Email ---
-        if trip.customer.email:
-            subject = f'Trip Cancelled: Aronee Booking #{trip.id}'
-            html_message = render_to_string('emails/trip_cancellation.html', {'trip': trip})
-            send_mail(
-                subject,
-                '',  # Plain text message (optional)
-                settings.DEFAULT_FROM_EMAIL,
-                [trip.customer.email],
-                html_message=html_message,
-                fail_silently=False  # Set to True in production if you want to ignore errors
-            )
+        with transaction.atomic():
+            trip.status = 'Cancelled'
+            trip.save()
+
+            # --- Queue Cancellation Email ---
+            if trip.customer.email:
+                subject = f'Trip Cancelled: Aronee Booking #{trip.id}'
+                html_message = render_to_string('emails/trip_cancellation.html', {'trip': trip})
+                queue_mail(
+                    subject,
+                    '',  # Plain text message (optional)
+                    settings.DEFAULT_FROM_EMAIL,
+                    [trip.customer.email],
+                    html_message=html_message
+                )
 
         messages.success(request, 'Trip has been successfully cancelled.')
         return redirect('trip_list')
@@ -131,16 +166,32 @@ def trip_cancel_view(request, pk):
     return render(request, 'trips/trip_confirm_cancel.html', context)
 
 
+def _package_list_page(request):
+    engine = ListEngine(
+        Package.objects.all(),
+        sort_fields={'name': 'name', 'vehicle_type': 'vehicle_type', 'charges': 'charges'},
+        default_sort='name',
+        search_fields=('name', 'vehicle_model'),
+    )
+    return engine.paginate(request.GET)
+
+
 @login_required
 def package_list_view(request):
-    packages = Package.objects.all()
+    page = _package_list_page(request)
     context = {
-        'packages': packages,
+        'page': page,
+        'packages': page.rows,
         'title': 'Trip Packages'
     }
     return render(request, 'trips/packages/package_list.html', context)
 
 
+@login_required
+def package_list_api(request):
+    return list_json_response(request, _package_list_page(request), 'trips/packages/package_rows.html')
+
+
 @login_required
 def package_add_view(request):
     if request.method == 'POST':
@@ -193,13 +244,10 @@ def package_delete_view(request, pk):
 
 @login_required
 def trip_finalize_view(request, pk):
-    trip = get_object_or_404(Trip.objects.select_related('package', 'vehicle'), pk=pk)
+    trip = get_object_or_404(Trip.objects.with_financials().select_related('customer'), pk=pk)
 
-    # Determine the rate for extra kilometers
-    if trip.package and trip.package.extra_charge_per_km is not None:
-        extra_km_rate = trip.package.extra_charge_per_km
-    else:
-        extra_km_rate = trip.vehicle.price_per_km
+    # The rate for extra kilometers: package rate, else the vehicle's price per km
+    extra_km_rate = trip.extra_km_rate
 
     if request.method == 'POST':
         form = TripFinalizeForm(request.POST, instance=trip)
@@ -257,24 +305,59 @@ def add_rating_view(request, pk):
     return render(request, 'trips/trip_rate_form.html', context)
 
 
-def trip_feed_view(request):
+def _feed_window(request):
+    """
+    Returns the ``[start, end)`` dates FullCalendar asks for, which it sends
+    as ISO dates or datetimes. Defaults to the current month and never spans
+    more than ``FEED_MAX_DAYS``.
+    """
+    def parse(value):
+        if not value:
+            return None
+        try:
+            parsed = parse_datetime(value)
+            if parsed is not None:
+                return timezone.localdate(parsed) if timezone.is_aware(parsed) else parsed.date()
+            return parse_date(value)
+        except ValueError:
+            return None
+
+    start = parse(request.GET.get('start'))
+    end = parse(request.GET.get('end'))
+    if start is None:
+        start = timezone.localdate().replace(day=1)
+    if end is None or end <= start:
+        end = (start + timedelta(days=32)).replace(day=1)
+    return start, min(end, start + timedelta(days=FEED_MAX_DAYS))
+
+
+async def trip_feed_view(request):
     """
-    Provides a daily summary of trips as a JSON feed for the FullCalendar.
+    Provides a daily summary of trips as a JSON feed for the FullCalendar,
+    limited to the requested ``start``/``end`` window and answering
+    conditional requests with 304 when no trip in the window changed.
+    Async, like the trip form's other lookups, so ASGI workers are not
+    held while it waits on the database.
     """
-    # Group trips by date and get the count for each day
-    daily_counts = Trip.objects.annotate(
-        date=TruncDate('trip_date')
-    ).values('date').annotate(
-        count=Count('id')
-    ).order_by('date')
-
-    events = []
-    for daily_summary in daily_counts:
-        events.append({
-            # The title will now be the total count
-            'title': f"Total Trips: {daily_summary['count']}",
-            'start': daily_summary['date'].isoformat(),
-            'allDay': True,  # This displays the event neatly at the top of the day cell
-        })
-
-    return JsonResponse(events, safe=False)
+    start, end = _feed_window(request)
+    # One rollup row per day instead of a GROUP BY over every trip
+    stats = filter_by_days(DailyTripStats.objects, 'date', start, end - timedelta(days=1))
+    state = await stats.aaggregate(last_modified=Max('updated_at'), days=Count('pk'), trips=Sum('total_trips'))
+    last_modified = state['last_modified']
+    # The row count and trip total also change when a day's last trip is
+    # deleted, which removes its row rather than bumping updated_at.
+    etag = quote_etag(
+        f"{start:%Y%m%d}-{end:%Y%m%d}-{last_modified.timestamp() if last_modified else 0}"
+        f"-{state['days']}-{state['trips'] or 0}"
+    )
+    last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified_ts)
+    if response is None:
+        response = JsonResponse(feed_events([row async for row in stats]), safe=False)
+    response['ETag'] = etag
+    if last_modified_ts is not None:
+        response['Last-Modified'] = http_date(last_modified_ts)
+    # Let the browser keep the feed but revalidate it on every navigation.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,151 @@
+"""
+Process-local catalog of the vehicles offered in the trip form.
+
+The trip form's vehicle picker looks vehicles up on every keystroke and
+filter change, so ``vehicle_search_api`` (and the older
+``vehicles_by_vendor_api``) are served from memory. Each vehicle is reduced
+to its id and a prebuilt label. The entries are indexed by vendor, by
+case-folded district and by type, each optionally combined with a type,
+and kept in vehicle number order so a number prefix is found by bisection.
+A lookup is then a dictionary access with no queries.
+
+``vehicles.signals`` bumps a version number in the Django cache when a
+vehicle or vendor is saved or deleted, and every process rebuilds its
+catalog when it sees a new version. With a cache shared between processes
+(Redis, Memcached) this reaches every worker at once; with the default
+per-process cache, ``CATALOG_MAX_AGE`` bounds how stale another worker's
+catalog can get.
+"""
+import time
+import uuid
+from bisect import bisect_left
+from dataclasses import dataclass, field
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+from vendors.models import normalize_district
+from .models import Vehicle, option_label
+
+VERSION_KEY = 'vehicles:catalog:version'
+# Seconds after which a process rebuilds its catalog even without a change.
+CATALOG_MAX_AGE = 300
+
+_catalog = None
+
+
+class Listing(list):
+    """``{'id', 'name'}`` entries in vehicle number order, with the case-folded numbers alongside."""
+
+    def __init__(self):
+        super().__init__()
+        self.numbers = []
+
+    def add(self, number, entry):
+        self.numbers.append(number)
+        self.append(entry)
+
+
+EMPTY = Listing()
+
+
+@dataclass
+class Catalog:
+    version: str
+    built_at: float
+    # Keyed by (type or None); then by (vendor id, type or None) and
+    # (district key, type or None). Values are Listings.
+    by_type: dict = field(default_factory=dict)
+    by_vendor: dict = field(default_factory=dict)
+    by_district: dict = field(default_factory=dict)
+
+    def lookup(self, vendor_id=None, district=None, vehicle_type=None):
+        """Entries for a vendor, else a district, else all vehicles, narrowed to ``vehicle_type``."""
+        vehicle_type = vehicle_type or None
+        if vendor_id:
+            return self.by_vendor.get((vendor_id, vehicle_type), EMPTY)
+        if district:
+            return self.by_district.get((normalize_district(district), vehicle_type), EMPTY)
+        return self.by_type.get(vehicle_type, EMPTY)
+
+    def search(self, prefix, limit, vendor_id=None, district=None, vehicle_type=None):
+        """The first ``limit`` entries of ``lookup()`` whose vehicle number starts with ``prefix``."""
+        listing = self.lookup(vendor_id, district, vehicle_type)
+        prefix = prefix.casefold()
+        start = bisect_left(listing.numbers, prefix)
+        end = start
+        while end < len(listing) and end - start < limit and listing.numbers[end].startswith(prefix):
+            end += 1
+        return listing[start:end]
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+async def _aversion():
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, uuid.uuid4().hex, None)
+        version = await cache.aget(VERSION_KEY)
+    return version
+
+
+def build_catalog(version=None):
+    """Loads every vehicle in one query and indexes it."""
+    global _catalog
+    catalog = Catalog(version=version or _version(), built_at=time.monotonic())
+    rows = Vehicle.objects.values_list(
+        'id', 'number', 'make', 'model', 'type', 'vendor_id', 'vendor__name', 'vendor__district_key',
+    )
+    # Sorted here rather than by the database so the order matches the
+    # case-folded keys the searches bisect.
+    for pk, number, make, model, vehicle_type, vendor_id, vendor_name, district_key in sorted(
+            rows, key=lambda row: row[1].casefold()):
+        entry = {'id': pk, 'name': option_label(number, make, model, vendor_name)}
+        number = number.casefold()
+        for key in (None, vehicle_type):
+            catalog.by_type.setdefault(key, Listing()).add(number, entry)
+            catalog.by_vendor.setdefault((vendor_id, key), Listing()).add(number, entry)
+            catalog.by_district.setdefault((district_key, key), Listing()).add(number, entry)
+    _catalog = catalog
+    return catalog
+
+
+def _is_current(catalog, version):
+    return (catalog is not None and time.monotonic() - catalog.built_at <= CATALOG_MAX_AGE
+            and catalog.version == version)
+
+
+def current_catalog():
+    """The catalog if it is still current, else ``None``; never queries the database."""
+    catalog = _catalog
+    return catalog if _is_current(catalog, _version()) else None
+
+
+def get_catalog():
+    return current_catalog() or build_catalog()
+
+
+async def aget_catalog():
+    """
+    ``get_catalog()`` for async views: the version is read with the cache's
+    async API and a rebuild runs in a thread, so a cache shared between
+    processes is never waited on from the event loop.
+    """
+    version = await _aversion()
+    catalog = _catalog
+    if not _is_current(catalog, version):
+        catalog = await sync_to_async(build_catalog)(version)
+    return catalog
+
+
+def invalidate():
+    """Marks every process's catalog as outdated."""
+    global _catalog
+    _catalog = None
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0003_vehicle_price_per_km'),
+        ('vendors', '0002_alter_vendor_options_vendor_district_key_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['created_at'], name='vehicle_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['type', 'vendor'], name='vehicle_type_vendor_idx'),
+        ),
+    ]
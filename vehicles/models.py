@@ -1,6 +1,12 @@
 from django.db import models
 from vendors.models import Vendor
 
+
+def option_label(number, make, model, vendor_name):
+    """How the trip form lists a vehicle: in its picker and in the lookups that fill it."""
+    return f"{number} - {make} {model} ({vendor_name})"
+
+
 class Vehicle(models.Model):
     class VehicleType(models.TextChoices):
         SEDAN = 'Sedan', 'Sedan'
@@ -26,5 +32,13 @@ class Vehicle(models.Model):
     def __str__(self):
         return f"{self.number} - {self.type} ({self.vendor.name})"
 
+    @property
+    def option_label(self):
+        return option_label(self.number, self.make, self.model, self.vendor.name)
+
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='vehicle_created_idx'),
+            models.Index(fields=['type', 'vendor'], name='vehicle_type_vendor_idx'),
+        ]
\ No newline at end of file
@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from vendors.models import Vendor
+from .catalog import invalidate
+from .models import Vehicle
+
+
+@receiver([post_save, post_delete], sender=Vehicle)
+@receiver([post_save, post_delete], sender=Vendor)
+def drop_vehicle_catalog(sender, **kwargs):
+    # Rebuild only once the change is committed, so a concurrent lookup
+    # cannot load the pre-change rows into a fresh catalog.
+    transaction.on_commit(invalidate)
@@ -1,3 +1,121 @@
+import asyncio
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+
+from core.testing import QueryBudgetTestCase
+from vendors.models import Vendor
+from . import catalog
+from .models import Vehicle
+
+User = get_user_model()
+
+
+class VehicleViewQueryBudgetTests(QueryBudgetTestCase):
+    def test_vehicle_list(self):
+        self.assertQueryBudget(reverse('vehicle_list'), 3)
+
+    def test_vehicle_list_filtered(self):
+        self.assertQueryBudget(reverse('vehicle_list') + '?district=guntur&type=SUV', 3)
+
+    def test_vehicle_list_api(self):
+        self.assertQueryBudget(reverse('vehicle_list_api'), 3)
+
+    def test_vehicle_add(self):
+        self.assertQueryBudget(reverse('vehicle_add'), 3)
+
+    def test_vehicle_update(self):
+        self.assertQueryBudget(reverse('vehicle_update', args=[self.trip.vehicle_id]), 4)
+
+    def test_vehicle_delete(self):
+        self.assertQueryBudget(reverse('vehicle_delete', args=[self.trip.vehicle_id]), 3)
+
+    def test_vehicles_by_vendor_api(self):
+        self.assertQueryBudget(reverse('api_vehicles_by_vendor'), 0)
+
+    def test_vehicles_by_vendor_api_district(self):
+        self.assertQueryBudget(reverse('api_vehicles_by_vendor') + '?district=Guntur&type=SUV', 0)
+
+    def test_vehicle_search_api(self):
+        self.assertQueryBudget(reverse('vehicle_search_api') + '?q=AP&district=Guntur', 2)
+
+
+class VehicleCatalogTests(TestCase):
+    def setUp(self):
+        catalog.invalidate()
+        self.vendor = Vendor.objects.create(name='Sri Travels', district='Guntur', area='Brodipet')
+        self.other = Vendor.objects.create(name='Ravi Cabs', district='Krishna', area='Benz Circle')
+        self.suv = Vehicle.objects.create(
+            number='AP07AB1234', type=Vehicle.VehicleType.SUV, make='Toyota', model='Innova', vendor=self.vendor,
+        )
+        self.sedan = Vehicle.objects.create(
+            number='AP16CD5678', type=Vehicle.VehicleType.SEDAN, make='Honda', model='City', vendor=self.other,
+        )
+        self.url = reverse('api_vehicles_by_vendor')
+
+    def lookup(self, **params):
+        return [v['id'] for v in self.client.get(self.url, params).json()]
+
+    def test_lookups_by_vendor_district_and_type(self):
+        self.assertEqual(self.client.get(self.url, {'vendor_id': self.vendor.pk}).json(),
+                         [{'id': self.suv.pk, 'name': 'AP07AB1234 - Toyota Innova (Sri Travels)'}])
+        self.assertEqual(self.lookup(district='gUNTUR'), [self.suv.pk])
+        self.assertEqual(self.lookup(district='Krishna', type=Vehicle.VehicleType.SUV), [])
+        self.assertEqual(self.lookup(type=Vehicle.VehicleType.SEDAN), [self.sedan.pk])
+        self.assertEqual(self.lookup(), [self.suv.pk, self.sedan.pk])
+        self.assertEqual(self.lookup(vendor_id='abc'), [])
+
+    def test_lookups_run_no_queries_once_built(self):
+        self.lookup()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.lookup(vendor_id=self.other.pk), [self.sedan.pk])
+
+    def test_committed_changes_rebuild_the_catalog(self):
+        self.assertEqual(self.lookup(district='Krishna'), [self.sedan.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.district = 'Guntur'
+            self.other.save()
+        self.assertEqual(self.lookup(district='Krishna'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.suv.delete()
+        self.assertEqual(self.lookup(district='Guntur'), [self.sedan.pk])
+
+    async def test_lookup_is_served_by_the_asgi_handler(self):
+        response = await self.async_client.get(self.url, {'district': 'Guntur'})
+        self.assertEqual([v['id'] for v in response.json()], [self.suv.pk])
+
+    async def test_async_lookups_read_the_cache_off_the_event_loop(self):
+        get = cache.get
+
+        def off_loop_get(*args, **kwargs):
+            # Raises when called from the thread running the event loop.
+            with self.assertRaises(RuntimeError):
+                asyncio.get_running_loop()
+            return get(*args, **kwargs)
+
+        await self.async_client.get(self.url)
+        with mock.patch.object(cache, 'get', off_loop_get):
+            response = await self.async_client.get(self.url, {'district': 'Krishna'})
+        self.assertEqual([v['id'] for v in response.json()], [self.sedan.pk])
+
+    def test_search_matches_number_prefix_within_filters(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com'))
+        url = reverse('vehicle_search_api')
+        self.assertEqual([v['id'] for v in self.client.get(url, {'q': 'ap'}).json()], [self.suv.pk, self.sedan.pk])
+        self.assertEqual(self.client.get(url, {'q': 'AP16'}).json(),
+                         [{'id': self.sedan.pk, 'name': 'AP16CD5678 - Honda City (Ravi Cabs)'}])
+        self.assertEqual(self.client.get(url, {'q': 'AP', 'district': 'guntur'}).json()[0]['id'], self.suv.pk)
+        self.assertEqual(self.client.get(url, {'q': 'AP16', 'vendor_id': self.vendor.pk}).json(), [])
+        self.assertEqual(self.client.get(url, {'type': Vehicle.VehicleType.SEDAN}).json()[0]['id'], self.sedan.pk)
 
-# Create your tests here.
+    def test_search_limits_results_and_runs_no_queries_once_built(self):
+        results = catalog.get_catalog().search('ap', 1)
+        self.assertEqual([v['id'] for v in results], [self.suv.pk])
+        with self.assertNumQueries(0):
+            self.assertEqual(catalog.get_catalog().search('AP16CD', 20), [
+                {'id': self.sedan.pk, 'name': 'AP16CD5678 - Honda City (Ravi Cabs)'},
+            ])
+            self.assertEqual(catalog.get_catalog().search('zz', 20), [])
@@ -3,40 +3,70 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, permission_required
 
-from vendors.models import Vendor
+from core.listing import ListEngine, list_json_response
+from core.reference import get_reference_data
+from core.widgets import TYPEAHEAD_LIMIT
+from vendors.models import normalize_district
+from .catalog import aget_catalog
 from .models import Vehicle
 from .forms import VehicleForm
 
 
-@login_required
-def vehicle_list_view(request):
+def _vehicle_list_page(request):
     selected_district = request.GET.get('district', '')
     selected_type = request.GET.get('type', '')
 
-    # Data for the filter dropdowns
-    districts = Vendor.objects.values_list('district', flat=True).distinct().order_by('district')
-    vehicle_types = Vehicle.VehicleType.choices
-
     # Start with all vehicles
     vehicles = Vehicle.objects.select_related('vendor').all()
 
     # Apply filters
     if selected_district:
-        vehicles = vehicles.filter(vendor__district__iexact=selected_district)
+        vehicles = vehicles.filter(vendor__district_key=normalize_district(selected_district))
 
     if selected_type:
         vehicles = vehicles.filter(type=selected_type)
 
+    engine = ListEngine(
+        vehicles,
+        sort_fields={
+            'created_at': 'created_at',
+            'make': 'make',
+            'model': 'model',
+            'number': 'number',
+            'type': 'type',
+            'vendor': 'vendor__name',
+        },
+        default_sort='-created_at',
+        search_fields=('number', 'make', 'model', 'vendor__name'),
+    )
+    return engine.paginate(request.GET)
+
+
+@login_required
+def vehicle_list_view(request):
+    selected_district = request.GET.get('district', '')
+    selected_type = request.GET.get('type', '')
+
+    # Data for the filter dropdowns
+    reference = get_reference_data()
+
+    page = _vehicle_list_page(request)
     context = {
-        'vehicles': vehicles,
-        'districts': districts,
-        'vehicle_types': vehicle_types,
+        'page': page,
+        'vehicles': page.rows,
+        'districts': reference.districts,
+        'vehicle_types': reference.vehicle_types,
         'selected_district': selected_district,
         'selected_type': selected_type,
         'title': 'Vehicles'
     }
     return render(request, 'vehicles/vehicle_list.html', context)
 
+
+@login_required
+def vehicle_list_api(request):
+    return list_json_response(request, _vehicle_list_page(request), 'vehicles/vehicle_rows.html')
+
 @login_required
 def vehicle_add_view(request):
     if request.method == 'POST':
@@ -88,37 +118,36 @@ def vehicle_delete_view(request, pk):
     return render(request, 'vehicles/vehicle_confirm_delete.html', context)
 
 
-def vehicles_by_vendor_api(request):
+async def vehicles_by_vendor_api(request):
+    # Async so that under ASGI a burst of dropdown lookups shares one worker;
+    # answered from the in-memory catalog, so a lookup runs no queries.
     vendor_id = request.GET.get('vendor_id')
     vehicle_type = request.GET.get('type')
     district = request.GET.get('district')
 
-    print(f"API called with: vendor_id={vendor_id}, type={vehicle_type}, district={district}")  # Debug log
+    if vendor_id and not vendor_id.isdigit():
+        return JsonResponse([], safe=False)
 
-    # Start with all vehicles
-    vehicles = Vehicle.objects.select_related('vendor')
-
-    # Filter by vendor if provided
-    if vendor_id:
-        vehicles = vehicles.filter(vendor_id=vendor_id)
-        print(f"Filtered by vendor_id: {vehicles.count()} vehicles")  # Debug log
-    # Filter by district if provided (and no specific vendor selected)
-    elif district:
-        vehicles = vehicles.filter(vendor__district__iexact=district)
-        print(f"Filtered by district: {vehicles.count()} vehicles")  # Debug log
-
-    # Filter by vehicle type if provided
-    if vehicle_type:
-        vehicles = vehicles.filter(type=vehicle_type)
-        print(f"After type filter: {vehicles.count()} vehicles")  # Debug log
-
-    # Format the data for the dropdown
-    vehicle_list = []
-    for v in vehicles:
-        vehicle_list.append({
-            'id': v.id,
-            'name': f"{v.number} - {v.make} {v.model} ({v.vendor.name})"
-        })
-
-    print(f"Returning {len(vehicle_list)} vehicles")  # Debug log
-    return JsonResponse(vehicle_list, safe=False)
\ No newline at end of file
+    catalog = await aget_catalog()
+    vehicle_list = catalog.lookup(int(vendor_id) if vendor_id else None, district, vehicle_type)
+    return JsonResponse(vehicle_list, safe=False)
+
+
+@login_required
+async def vehicle_search_api(request):
+    # Typeahead for the trip form: vehicles whose number starts with the
+    # query, narrowed by the form's vendor, district and type filters.
+    # Served from the in-memory catalog, so a keystroke runs no queries
+    # beyond the session and user.
+    query = request.GET.get('q', '').strip()
+    vendor_id = request.GET.get('vendor_id')
+    district = request.GET.get('district')
+    vehicle_type = request.GET.get('type')
+
+    if vendor_id and not vendor_id.isdigit():
+        return JsonResponse([], safe=False)
+
+    catalog = await aget_catalog()
+    vehicle_list = catalog.search(query, TYPEAHEAD_LIMIT, int(vendor_id) if vendor_id else None,
+                                  district, vehicle_type)
+    return JsonResponse(vehicle_list, safe=False)
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:15
+
+from django.db import migrations, models
+from django.db.models.functions import Lower, Trim
+
+
+def backfill_district_key(apps, schema_editor):
+    Vendor = apps.get_model('vendors', 'Vendor')
+    Vendor.objects.update(district_key=Lower(Trim('district')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='vendor',
+            options={'ordering': ['name']},
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='district_key',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(backfill_district_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='vendor',
+            index=models.Index(fields=['district_key', 'name'], name='vendor_district_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendor',
+            index=models.Index(fields=['name'], name='vendor_name_idx'),
+        ),
+    ]
@@ -1,8 +1,17 @@
 from django.db import models
 
+
+def normalize_district(district):
+    """Case-folded form of a district name, as stored in ``Vendor.district_key``."""
+    return (district or '').strip().lower()
+
+
 class Vendor(models.Model):
     name = models.CharField(max_length=100)
     district = models.CharField(max_length=100)
+    # Indexed, normalized copy of ``district`` so district filters are plain
+    # equality lookups instead of iexact comparisons that cannot use an index.
+    district_key = models.CharField(max_length=100, editable=False, default='')
     area = models.CharField(max_length=100)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -10,5 +19,16 @@ class Vendor(models.Model):
     def __str__(self):
         return f"{self.name} ({self.district})"
 
+    def save(self, *args, **kwargs):
+        self.district_key = normalize_district(self.district)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'district' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'district_key'}
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['district_key', 'name'], name='vendor_district_name_idx'),
+            models.Index(fields=['name'], name='vendor_name_idx'),
+        ]
@@ -1,3 +1,51 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from core.testing import QueryBudgetTestCase
+from .models import Vendor
+
+
+class VendorViewQueryBudgetTests(QueryBudgetTestCase):
+    def test_vendor_list(self):
+        self.assertQueryBudget(reverse('vendor_list'), 3)
+
+    def test_vendor_list_filtered(self):
+        self.assertQueryBudget(reverse('vendor_list') + '?district=guntur', 3)
+
+    def test_vendor_list_api(self):
+        self.assertQueryBudget(reverse('vendor_list_api'), 3)
+
+    def test_vendor_add(self):
+        self.assertQueryBudget(reverse('vendor_add'), 2)
+
+    def test_vendor_update(self):
+        self.assertQueryBudget(reverse('vendor_update', args=[self.trip.vehicle.vendor_id]), 3)
+
+    def test_vendor_delete(self):
+        self.assertQueryBudget(reverse('vendor_delete', args=[self.trip.vehicle.vendor_id]), 3)
+
+    def test_vendors_by_district_api(self):
+        self.assertQueryBudget(reverse('api_vendors_by_district') + '?district=Guntur', 1)
+
+
+class VendorDistrictKeyTests(TestCase):
+    def test_save_normalizes_district(self):
+        vendor = Vendor.objects.create(name='Sri Travels', district='  GUNTUR ', area='Brodipet')
+        self.assertEqual(vendor.district_key, 'guntur')
+
+        vendor.district = 'Krishna'
+        vendor.save(update_fields=['district'])
+        vendor.refresh_from_db()
+        self.assertEqual(vendor.district_key, 'krishna')
+
+    def test_district_filter_ignores_case(self):
+        Vendor.objects.create(name='Sri Travels', district='Guntur', area='Brodipet')
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com'))
+        response = self.client.get(reverse('api_vendors_by_district'), {'district': 'gUNTUR'})
+        self.assertEqual([v['name'] for v in response.json()], ['Sri Travels'])
+
+    async def test_lookup_is_served_by_the_asgi_handler(self):
+        await Vendor.objects.acreate(name='Sri Travels', district='Guntur', area='Brodipet')
+        response = await self.async_client.get(reverse('api_vendors_by_district'), {'district': 'Guntur'})
+        self.assertEqual([v['name'] for v in response.json()], ['Sri Travels'])
@@ -3,6 +3,7 @@ from . import views
 
 urlpatterns = [
     path('', views.vendor_list_view, name='vendor_list'),
+    path('api/list/', views.vendor_list_api, name='vendor_list_api'),
     path('add/', views.vendor_add_view, name='vendor_add'),
     path('<int:pk>/update/', views.vendor_update_view, name='vendor_update'),
     path('<int:pk>/delete/', views.vendor_delete_view, name='vendor_delete'),
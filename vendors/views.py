@@ -2,33 +2,55 @@ from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, permission_required
-from .models import Vendor
+
+from core.listing import ListEngine, list_json_response
+from core.reference import get_reference_data
+from .models import Vendor, normalize_district
 from .forms import VendorForm
 
 
-@login_required
-def vendor_list_view(request):
+def _vendor_list_page(request):
     # Get the selected district from the URL query parameter
     selected_district = request.GET.get('district', '')
 
-    # Get a list of all unique districts to populate the filter dropdown
-    districts = Vendor.objects.values_list('district', flat=True).distinct().order_by('district')
-
     # Start with all vendors
     vendors = Vendor.objects.all()
 
     # If a district is selected, filter the queryset
     if selected_district:
-        vendors = vendors.filter(district__iexact=selected_district)
+        vendors = vendors.filter(district_key=normalize_district(selected_district))
+
+    engine = ListEngine(
+        vendors,
+        sort_fields={'name': 'name', 'district': 'district', 'area': 'area'},
+        default_sort='name',
+        search_fields=('name', 'district', 'area'),
+    )
+    return engine.paginate(request.GET)
+
+
+@login_required
+def vendor_list_view(request):
+    selected_district = request.GET.get('district', '')
+
+    # The unique districts for the filter dropdown, from the cached reference data
+    districts = get_reference_data().districts
 
+    page = _vendor_list_page(request)
     context = {
-        'vendors': vendors,
+        'page': page,
+        'vendors': page.rows,
         'districts': districts,
         'selected_district': selected_district,
         'title': 'Vendors'
     }
     return render(request, 'vendors/vendor_list.html', context)
 
+
+@login_required
+def vendor_list_api(request):
+    return list_json_response(request, _vendor_list_page(request), 'vendors/vendor_rows.html')
+
 @login_required
 def vendor_add_view(request):
     if request.method == 'POST':
@@ -79,11 +101,12 @@ def vendor_delete_view(request, pk):
     }
     return render(request, 'vendors/vendor_confirm_delete.html', context)
 
-def vendors_by_district_api(request):
+async def vendors_by_district_api(request):
+    # Async so that under ASGI a burst of dropdown lookups shares one worker
     district = request.GET.get('district')
     if district:
-        vendor_list = Vendor.objects.filter(district__iexact=district).values('id', 'name')
+        vendor_list = Vendor.objects.filter(district_key=normalize_district(district)).values('id', 'name')
     else:
         vendor_list = Vendor.objects.all().values('id', 'name')
-    vendors = list(vendor_list)
+    vendors = [vendor async for vendor in vendor_list]
     return JsonResponse(vendors, safe=False)
\ No newline at end of file